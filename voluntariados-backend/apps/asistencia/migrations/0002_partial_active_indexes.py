@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0001_initial'),
+        ('voluntariado', '0008_inscripcion_turno_lista_espera'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['inscripcion', 'presente'], name='asist_insc_presente_act_idx'),
+        ),
+    ]
@@ -8,5 +8,11 @@ class Asistencia(SoftDeleteModel):
     horas = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     observaciones = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Conteos de presentes por inscripción sin leer la tabla (índice parcial: solo filas activas)
+            models.Index(fields=["inscripcion", "presente"], name="asist_insc_presente_act_idx", condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return f"Asistencia {self.inscripcion} - {'Presente' if self.presente else 'Ausente'}"
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.db import transaction
 from .models import Asistencia
-from apps.voluntariado.models import InscripcionTurno
+from apps.core.stats import invalidar_landing_stats
+from apps.voluntariado.models import InscripcionTurno, Turno
 
 class AsistenciaSerializer(serializers.ModelSerializer):
     inscripcion = serializers.PrimaryKeyRelatedField(queryset=InscripcionTurno.objects.all())
@@ -19,11 +21,13 @@ class AsistenciaSerializer(serializers.ModelSerializer):
     def validate(self, data):
         """
         Validaciones básicas:
-        - asegurarse que la inscripcion exista y que no exista otra asistencia (OneToOne en el modelo lo impide pero damos mensaje claro)
+        - asegurarse que la inscripcion exista, que no esté en lista de espera y que no exista otra asistencia (OneToOne en el modelo lo impide pero damos mensaje claro)
         """
         inscripcion = data.get("inscripcion")
         if not inscripcion:
             raise serializers.ValidationError("Se requiere inscripcion.")
+        if inscripcion.estado == InscripcionTurno.Status.EN_ESPERA:
+            raise serializers.ValidationError("La inscripción está en lista de espera.")
         # si ya existe una asistencia y estamos creando
         if self.instance is None and hasattr(inscripcion, "asistencia"):
             raise serializers.ValidationError("Ya existe un registro de asistencia para esta inscripción.")
@@ -35,3 +39,76 @@ class AsistenciaSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         return super().update(instance, validated_data)
+
+
+class PlanillaItemSerializer(serializers.Serializer):
+    inscripcion = serializers.IntegerField()
+    presente = serializers.BooleanField(default=False)
+    horas = serializers.DecimalField(max_digits=5, decimal_places=2, required=False, allow_null=True)
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class PlanillaAsistenciaSerializer(serializers.Serializer):
+    """
+    Planilla completa de asistencia de un turno: una fila por inscripción.
+    Se valida con una sola consulta (inscripciones del turno + su asistencia, incluso dada de baja)
+    y se guarda con bulk_create / bulk_update en una transacción. Si alguna fila es inválida
+    no se guarda nada y los errores se devuelven por fila, en el mismo orden.
+    """
+    turno = serializers.PrimaryKeyRelatedField(queryset=Turno.objects.all())
+    asistencias = PlanillaItemSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        filas = data["asistencias"]
+        ids = [fila["inscripcion"] for fila in filas]
+        # select_related trae la asistencia por JOIN, sin filtrar is_active: el OneToOne la sigue ocupando
+        inscripciones = InscripcionTurno.objects.filter(turno=data["turno"], pk__in=ids).select_related("asistencia")
+        por_id = {inscripcion.pk: inscripcion for inscripcion in inscripciones}
+
+        errores = []
+        vistos = set()
+        for fila in filas:
+            inscripcion = por_id.get(fila["inscripcion"])
+            if inscripcion is None:
+                errores.append({"inscripcion": ["La inscripción no existe o no pertenece a este turno."]})
+            elif fila["inscripcion"] in vistos:
+                errores.append({"inscripcion": ["La inscripción está repetida en la planilla."]})
+            elif inscripcion.estado not in (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO):
+                errores.append({"inscripcion": ["La inscripción no está activa (cancelada o en lista de espera)."]})
+            else:
+                errores.append({})
+            vistos.add(fila["inscripcion"])
+
+        if any(errores):
+            raise serializers.ValidationError({"asistencias": errores})
+        data["inscripciones"] = por_id
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        inscripciones = validated_data["inscripciones"]
+        nuevas, existentes = [], []
+        for fila in validated_data["asistencias"]:
+            inscripcion = inscripciones[fila["inscripcion"]]
+            valores = {
+                "presente": fila["presente"],
+                "horas": fila.get("horas"),
+                "observaciones": fila.get("observaciones"),
+            }
+            if hasattr(inscripcion, "asistencia"):
+                asistencia = inscripcion.asistencia
+                for campo, valor in valores.items():
+                    setattr(asistencia, campo, valor)
+                asistencia.is_active = True
+                existentes.append(asistencia)
+            else:
+                nuevas.append(Asistencia(inscripcion=inscripcion, **valores))
+
+        if nuevas:
+            Asistencia.objects.bulk_create(nuevas)
+        if existentes:
+            # all_objects: incluye las dadas de baja que se reactivan
+            Asistencia.all_objects.bulk_update(existentes, ["presente", "horas", "observaciones", "is_active"])
+        # bulk_create / bulk_update no envían post_save: las horas de la landing se invalidan a mano
+        invalidar_landing_stats()
+        return {"creadas": nuevas, "actualizadas": existentes}
@@ -0,0 +1,71 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.asistencia.models import Asistencia
+from apps.persona.models import Voluntario
+from apps.voluntariado.models import Voluntariado, Turno, InscripcionTurno
+
+
+class PlanillaAsistenciaTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy - timedelta(days=1),
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.turno = Turno.objects.create(
+            voluntariado=voluntariado, fecha=hoy, hora_inicio=time(9), hora_fin=time(12), cupo=10
+        )
+        self.inscripciones = [
+            InscripcionTurno.objects.create(
+                turno=self.turno, voluntario=Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test")
+            )
+            for i in range(3)
+        ]
+        User = get_user_model()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+        )
+
+    def enviar(self, filas):
+        return self.client.post(
+            "/api/asistencia/planilla/", {"turno": self.turno.pk, "asistencias": filas}, format="json"
+        )
+
+    def test_crea_y_actualiza_en_una_request(self):
+        # una asistencia dada de baja sigue ocupando el OneToOne: se reactiva
+        Asistencia.objects.create(inscripcion=self.inscripciones[0], presente=False).delete()
+
+        filas = [{"inscripcion": i.pk, "presente": True, "horas": "3.00"} for i in self.inscripciones]
+        response = self.enviar(filas)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["creadas"], response.data["actualizadas"]), (2, 1))
+        self.assertEqual(Asistencia.objects.filter(inscripcion__turno=self.turno, presente=True).count(), 3)
+
+    def test_errores_por_fila_no_guardan_nada(self):
+        otra = InscripcionTurno.objects.create(
+            turno=Turno.objects.create(fecha=date.today(), hora_inicio=time(9), hora_fin=time(12)),
+            voluntario=Voluntario.objects.create(nombre="Otro", apellido="Test"),
+        )
+        response = self.enviar([
+            {"inscripcion": self.inscripciones[0].pk, "presente": True},
+            {"inscripcion": otra.pk, "presente": True},
+            {"inscripcion": self.inscripciones[0].pk, "presente": False},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errores = response.data["asistencias"]
+        self.assertEqual(errores[0], {})
+        self.assertIn("inscripcion", errores[1])
+        self.assertIn("inscripcion", errores[2])
+        self.assertFalse(Asistencia.all_objects.exists())
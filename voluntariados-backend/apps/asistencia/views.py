@@ -1,6 +1,8 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import Asistencia
-from .serializers import AsistenciaSerializer
+from .serializers import AsistenciaSerializer, PlanillaAsistenciaSerializer
 from apps.users.permissions import IsGestionador
 
 class AsistenciaViewSet(viewsets.ModelViewSet):
@@ -16,4 +18,24 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
         turno_id = self.request.query_params.get('turno', None)
         if turno_id is not None:
             queryset = queryset.filter(inscripcion__turno__id=turno_id)
-        return queryset
\ No newline at end of file
+        return queryset
+
+    @action(detail=False, methods=["post"], url_path="planilla")
+    def planilla(self, request):
+        """
+        Endpoint: POST /asistencia/planilla/
+        Registra la planilla completa de un turno en una sola request:
+        {"turno": <id>, "asistencias": [{"inscripcion": <id>, "presente": true, "horas": "3.00", "observaciones": ""}, ...]}
+        """
+        serializer = PlanillaAsistenciaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resultado = serializer.save()
+        asistencias = resultado["creadas"] + resultado["actualizadas"]
+        return Response(
+            {
+                "creadas": len(resultado["creadas"]),
+                "actualizadas": len(resultado["actualizadas"]),
+                "asistencias": AsistenciaSerializer(asistencias, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,81 @@
+"""
+Almacén en disco de certificados ya generados.
+
+Cada PDF se guarda con un nombre derivado del contenido que lo determina (persona, voluntariado,
+horas, último turno, plantilla y versión del diseño): si algo de eso cambia, la clave cambia y el
+certificado se vuelve a generar; si no, se envía el archivo tal cual. Se conserva un solo archivo
+por (voluntario, voluntariado): al generar uno nuevo se borran los anteriores de ese par.
+La misma clave es la huella del certificado en el registro de verificación (CertificadoEmitido).
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import plantilla
+
+# Incrementar al cambiar el diseño del certificado (textos, posiciones, fuentes): invalida todo el almacén
+VERSION_DISENO = 2
+
+
+def clave(datos):
+    """Hash del contenido del certificado (datos: valores de generar_certificado_pdf_from_values)."""
+    contenido = json.dumps(
+        {
+            **datos,
+            "plantilla": plantilla.version_actual(),
+            "diseno": VERSION_DISENO,
+            "verificacion": settings.CERTIFICADOS_VERIFICACION_URL,
+        },
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+    )
+    return hashlib.sha256(contenido.encode()).hexdigest()[:40]
+
+
+def _ruta(voluntario_id, voluntariado_id, huella):
+    return os.path.join(settings.CERTIFICADOS_CACHE_DIR, f"{voluntario_id}-{voluntariado_id}-{huella}.pdf")
+
+
+def buscar(voluntario_id, voluntariado_id, huella):
+    """Ruta del PDF guardado para esa huella, o None."""
+    ruta = _ruta(voluntario_id, voluntariado_id, huella)
+    return ruta if os.path.exists(ruta) else None
+
+
+def leer(ruta):
+    """Contenido del PDF guardado, o None si ya no está (otro proceso lo reemplazó)."""
+    try:
+        with open(ruta, "rb") as archivo:
+            return archivo.read()
+    except FileNotFoundError:
+        return None
+
+
+def guardar(voluntario_id, voluntariado_id, huella, contenido):
+    """
+    Escribe el PDF (archivo temporal + os.replace, así nunca se sirve uno a medio escribir)
+    y borra las versiones anteriores del mismo par. Retorna la ruta.
+    """
+    os.makedirs(settings.CERTIFICADOS_CACHE_DIR, exist_ok=True)
+    ruta = _ruta(voluntario_id, voluntariado_id, huella)
+    descriptor, temporal = tempfile.mkstemp(dir=settings.CERTIFICADOS_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+    for anterior in glob.glob(_ruta(voluntario_id, voluntariado_id, "*")):
+        if anterior != ruta:
+            try:
+                os.unlink(anterior)
+            except FileNotFoundError:
+                pass  # otro proceso ya lo borró
+    return ruta
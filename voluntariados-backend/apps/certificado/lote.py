@@ -0,0 +1,170 @@
+"""
+Generación de certificados en lote: todos los voluntarios con horas de un voluntariado, en un ZIP.
+
+- Los datos salen de una única consulta agrupada por voluntario (datos_lote).
+- Los PDF que ya están en el almacén en disco (cache_pdf) se usan tal cual; el resto se dibuja con
+  generar_certificado_pdf_from_values en un pool de procesos, con una cantidad acotada de PDF en
+  vuelo, y se guarda en el almacén para las descargas individuales.
+- Los códigos de verificación de todo el lote se registran antes de dibujar, en dos consultas.
+- zip_en_streaming arma el ZIP a medida que llegan los PDF: nunca está entero en memoria.
+"""
+import logging
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db.models import F, Max, OuterRef, Q, Subquery, Sum
+
+from . import cache_pdf
+from .models import CertificadoEmitido
+
+logger = logging.getLogger(__name__)
+
+
+def datos_lote(voluntariado):
+    """
+    [(voluntario_id, valores)] de los voluntarios con horas presentes en `voluntariado`, con los
+    mismos valores que datos_certificado, en una consulta agrupada por voluntario.
+    """
+    from .views import ORDEN_ULTIMO_TURNO, inscripciones_certificado, lugar_certificado
+
+    inscripciones = inscripciones_certificado(voluntariado.pk)
+    ultimo_lugar = Subquery(
+        inscripciones.filter(voluntario_id=OuterRef('voluntario_id'))
+        .order_by(*ORDEN_ULTIMO_TURNO)
+        .values(lugar=lugar_certificado())[:1]
+    )
+    filas = (
+        inscripciones
+        .order_by()
+        .values('voluntario_id', nombre=F('voluntario__nombre'), apellido=F('voluntario__apellido'), dni=F('voluntario__dni'))
+        .annotate(
+            total_horas=Sum('asistencia__horas', filter=Q(asistencia__presente=True, asistencia__is_active=True)),
+            ultima_fecha=Max('turno__fecha'),
+            ultimo_lugar=ultimo_lugar,
+        )
+        .filter(total_horas__gt=0)
+        .order_by('apellido', 'nombre', 'voluntario_id')
+    )
+    return [
+        (
+            fila.pop('voluntario_id'),
+            {
+                **fila,
+                'voluntariado_nombre': voluntariado.nombre,
+                'fecha_fin_cursado': voluntariado.fecha_fin_cursado,
+            },
+        )
+        for fila in filas
+    ]
+
+
+def _iniciar_worker():
+    # Con el método "spawn" (macOS, Windows) el proceso hijo arranca sin Django configurado
+    django.setup()
+
+
+def _dibujar(valores):
+    """Se ejecuta en el pool: retorna los bytes del PDF."""
+    from .views import generar_certificado_pdf_from_values
+
+    response, _ = generar_certificado_pdf_from_values(**valores)
+    return response.content
+
+
+def nombre_archivo(valores, voluntario_id):
+    base = f"certificado_{valores['apellido']}_{valores['nombre']}_{valores['dni'] or voluntario_id}"
+    return re.sub(r'[^\w.-]+', '_', base) + '.pdf'
+
+
+def certificados(voluntariado, lote, workers=1, progreso=None):
+    """
+    Itera (nombre_archivo, bytes del PDF) para cada elemento de `lote` (el resultado de datos_lote),
+    en el mismo orden. `progreso(hechos, total)` se llama después de cada certificado. Con
+    workers <= 1 dibuja en el mismo proceso.
+    """
+    from .views import _voluntariado_activo
+
+    total = len(lote)
+    activo = _voluntariado_activo(voluntariado.fecha_fin_cursado)
+    huellas = [cache_pdf.clave({**valores, 'activo': activo}) for _, valores in lote]
+    codigos = CertificadoEmitido.registrar_lote(
+        voluntariado.pk,
+        [(voluntario_id, huella, valores['total_horas']) for (voluntario_id, valores), huella in zip(lote, huellas)],
+    )
+    hechos = 0
+
+    def entregar(voluntario_id, valores, huella, ruta, futuro):
+        nonlocal hechos
+        contenido = cache_pdf.leer(ruta) if ruta else None
+        if contenido is None:
+            contenido = futuro.result() if futuro else _dibujar(valores)
+            cache_pdf.guardar(voluntario_id, voluntariado.pk, huella, contenido)
+        hechos += 1
+        if progreso:
+            progreso(hechos, total)
+        return nombre_archivo(valores, voluntario_id), contenido
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) if workers > 1 else None
+    # Ventana de 2 tareas por worker: acota los PDF en memoria aunque el cliente lea despacio
+    ventana = 2 * workers if pool else 1
+    en_vuelo = deque()
+    try:
+        for (voluntario_id, valores), huella in zip(lote, huellas):
+            valores = {**valores, 'codigo': codigos[voluntario_id, huella]}
+            ruta = cache_pdf.buscar(voluntario_id, voluntariado.pk, huella)
+            futuro = pool.submit(_dibujar, valores) if pool and not ruta else None
+            en_vuelo.append((voluntario_id, valores, huella, ruta, futuro))
+            if len(en_vuelo) >= ventana:
+                yield entregar(*en_vuelo.popleft())
+        while en_vuelo:
+            yield entregar(*en_vuelo.popleft())
+    finally:
+        # También si el cliente corta la descarga: se descartan las tareas pendientes
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+class _Salida:
+    """Destino no posicionable para zipfile: acumula lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b"".join(self.partes)
+        self.partes = []
+        return datos
+
+
+def zip_en_streaming(archivos):
+    """Arma un ZIP (sin comprimir: los PDF ya lo están) a partir de (nombre, bytes) y lo entrega por partes."""
+    salida = _Salida()
+    usados = set()
+    with zipfile.ZipFile(salida, mode='w', compression=zipfile.ZIP_STORED) as zf:
+        for nombre, contenido in archivos:
+            base, n = nombre[:-len('.pdf')], 1
+            while nombre in usados:
+                n += 1
+                nombre = f"{base}_{n}.pdf"
+            usados.add(nombre)
+            zf.writestr(nombre, contenido)
+            yield salida.vaciar()
+    yield salida.vaciar()
+
+
+def registrar_progreso(voluntariado_id, cada=50):
+    """Callback de progreso que deja una línea de log cada `cada` certificados y al terminar."""
+    def progreso(hechos, total):
+        if hechos % cada == 0 or hechos == total:
+            logger.info("Certificados del voluntariado %s: %s/%s", voluntariado_id, hechos, total)
+    return progreso
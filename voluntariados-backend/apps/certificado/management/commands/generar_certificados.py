@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.certificado import lote
+from apps.voluntariado.models import Voluntariado
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los certificados de todos los voluntarios con horas en un voluntariado y los guarda "
+        "en un ZIP. Los PDF se dibujan en un pool de procesos y se reutilizan los ya generados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("voluntariado_id", type=int)
+        parser.add_argument(
+            "--output", help="Ruta del ZIP (por defecto certificados_voluntariado_<id>.zip en el directorio actual)."
+        )
+        parser.add_argument(
+            "--workers", type=int, default=settings.CERTIFICADOS_WORKERS,
+            help="Procesos que dibujan los PDF (1: en este proceso).",
+        )
+
+    def handle(self, *args, **options):
+        voluntariado = Voluntariado.objects.filter(pk=options["voluntariado_id"]).first()
+        if voluntariado is None:
+            raise CommandError(f"No existe el voluntariado {options['voluntariado_id']}")
+
+        datos = lote.datos_lote(voluntariado)
+        if not datos:
+            raise CommandError("No hay voluntarios con horas registradas en este voluntariado.")
+        salida = options["output"] or f"certificados_voluntariado_{voluntariado.pk}.zip"
+        self.stdout.write(f"Generando {len(datos)} certificados de '{voluntariado.nombre}' en {salida}.")
+
+        paso = max(1, len(datos) // 20)
+
+        def progreso(hechos, total):
+            if hechos % paso == 0 or hechos == total:
+                self.stdout.write(f"  {hechos}/{total} ({hechos * 100 // total}%)")
+
+        archivos = lote.certificados(voluntariado, datos, workers=options["workers"], progreso=progreso)
+        temporal = f"{salida}.tmp"
+        try:
+            with open(temporal, "wb") as destino:
+                for parte in lote.zip_en_streaming(archivos):
+                    destino.write(parte)
+            os.replace(temporal, salida)
+        finally:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+
+        self.stdout.write(self.style.SUCCESS(f"Certificados generados: {len(datos)}."))
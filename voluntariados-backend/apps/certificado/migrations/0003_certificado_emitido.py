@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificado', '0002_remove_certificado_autoridades_and_more'),
+        ('persona', '0003_persona_updated_at'),
+        ('voluntariado', '0009_partial_active_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificadoEmitido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(editable=False, max_length=16, unique=True, verbose_name='Código')),
+                ('huella', models.CharField(editable=False, max_length=40, verbose_name='Huella del contenido')),
+                ('horas', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('emitido_en', models.DateTimeField(auto_now_add=True, verbose_name='Emitido en')),
+                ('voluntariado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificados', to='voluntariado.voluntariado')),
+                ('voluntario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificados', to='persona.voluntario')),
+            ],
+            options={
+                'verbose_name': 'Certificado emitido',
+                'verbose_name_plural': 'Certificados emitidos',
+                'constraints': [models.UniqueConstraint(fields=('voluntario', 'voluntariado', 'huella'), name='certificado_emitido_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,102 @@
+from django.db import IntegrityError, models
+from django.utils.crypto import constant_time_compare, salted_hmac
+import base64
+import re
+import secrets
+
+# Código de verificación: 8 caracteres aleatorios + 8 de firma (HMAC con SECRET_KEY), en base32.
+# La firma permite descartar códigos inventados sin consultar la base.
+LARGO_ALEATORIO = 8
+LARGO_CODIGO = 16
+_SAL_FIRMA = "apps.certificado.codigo"
+
+
+def _firma(aleatorio):
+    digest = salted_hmac(_SAL_FIRMA, aleatorio).digest()
+    return base64.b32encode(digest[:5]).decode()
+
+
+def generar_codigo():
+    """Código nuevo, sin guiones (así se guarda)."""
+    aleatorio = base64.b32encode(secrets.token_bytes(5)).decode()
+    return aleatorio + _firma(aleatorio)
+
+
+def normalizar_codigo(codigo):
+    """Código tal como se guarda (mayúsculas, sin guiones ni espacios) si la firma es válida; si no, None."""
+    codigo = re.sub(r"[\s-]", "", codigo or "").upper()
+    if len(codigo) != LARGO_CODIGO:
+        return None
+    aleatorio, firma = codigo[:LARGO_ALEATORIO], codigo[LARGO_ALEATORIO:]
+    return codigo if constant_time_compare(firma, _firma(aleatorio)) else None
+
+
+def formatear_codigo(codigo):
+    """XXXX-XXXX-XXXX-XXXX, como se imprime en el certificado."""
+    return "-".join(codigo[i:i + 4] for i in range(0, len(codigo), 4))
+
+
+class CertificadoEmitido(models.Model):
+    """
+    Registro de los certificados emitidos, para verificarlos sin volver a generarlos.
+    Un registro por contenido distinto (huella de cache_pdf): regenerar el mismo certificado reutiliza el código.
+    """
+    codigo = models.CharField(max_length=LARGO_CODIGO, unique=True, editable=False, verbose_name="Código")
+    huella = models.CharField(max_length=40, editable=False, verbose_name="Huella del contenido")
+    voluntario = models.ForeignKey("persona.Voluntario", on_delete=models.CASCADE, related_name="certificados")
+    voluntariado = models.ForeignKey("voluntariado.Voluntariado", on_delete=models.CASCADE, related_name="certificados")
+    horas = models.DecimalField(max_digits=7, decimal_places=2)
+    emitido_en = models.DateTimeField(auto_now_add=True, verbose_name="Emitido en")
+
+    class Meta:
+        verbose_name = "Certificado emitido"
+        verbose_name_plural = "Certificados emitidos"
+        constraints = [
+            models.UniqueConstraint(fields=["voluntario", "voluntariado", "huella"], name="certificado_emitido_unico"),
+        ]
+
+    def __str__(self):
+        return formatear_codigo(self.codigo)
+
+    @classmethod
+    def registrar(cls, voluntario_id, voluntariado_id, huella, horas):
+        """Código del certificado con esa huella; lo registra si es la primera vez que se emite."""
+        for intento in range(3):
+            try:
+                registro, _ = cls.objects.get_or_create(
+                    voluntario_id=voluntario_id,
+                    voluntariado_id=voluntariado_id,
+                    huella=huella,
+                    defaults={"codigo": generar_codigo(), "horas": horas},
+                )
+                return registro.codigo
+            except IntegrityError:
+                # El código aleatorio ya existía (get_or_create no lo distingue de una carrera): otro código
+                if intento == 2:
+                    raise
+
+    @classmethod
+    def registrar_lote(cls, voluntariado_id, emisiones):
+        """
+        Como registrar, para [(voluntario_id, huella, horas)] de un mismo voluntariado, en dos consultas.
+        Retorna {(voluntario_id, huella): codigo}.
+        """
+        cls.objects.bulk_create(
+            [
+                cls(voluntario_id=voluntario_id, voluntariado_id=voluntariado_id, huella=huella, horas=horas, codigo=generar_codigo())
+                for voluntario_id, huella, horas in emisiones
+            ],
+            ignore_conflicts=True,
+        )
+        codigos = {
+            (voluntario_id, huella): codigo
+            for voluntario_id, huella, codigo in cls.objects.filter(voluntariado_id=voluntariado_id)
+            .values_list("voluntario_id", "huella", "codigo")
+            .iterator()
+        }
+        # ignore_conflicts también descarta la fila cuyo código aleatorio chocó con uno existente:
+        # esas se registran de a una, con un código nuevo
+        for voluntario_id, huella, horas in emisiones:
+            if (voluntario_id, huella) not in codigos:
+                codigos[voluntario_id, huella] = cls.registrar(voluntario_id, voluntariado_id, huella, horas)
+        return codigos
@@ -0,0 +1,159 @@
+"""
+Plantilla (fondo) de los certificados.
+
+upload_template guarda la imagen subida tal cual (template_certificado.png, la que muestra el
+frontend) y además una variante para imprimir: RGB, reducida a A4 apaisado a CERTIFICADOS_PLANTILLA_DPI
+y comprimida como JPEG. La variante se nombra con el hash de su contenido
+(template_certificado_<version>.jpg) y template_certificado.version indica cuál es la vigente.
+
+Cada proceso guarda en memoria el ImageReader ya decodificado de la versión vigente, así que dibujar
+el fondo no vuelve a leer ni decodificar la imagen en cada certificado.
+"""
+import glob
+import hashlib
+import io
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from PIL import Image, ImageOps
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+
+NOMBRE_ORIGINAL = "template_certificado.png"
+NOMBRE_VERSION = "template_certificado.version"
+
+# Por proceso: version -> ImageReader decodificado (solo se conserva la vigente)
+_lectores = {}
+_lock = threading.Lock()
+
+
+def directorio():
+    return os.path.join(settings.MEDIA_ROOT, "plantillas")
+
+
+def ruta_original():
+    return os.path.join(directorio(), NOMBRE_ORIGINAL)
+
+
+def ruta_variante(version):
+    return os.path.join(directorio(), f"template_certificado_{version}.jpg")
+
+
+def tamano_impresion():
+    """(ancho, alto) en píxeles de una hoja A4 apaisada a CERTIFICADOS_PLANTILLA_DPI."""
+    ancho, alto = landscape(A4)  # en puntos (1/72 de pulgada)
+    dpi = settings.CERTIFICADOS_PLANTILLA_DPI
+    return round(ancho / 72 * dpi), round(alto / 72 * dpi)
+
+
+def procesar(origen):
+    """
+    Bytes del JPEG listo para imprimir a partir de `origen` (ruta o archivo con la imagen subida).
+    Lanza OSError (PIL.UnidentifiedImageError) si no es una imagen válida.
+    """
+    with Image.open(origen) as imagen:
+        imagen = ImageOps.exif_transpose(imagen)
+        if imagen.mode in ("RGBA", "LA", "P"):
+            # Las zonas transparentes quedan blancas, como la hoja
+            imagen = imagen.convert("RGBA")
+            fondo = Image.new("RGB", imagen.size, "white")
+            fondo.paste(imagen, mask=imagen.getchannel("A"))
+            imagen = fondo
+        else:
+            imagen = imagen.convert("RGB")
+
+        # El certificado estira el fondo a toda la hoja: cada eje se reduce por separado y nunca se agranda
+        ancho, alto = tamano_impresion()
+        destino = (min(imagen.width, ancho), min(imagen.height, alto))
+        if destino != imagen.size:
+            imagen = imagen.resize(destino, Image.Resampling.LANCZOS)
+
+        salida = io.BytesIO()
+        imagen.save(
+            salida,
+            format="JPEG",
+            quality=settings.CERTIFICADOS_PLANTILLA_CALIDAD,
+            optimize=True,
+            dpi=(settings.CERTIFICADOS_PLANTILLA_DPI,) * 2,
+        )
+    return salida.getvalue()
+
+
+def _escribir(ruta, contenido):
+    # Archivo temporal + os.replace: nunca se lee uno a medio escribir
+    descriptor, temporal = tempfile.mkstemp(dir=directorio(), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def publicar(contenido):
+    """Guarda la variante `contenido` (de procesar), la marca como vigente y borra las anteriores. Retorna la versión."""
+    os.makedirs(directorio(), exist_ok=True)
+    version = hashlib.sha256(contenido).hexdigest()[:16]
+    ruta = ruta_variante(version)
+    _escribir(ruta, contenido)
+    _escribir(os.path.join(directorio(), NOMBRE_VERSION), version.encode())
+
+    for anterior in glob.glob(ruta_variante("*")):
+        if anterior != ruta:
+            try:
+                os.unlink(anterior)
+            except FileNotFoundError:
+                pass  # otro proceso ya la borró
+    return version
+
+
+def version_actual():
+    """
+    Versión de la variante vigente, o None si no hay plantilla. Si solo existe la imagen original
+    (subida antes de que hubiera variantes) la procesa en ese momento.
+    """
+    try:
+        with open(os.path.join(directorio(), NOMBRE_VERSION), "rb") as archivo:
+            version = archivo.read().decode().strip()
+        if os.path.exists(ruta_variante(version)):
+            return version
+    except FileNotFoundError:
+        pass
+    if not os.path.exists(ruta_original()):
+        return None
+    return publicar(procesar(ruta_original()))
+
+
+def lector(version):
+    """ImageReader decodificado de la variante `version`; se carga una vez por proceso."""
+    with _lock:
+        imagen = _lectores.get(version)
+        if imagen is None:
+            imagen = ImageReader(ruta_variante(version))
+            imagen.getRGBData()  # decodifica ahora; ReportLab reutiliza los datos en cada certificado
+            _lectores.clear()
+            _lectores[version] = imagen
+        return imagen
+
+
+def dibujar_fondo(c, ancho, alto):
+    """Dibuja la plantilla vigente (si hay) en el canvas `c`, estirada a ancho x alto."""
+    version = version_actual()
+    if version is None:
+        return
+    try:
+        imagen = lector(version)
+    except OSError:
+        # Otro proceso publicó una plantilla nueva entre version_actual y la lectura
+        imagen = lector(version_actual())
+    # El ImageReader comparte su archivo en memoria: un hilo a la vez
+    with _lock:
+        c.drawImage(imagen, 0, 0, width=ancho, height=alto)
+
+
+def limpiar_cache():
+    with _lock:
+        _lectores.clear()
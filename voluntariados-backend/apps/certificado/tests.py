@@ -0,0 +1,267 @@
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.asistencia.models import Asistencia
+from apps.voluntariado.models import Voluntariado, Turno, InscripcionTurno
+from . import cache_pdf, plantilla
+from .lote import datos_lote
+from .models import CertificadoEmitido, formatear_codigo
+from .views import datos_certificado
+
+
+class CertificadoTestBase(TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.cache_dir = os.path.join(directorio.name, "certificados")
+        ajustes = override_settings(CERTIFICADOS_CACHE_DIR=self.cache_dir, MEDIA_ROOT=directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        plantilla.limpiar_cache()
+
+        User = get_user_model()
+        self.user = User.objects.create_user(email="vol@test.com", password="test", role=User.Roles.VOLUNTARIO)
+        hoy = date.today()
+        self.voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado", requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy - timedelta(days=30), fecha_fin_cursado=hoy - timedelta(days=1),
+            latitud=0, longitud=0,
+        )
+        self.turnos = [
+            Turno.objects.create(voluntariado=self.voluntariado, fecha=hoy - timedelta(days=d), hora_inicio="09:00", hora_fin="12:00", lugar=f"Aula {d}")
+            for d in (10, 5)
+        ]
+        inscripcion = InscripcionTurno.objects.create(turno=self.turnos[0], voluntario_id=self.user.persona_id)
+        Asistencia.objects.create(inscripcion=inscripcion, presente=True, horas=3)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/certificado/generacion/generar-por-voluntariado/{self.voluntariado.pk}/"
+
+    def descargar(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["Content-Type"], "application/pdf")
+        return b"".join(respuesta.streaming_content)
+
+
+class CertificadoCacheTests(CertificadoTestBase):
+
+    def test_segunda_descarga_sale_del_disco_con_una_consulta(self):
+        primero = self.descargar()
+        self.assertTrue(primero.startswith(b"%PDF"))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.descargar(), primero)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_cambio_de_horas_regenera_y_reemplaza(self):
+        self.descargar()
+        anterior = os.listdir(self.cache_dir)
+        inscripcion = InscripcionTurno.objects.create(turno=self.turnos[1], voluntario_id=self.user.persona_id)
+        Asistencia.objects.create(inscripcion=inscripcion, presente=True, horas=2)
+
+        self.descargar()
+        actual = os.listdir(self.cache_dir)
+        self.assertEqual(len(actual), 1)
+        self.assertNotEqual(actual, anterior)
+
+    def test_sin_inscripciones_o_sin_horas(self):
+        Asistencia.objects.update(presente=False)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        InscripcionTurno.objects.all().delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(CERTIFICADOS_WORKERS=1)
+class CertificadoLoteTests(CertificadoTestBase):
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        otro = User.objects.create_user(email="vol2@test.com", password="test", role=User.Roles.VOLUNTARIO)
+        inscripcion = InscripcionTurno.objects.create(turno=self.turnos[1], voluntario_id=otro.persona_id)
+        Asistencia.objects.create(inscripcion=inscripcion, presente=True, horas=4)
+        # Inscripto sin horas: no entra en el lote
+        sin_horas = User.objects.create_user(email="vol3@test.com", password="test", role=User.Roles.VOLUNTARIO)
+        InscripcionTurno.objects.create(turno=self.turnos[1], voluntario_id=sin_horas.persona_id)
+
+        self.admin = User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+        self.url_lote = f"/api/certificado/generacion/lote/{self.voluntariado.pk}/"
+
+    def test_zip_con_un_pdf_por_voluntario_con_horas(self):
+        # El certificado individual ya generado se reutiliza
+        individual = self.descargar()
+        self.client.force_authenticate(self.admin)
+        respuesta = self.client.get(self.url_lote)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["X-Certificados-Total"], "2")
+        with zipfile.ZipFile(io.BytesIO(b"".join(respuesta.streaming_content))) as zf:
+            nombres = zf.namelist()
+            self.assertEqual(len(nombres), 2)
+            self.assertIn(individual, [zf.read(n) for n in nombres])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        # Un código por voluntario; el del certificado individual se reutiliza
+        self.assertEqual(CertificadoEmitido.objects.count(), 2)
+
+    def test_solo_gestionadores(self):
+        self.assertEqual(self.client.get(self.url_lote).status_code, 403)
+
+    def assertMismosValores(self):
+        individual = datos_certificado(self.user.persona_id, self.voluntariado.pk)
+        en_lote = dict(datos_lote(self.voluntariado))[self.user.persona_id]
+        self.assertEqual(individual, en_lote)
+        self.assertEqual(cache_pdf.clave(individual), cache_pdf.clave(en_lote))
+        return individual
+
+    def test_voluntariado_dado_de_baja_no_entra_en_ningun_camino(self):
+        Voluntariado.all_objects.filter(pk=self.voluntariado.pk).update(is_active=False)
+        self.assertIsNone(datos_certificado(self.user.persona_id, self.voluntariado.pk))
+        self.assertEqual(datos_lote(self.voluntariado), [])
+
+    def test_lugar_vacio_igual_en_ambos_caminos(self):
+        Turno.objects.update(lugar="")
+        self.assertEqual(self.assertMismosValores()["ultimo_lugar"], "---")
+        Turno.objects.update(lugar=None)
+        self.assertEqual(self.assertMismosValores()["ultimo_lugar"], "---")
+
+    def test_ultimo_turno_con_fechas_repetidas(self):
+        # Dos turnos el mismo día: gana el de hora_inicio más tarde en ambos caminos
+        temprano = Turno.objects.create(voluntariado=self.voluntariado, fecha=self.turnos[1].fecha, hora_inicio="08:00", hora_fin="09:00", lugar="Temprano")
+        tarde = Turno.objects.create(voluntariado=self.voluntariado, fecha=self.turnos[1].fecha, hora_inicio="18:00", hora_fin="19:00", lugar="Tarde")
+        for turno in (tarde, temprano):
+            InscripcionTurno.objects.create(turno=turno, voluntario_id=self.user.persona_id)
+        self.assertEqual(self.assertMismosValores()["ultimo_lugar"], "Tarde")
+
+    def test_comando_con_pool_de_procesos(self):
+        salida = os.path.join(os.path.dirname(self.cache_dir), "lote.zip")
+        call_command("generar_certificados", self.voluntariado.pk, output=salida, workers=2, stdout=io.StringIO())
+        with zipfile.ZipFile(salida) as zf:
+            self.assertEqual(len(zf.namelist()), 2)
+            self.assertTrue(all(zf.read(n).startswith(b"%PDF") for n in zf.namelist()))
+
+
+
+class CertificadoPlantillaTests(CertificadoTestBase):
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.admin = User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+
+    def imagen(self, tamano=(3000, 2000), modo="RGBA", color=(200, 30, 30, 128)):
+        salida = io.BytesIO()
+        Image.new(modo, tamano, color).save(salida, format="PNG")
+        return salida.getvalue()
+
+    def subir(self, contenido, nombre="plantilla.png"):
+        cliente = APIClient()
+        cliente.force_authenticate(self.admin)
+        return cliente.post("/api/certificado/plantilla/", {"imagen": SimpleUploadedFile(nombre, contenido)}, format="multipart")
+
+    def variantes(self):
+        return sorted(f for f in os.listdir(plantilla.directorio()) if f.endswith(".jpg"))
+
+    def test_subida_genera_variante_reducida_y_versionada(self):
+        original = self.imagen()
+        self.assertEqual(self.subir(original).status_code, 200)
+        with open(plantilla.ruta_original(), "rb") as archivo:
+            self.assertEqual(archivo.read(), original)
+        version = plantilla.version_actual()
+        self.assertEqual(self.variantes(), [f"template_certificado_{version}.jpg"])
+        with Image.open(plantilla.ruta_variante(version)) as variante:
+            self.assertEqual((variante.format, variante.mode), ("JPEG", "RGB"))
+            self.assertEqual(variante.size, plantilla.tamano_impresion())
+
+        # Una plantilla nueva reemplaza la variante y regenera los certificados
+        primero = self.descargar()
+        self.assertEqual(self.subir(self.imagen(tamano=(800, 600), modo="RGB", color=(0, 0, 255))).status_code, 200)
+        self.assertNotEqual(plantilla.version_actual(), version)
+        self.assertEqual(len(self.variantes()), 1)
+        with Image.open(plantilla.ruta_variante(plantilla.version_actual())) as variante:
+            self.assertEqual(variante.size, (800, 600))  # no se agranda
+        self.assertNotEqual(self.descargar(), primero)
+
+    def test_rechaza_archivos_que_no_son_imagenes(self):
+        respuesta = self.subir(b"no es una imagen")
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(os.path.exists(plantilla.ruta_original()))
+
+    def test_plantilla_previa_se_procesa_y_se_decodifica_una_vez(self):
+        # Plantilla subida antes de que existieran las variantes: solo el original
+        os.makedirs(plantilla.directorio())
+        with open(plantilla.ruta_original(), "wb") as archivo:
+            archivo.write(self.imagen())
+
+        with mock.patch.object(plantilla, "ImageReader", wraps=plantilla.ImageReader) as lector:
+            self.descargar()
+            Asistencia.objects.update(horas=5)
+            self.descargar()
+        self.assertEqual(lector.call_count, 1)
+        self.assertEqual(len(self.variantes()), 1)
+
+
+class CertificadoVerificacionTests(CertificadoTestBase):
+
+    def verificar(self, codigo):
+        return APIClient().get(f"/api/certificado/verificar/{codigo}/")
+
+    def test_certificado_emitido_se_verifica_por_codigo(self):
+        self.descargar()
+        registro = CertificadoEmitido.objects.get()
+        self.assertEqual((registro.voluntario_id, registro.voluntariado_id, registro.horas), (self.user.persona_id, self.voluntariado.pk, 3))
+
+        with self.assertNumQueries(1):
+            respuesta = self.verificar(formatear_codigo(registro.codigo).lower())
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.data["valido"])
+        self.assertEqual(respuesta.data["codigo"], formatear_codigo(registro.codigo))
+        self.assertEqual((respuesta.data["voluntariado"], respuesta.data["horas"]), ("Voluntariado", 3.0))
+        self.assertNotIn("dni", respuesta.data)
+
+    def test_mismo_contenido_mismo_codigo_y_nuevas_horas_nuevo_codigo(self):
+        self.descargar()
+        # Aunque se borre el almacén, el mismo certificado conserva su código
+        for nombre in os.listdir(self.cache_dir):
+            os.unlink(os.path.join(self.cache_dir, nombre))
+        self.descargar()
+        self.assertEqual(CertificadoEmitido.objects.count(), 1)
+
+        Asistencia.objects.update(horas=5)
+        self.descargar()
+        anterior, actual = CertificadoEmitido.objects.order_by("id")
+        self.assertNotEqual(anterior.codigo, actual.codigo)
+        self.assertEqual(actual.horas, 5)
+        self.assertEqual(self.verificar(anterior.codigo).status_code, 200)
+
+    def test_codigo_repetido_se_reemplaza(self):
+        self.descargar()
+        existente = CertificadoEmitido.objects.get()
+        otro = get_user_model().objects.create_user(email="vol2@test.com", password="test", role=get_user_model().Roles.VOLUNTARIO)
+        codigos = iter([existente.codigo, existente.codigo, "NUEVOCOD" + "A" * 8])
+        with mock.patch("apps.certificado.models.generar_codigo", side_effect=lambda: next(codigos)):
+            # El lote descarta la fila que choca (ignore_conflicts) y la registra de a una con otro código
+            resultado = CertificadoEmitido.registrar_lote(self.voluntariado.pk, [(otro.persona_id, "h", 2)])
+        self.assertEqual(resultado[otro.persona_id, "h"], "NUEVOCOD" + "A" * 8)
+        self.assertEqual(CertificadoEmitido.objects.count(), 2)
+
+    def test_codigo_con_firma_invalida_no_consulta_la_base(self):
+        self.descargar()
+        codigo = CertificadoEmitido.objects.get().codigo
+        falso = codigo[:-1] + ("A" if codigo[-1] != "A" else "B")
+        with self.assertNumQueries(0):
+            respuesta = self.verificar(falso)
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertFalse(respuesta.data["valido"])
+        self.assertEqual(self.verificar("corto").status_code, 404)
@@ -5,6 +5,8 @@ from .views import (
     generar_por_valores_admin,
     generar_por_voluntariado,
     horas_por_voluntariado,
+    generar_lote,
+    verificar_certificado,
 )
 
 urlpatterns = [
@@ -14,6 +16,12 @@ urlpatterns = [
     # Endpoint to get total horas for the authenticated user and a given voluntariado
     path('generacion/horas-por-voluntariado/<int:voluntariado_id>/', horas_por_voluntariado, name='horas-por-voluntariado'),
 
+    # Certificados de todo un voluntariado en un ZIP (gestionadores)
+    path('generacion/lote/<int:voluntariado_id>/', generar_lote, name='generar-lote'),
+
+    # Verificación pública de un certificado por su código
+    path('verificar/<str:codigo>/', verificar_certificado, name='verificar-certificado'),
+
     # Subir / reemplazar plantilla
     path('plantilla/', upload_template, name='upload-template'),
 
@@ -1,22 +1,25 @@
+import io
 import os
 from datetime import datetime
 
 from django.conf import settings
 import logging
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db.models import F, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.generics import get_object_or_404
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 
+from PIL import Image
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib.utils import ImageReader
 
 from apps.asistencia.models import Asistencia
 from apps.persona.models import Voluntario
 from apps.voluntariado.models import InscripcionTurno, Voluntariado
+from . import cache_pdf, lote, plantilla
+from .models import CertificadoEmitido, formatear_codigo, normalizar_codigo
 
 logger = logging.getLogger(__name__)
 
@@ -66,66 +69,117 @@ def upload_template(request):
     if file.size > 2 * 1024 * 1024:  # 2 MB
         return Response({"detail": "El archivo no debe superar los 2 MB."}, status=400)
 
-    # Guardar en media/plantillas/template_certificado.png (sobrescribe)
-    plantillas_dir = os.path.join(settings.MEDIA_ROOT, "plantillas")
-    os.makedirs(plantillas_dir, exist_ok=True)
-    file_path = os.path.join(plantillas_dir, "template_certificado.png")
-
-    with open(file_path, "wb+") as destination:
+    # Variante para imprimir (A4 apaisado, JPEG); de paso valida que sea una imagen
+    try:
+        variante = plantilla.procesar(file)
+    except (OSError, Image.DecompressionBombError):
+        return Response({"detail": "El archivo no es una imagen válida."}, status=400)
+
+    # Guardar el original en media/plantillas/template_certificado.png (sobrescribe): es el que muestra el frontend
+    os.makedirs(plantilla.directorio(), exist_ok=True)
+    file.seek(0)
+    with open(plantilla.ruta_original(), "wb+") as destination:
         for chunk in file.chunks():
             destination.write(chunk)
+    plantilla.publicar(variante)
 
     return Response({"detail": "Plantilla actualizada correctamente."})
 
 
-def generar_certificado_pdf(voluntario, voluntariado):
-    # Delegate to generic generator by extracting values
-    # Inscripciones
-    inscripciones = InscripcionTurno.objects.filter(
-        voluntario=voluntario,
-        turno__voluntariado_id=voluntariado.id
+# Último turno de un voluntario: orden total, así el certificado individual y el lote eligen la misma fila
+ORDEN_ULTIMO_TURNO = ('-turno__fecha', '-turno__hora_inicio', '-id')
+
+
+def lugar_certificado(campo='turno__lugar'):
+    """Lugar que se imprime: Turno.lugar admite NULL y '', y en ambos casos se imprime '---'."""
+    return Coalesce(NullIf(campo, Value('')), Value('---'))
+
+
+def inscripciones_certificado(voluntariado_id, **filtros):
+    """Inscripciones activas de un voluntariado activo que entran en los certificados (individual y lote)."""
+    return InscripcionTurno.objects.filter(
+        turno__voluntariado_id=voluntariado_id,
+        turno__voluntariado__is_active=True,
+        **filtros,
     )
-    if not inscripciones.exists():
-        return None, "No se encontraron inscripciones para este voluntariado."
 
-    # Total de horas
-    total_horas = (
+
+def datos_certificado(voluntario_id, voluntariado_id):
+    """
+    Valores del certificado (los de generar_certificado_pdf_from_values) en una sola consulta:
+    datos del voluntario y del voluntariado, último turno y total de horas presentes.
+    Retorna None si el voluntario no tiene inscripciones en el voluntariado.
+    """
+    inscripciones = inscripciones_certificado(voluntariado_id, voluntario_id=voluntario_id)
+    horas = (
         Asistencia.objects
         .filter(inscripcion__in=inscripciones, presente=True)
-        .aggregate(total=Sum('horas'))['total'] or 0
+        .order_by()
+        .values('presente')
+        .annotate(total=Sum('horas'))
+        .values('total')
+    )
+    # Último turno, con los datos del voluntario / voluntariado por JOIN y las horas como subconsulta
+    return (
+        inscripciones
+        .order_by(*ORDEN_ULTIMO_TURNO)
+        .values(
+            nombre=F('voluntario__nombre'),
+            apellido=F('voluntario__apellido'),
+            dni=F('voluntario__dni'),
+            voluntariado_nombre=F('turno__voluntariado__nombre'),
+            fecha_fin_cursado=F('turno__voluntariado__fecha_fin_cursado'),
+            ultima_fecha=F('turno__fecha'),
+            ultimo_lugar=lugar_certificado(),
+        )
+        .annotate(total_horas=Subquery(horas))
+        .first()
     )
 
+
+def generar_certificado(voluntario_id, voluntariado_id):
+    """
+    Certificado de un voluntario para un voluntariado: una consulta (datos_certificado) y, si ya se
+    generó con los mismos datos y la misma plantilla, el PDF guardado en disco (ver cache_pdf).
+    Retorna (FileResponse, None) en éxito o (None, error_message) en fallo.
+    """
+    valores = datos_certificado(voluntario_id, voluntariado_id)
+    if valores is None:
+        return None, "No se encontraron inscripciones para este voluntariado."
+
     # Si no hay horas registradas, no generar certificado
+    total_horas = valores['total_horas']
     if not total_horas or float(total_horas) <= 0:
         return None, "No hay horas registradas para este voluntariado."
 
-    # Último turno
-    ultima_inscripcion = (
-        inscripciones
-        .select_related('turno')
-        .order_by('-turno__fecha')
-        .first()
-    )
-    ultima_fecha = ultima_inscripcion.turno.fecha
-    ultimo_lugar = ultima_inscripcion.turno.lugar or '---'
+    # El texto cambia cuando el voluntariado termina: también entra en la huella
+    huella = cache_pdf.clave({**valores, 'activo': _voluntariado_activo(valores['fecha_fin_cursado'])})
+    archivo = None
+    ruta = cache_pdf.buscar(voluntario_id, voluntariado_id, huella)
+    if ruta is not None:
+        try:
+            archivo = open(ruta, 'rb')
+        except FileNotFoundError:
+            pass  # reemplazado por otro proceso entre buscar y abrir: se genera de nuevo
+    if archivo is None:
+        codigo = CertificadoEmitido.registrar(voluntario_id, voluntariado_id, huella, total_horas)
+        contenido = io.BytesIO()
+        _dibujar_certificado(contenido, codigo=codigo, **valores)
+        cache_pdf.guardar(voluntario_id, voluntariado_id, huella, contenido.getvalue())
+        contenido.seek(0)
+        archivo = contenido
 
-    # Valores necesarios
-    nombre = voluntario.nombre
-    apellido = voluntario.apellido
-    dni = voluntario.dni
-    voluntariado_nombre = voluntariado.nombre
-    fecha_fin = getattr(voluntariado, 'fecha_fin_cursado', None)
+    filename = f"certificado_{valores['apellido']}_{valores['nombre']}.pdf"
+    return FileResponse(archivo, as_attachment=True, filename=filename, content_type='application/pdf'), None
 
-    return generar_certificado_pdf_from_values(
-        nombre=nombre,
-        apellido=apellido,
-        dni=dni,
-        voluntariado_nombre=voluntariado_nombre,
-        fecha_fin_cursado=fecha_fin,
-        ultima_fecha=ultima_fecha,
-        ultimo_lugar=ultimo_lugar,
-        total_horas=total_horas,
-    )
+
+def generar_certificado_pdf(voluntario, voluntariado):
+    return generar_certificado(voluntario.pk, voluntariado.pk)
+
+
+def _voluntariado_activo(fecha_fin_cursado):
+    hoy = datetime.now().date()
+    return bool(fecha_fin_cursado and fecha_fin_cursado > hoy)
 
 
 def generar_certificado_pdf_from_values(
@@ -138,25 +192,52 @@ def generar_certificado_pdf_from_values(
     ultima_fecha,
     ultimo_lugar: str,
     total_horas: float,
+    codigo: str = None,
 ):
     """
     Generic PDF generator that accepts primitive values instead of model instances.
+    `codigo` is the verification code from CertificadoEmitido (not printed if None).
     Returns (HttpResponse, None) on success or (None, error_message) on failure.
     """
-    # Plantilla
-    fondo_path = os.path.join(settings.MEDIA_ROOT, "plantillas", "template_certificado.png")
-
     # PDF
     response = HttpResponse(content_type='application/pdf')
     filename = f"certificado_{apellido}_{nombre}.pdf"
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
+    _dibujar_certificado(
+        response,
+        nombre=nombre,
+        apellido=apellido,
+        dni=dni,
+        voluntariado_nombre=voluntariado_nombre,
+        fecha_fin_cursado=fecha_fin_cursado,
+        ultima_fecha=ultima_fecha,
+        ultimo_lugar=ultimo_lugar,
+        total_horas=total_horas,
+        codigo=codigo,
+    )
+    return response, None
+
+
+def _dibujar_certificado(
+    destino,
+    *,
+    nombre,
+    apellido,
+    dni,
+    voluntariado_nombre,
+    fecha_fin_cursado,
+    ultima_fecha,
+    ultimo_lugar,
+    total_horas,
+    codigo=None,
+):
+    """Dibuja el certificado sobre `destino` (cualquier objeto tipo archivo: HttpResponse, BytesIO)."""
     width, height = landscape(A4)
-    c = canvas.Canvas(response, pagesize=(width, height))
+    c = canvas.Canvas(destino, pagesize=(width, height))
 
     # Fondo si existe
-    if os.path.exists(fondo_path):
-        c.drawImage(ImageReader(fondo_path), 0, 0, width=width, height=height)
+    plantilla.dibujar_fondo(c, width, height)
 
     # Posiciones base
     offset_x = 210
@@ -185,8 +266,7 @@ def generar_certificado_pdf_from_values(
     c.drawText(textobj)
 
     # Determinar si el voluntariado está activo o finalizado
-    hoy = datetime.now().date()
-    voluntariado_activo = bool(fecha_fin_cursado and fecha_fin_cursado > hoy)
+    voluntariado_activo = _voluntariado_activo(fecha_fin_cursado)
 
     # Texto 2 (condicional)
     if voluntariado_activo:
@@ -241,9 +321,15 @@ def generar_certificado_pdf_from_values(
     c.drawRightString(width - 60, 200, fecha_str)
     c.drawRightString(width - 60, 185, "Universidad Nacional de Cuyo, Mendoza, Argentina")
 
+    # Código de verificación (registro CertificadoEmitido)
+    if codigo:
+        c.setFont("Helvetica", 9)
+        c.drawString(40, 40, f"Código de verificación: {formatear_codigo(codigo)}")
+        if settings.CERTIFICADOS_VERIFICACION_URL:
+            c.drawString(40, 28, f"Verificalo en {settings.CERTIFICADOS_VERIFICACION_URL}")
+
     c.showPage()
     c.save()
-    return response, None
 
 
 def generar_certificado_para_usuario(voluntario_usuario, usuario, voluntariado_id):
@@ -255,16 +341,20 @@ def generar_certificado_para_usuario(voluntario_usuario, usuario, voluntariado_i
 
     Retorna (HttpResponse, None) en éxito o (None, error_message) en fallo.
     """
-    # Resolver voluntario asociado al usuario si no fue provisto
-    if voluntario_usuario is None:
-        voluntario_usuario = Voluntario.objects.filter(pk=getattr(usuario, "persona_id", None)).first()
+    # Resolver voluntario asociado al usuario si no fue provisto: la persona de un usuario con rol
+    # Voluntario es su Voluntario, así que alcanza con su id (el resto sale de datos_certificado)
+    if voluntario_usuario is not None:
+        voluntario_id = voluntario_usuario.pk
+    elif getattr(usuario, "role", None) == "VOL":
+        voluntario_id = getattr(usuario, "persona_id", None)
+    else:
+        voluntario_id = None
 
     # Solo voluntarios pueden solicitar su propio certificado por este endpoint
-    if not voluntario_usuario:
+    if not voluntario_id:
         return None, "No se encontró voluntario asociado a tu usuario."
 
-    voluntariado = get_object_or_404(Voluntariado, pk=voluntariado_id)
-    return generar_certificado_pdf(voluntario_usuario, voluntariado)
+    return generar_certificado(voluntario_id, voluntariado_id)
 
 
 @api_view(["GET"])
@@ -279,7 +369,7 @@ def generar_por_voluntariado(request, voluntariado_id=None):
     try:
         response, error = generar_certificado_para_usuario(None, usuario, voluntariado_id)
     except Exception as e:
-        # Unexpected exception (get_object_or_404 will normally raise Http404 and be handled by DRF)
+        # Unexpected exception (errores esperados vuelven como mensaje en `error`)
         logger.exception(
             "Unexpected error while generating certificado for user=%s voluntariado=%s: %s",
             getattr(usuario, "id", None),
@@ -355,7 +445,6 @@ def generar_desde_admin(request):
     if not voluntario:
         return Response({"detail": f"No se encontró voluntario con DNI {dni}."}, status=404)
 
-    from apps.voluntariado.models import Voluntariado
     voluntariado = Voluntariado.objects.filter(id=voluntariado_id).first()
     if not voluntariado:
         return Response({"detail": "No se encontró el voluntariado."}, status=404)
@@ -378,6 +467,8 @@ def generar_por_valores_admin(request):
     Query param or JSON field 'format' can be 'pdf' (default) or 'image'. If 'image'
     is requested the view will try to convert the generated PDF to PNG and return it.
     If conversion dependencies are missing, it will fall back to returning PDF.
+    The values are free-form (not tied to a Voluntario / Voluntariado), so this is a preview:
+    it is not recorded in CertificadoEmitido and prints no verification code.
     """
     user = request.user
     if not (user and getattr(user, 'role', None) == 'ADMIN'):
@@ -431,3 +522,75 @@ def generar_por_valores_admin(request):
         return Response({'detail': error}, status=400)
 
     return response_pdf
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def generar_lote(request, voluntariado_id=None):
+    """
+    Certificados de todos los voluntarios con horas en el voluntariado, como un ZIP en streaming.
+    Solo gestionadores: ADMIN para cualquier voluntariado, DELEG para los de su organización.
+    El encabezado X-Certificados-Total trae la cantidad de certificados del ZIP.
+    URL: GET /generacion/lote/<voluntariado_id>/
+    """
+    principal = request.user.principal
+    voluntariado = Voluntariado.objects.filter(pk=voluntariado_id).first()
+    if voluntariado is None:
+        return Response({"detail": "No se encontró el voluntariado."}, status=404)
+    if not (principal.es_gestionador and principal.puede_gestionar(voluntariado.organizacion_id)):
+        return Response({"detail": "No tenés permiso para generar los certificados de este voluntariado."}, status=403)
+
+    datos = lote.datos_lote(voluntariado)
+    if not datos:
+        return Response({"detail": "No hay voluntarios con horas registradas en este voluntariado."}, status=404)
+
+    archivos = lote.certificados(
+        voluntariado,
+        datos,
+        workers=settings.CERTIFICADOS_WORKERS,
+        progreso=lote.registrar_progreso(voluntariado.pk),
+    )
+    response = StreamingHttpResponse(lote.zip_en_streaming(archivos), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="certificados_voluntariado_{voluntariado.pk}.zip"'
+    response["X-Certificados-Total"] = str(len(datos))
+    return response
+
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def verificar_certificado(request, codigo=None):
+    """
+    Verificación pública de un certificado por el código impreso en el PDF (con o sin guiones).
+    Responde desde el registro CertificadoEmitido con una consulta por índice único, sin generar el
+    PDF ni sumar horas; los códigos con firma inválida se rechazan sin consultar la base.
+    URL: GET /verificar/<codigo>/
+    """
+    normalizado = normalizar_codigo(codigo)
+    registro = None
+    if normalizado is not None:
+        registro = (
+            CertificadoEmitido.objects
+            .filter(codigo=normalizado)
+            .values(
+                'horas',
+                'emitido_en',
+                nombre=F('voluntario__nombre'),
+                apellido=F('voluntario__apellido'),
+                voluntariado_nombre=F('voluntariado__nombre'),
+            )
+            .first()
+        )
+    if registro is None:
+        return Response({"valido": False, "detail": "No existe un certificado con ese código."}, status=404)
+
+    return Response({
+        "valido": True,
+        "codigo": formatear_codigo(normalizado),
+        "nombre": registro['nombre'],
+        "apellido": registro['apellido'],
+        "voluntariado": registro['voluntariado_nombre'],
+        "horas": float(registro['horas']),
+        "emitido_en": registro['emitido_en'],
+    })
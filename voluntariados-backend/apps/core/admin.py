@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.safestring import mark_safe
-from .models import LandingConfig
+from .models import LandingConfig, HistorialArchivado
 
 
 @admin.register(LandingConfig)
@@ -99,4 +99,18 @@ class LandingConfigAdmin(admin.ModelAdmin):
                 setattr(existing, field, form.cleaned_data[field])
             existing.save()
         else:
-            super().save_model(request, obj, form, change)
\ No newline at end of file
+            super().save_model(request, obj, form, change)
+
+
+@admin.register(HistorialArchivado)
+class HistorialArchivadoAdmin(admin.ModelAdmin):
+    list_display = ('modelo', 'object_id', 'history_type', 'history_date', 'archivado_at')
+    list_filter = ('modelo', 'history_type')
+    search_fields = ('object_id',)
+    date_hierarchy = 'history_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
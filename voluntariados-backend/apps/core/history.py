@@ -0,0 +1,325 @@
+"""
+Escritura agrupada del historial de django-simple-history.
+
+- BufferedHistoricalRecords reemplaza a HistoricalRecords en los modelos auditados.
+- Dentro de `history_buffer()` (context manager o decorador) los registros históricos se acumulan
+  y se insertan con un bulk_create por modelo al terminar el bloque, antes del commit.
+- Los modelos listados en settings.HISTORY_DEFERRED_MODELS ("app_label.Modelo") escriben su historial
+  después del commit, fuera de la transacción de la request: cada commit encola sus registros y un único
+  hilo por proceso los inserta (juntando lo encolado en un bulk_create por modelo), con reintentos, y
+  termina de escribir lo pendiente al salir el proceso.
+- `archivar_historial()` (comando `archivar_historial`) saca de las tablas Historical* los registros
+  más viejos que settings.HISTORY_RETENTION, hacia core_historial_archivado o a archivos JSONL comprimidos.
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from simple_history.models import HistoricalRecords
+from simple_history.utils import get_history_model_for_model
+from simple_history.signals import pre_create_historical_record, post_create_historical_record
+
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Escritura diferida: cola de {(modelo histórico, base): [registros]} y el hilo que la vacía
+_cola = queue.Queue()
+_hilo = None
+_hilo_lock = threading.Lock()
+_FIN = object()
+REINTENTOS = 3
+# Segundos que el proceso espera al salir a que se escriba lo pendiente
+ESPERA_AL_SALIR = 10
+
+
+def _buffer_actual():
+    return getattr(_local, "buffer", None)
+
+
+def _es_diferido(model):
+    return model._meta.label in getattr(settings, "HISTORY_DEFERRED_MODELS", ())
+
+
+def _escribir(pendientes):
+    """Inserta los registros históricos: un bulk_create por (modelo histórico, base de datos)."""
+    for (historical_model, using), filas in pendientes.items():
+        historical_model.objects.using(using).bulk_create([f["history_instance"] for f in filas])
+        for fila in filas:
+            post_create_historical_record.send(sender=historical_model, **fila)
+
+
+def _escribir_despues_del_commit(pendientes, using=None):
+    transaction.on_commit(lambda: _encolar(pendientes), using=using)
+
+
+def _encolar(pendientes):
+    global _hilo
+    with _hilo_lock:
+        # También después de un fork: el hilo del proceso padre no existe en el hijo
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_trabajar, name="historial-diferido", daemon=True)
+            _hilo.start()
+    _cola.put(pendientes)
+
+
+def _trabajar():
+    try:
+        fin = False
+        while not fin:
+            lote = defaultdict(list)
+            tomados = 0
+            elemento = _cola.get()
+            # Junta lo que ya esté encolado: un bulk_create por modelo para varios commits
+            while True:
+                tomados += 1
+                if elemento is _FIN:
+                    fin = True
+                    break
+                for clave, filas in elemento.items():
+                    lote[clave].extend(filas)
+                try:
+                    elemento = _cola.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                _escribir_con_reintentos(lote)
+            finally:
+                for _ in range(tomados):
+                    _cola.task_done()
+    finally:
+        connections.close_all()
+
+
+def _escribir_con_reintentos(lote):
+    for (historical_model, using), filas in lote.items():
+        for intento in range(1, REINTENTOS + 1):
+            try:
+                close_old_connections()
+                with transaction.atomic(using=using):
+                    _escribir({(historical_model, using): filas})
+                break
+            except Exception:
+                if intento == REINTENTOS:
+                    logger.exception(
+                        "No se pudo escribir el historial diferido de %s: se pierden %s registros",
+                        historical_model._meta.label, len(filas),
+                    )
+                else:
+                    logger.warning(
+                        "Falló la escritura del historial diferido de %s (intento %s de %s)",
+                        historical_model._meta.label, intento, REINTENTOS, exc_info=True,
+                    )
+                    time.sleep(intento)
+
+
+def esperar_historial_diferido():
+    """Bloquea hasta que el hilo escribió todo lo encolado (comandos, tests)."""
+    if _hilo is not None and _hilo.is_alive():
+        _cola.join()
+
+
+@atexit.register
+def detener_historial_diferido(espera=ESPERA_AL_SALIR):
+    """Al salir el proceso: escribe lo pendiente y termina el hilo."""
+    if _hilo is None or not _hilo.is_alive():
+        return
+    _cola.put(_FIN)
+    _hilo.join(espera)
+    if _hilo.is_alive():
+        logger.error("El historial diferido no terminó de escribirse en %s s: quedan %s lotes en cola", espera, _cola.qsize())
+
+
+@contextmanager
+def history_buffer(using=None):
+    """
+    Acumula los registros históricos del bloque y los inserta al final en un bulk_create por modelo,
+    dentro de la misma transacción (el bloque corre en transaction.atomic). Anidado, se suma al buffer externo.
+    Nota: si un atomic interno hace rollback sin propagar la excepción, lo que ya guardó queda en el buffer;
+    usarlo en bloques que no atrapen sus propios errores de base de datos.
+    """
+    if _buffer_actual() is not None:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    with transaction.atomic(using=using):
+        _local.buffer = {"inmediatos": defaultdict(list), "diferidos": defaultdict(list)}
+        try:
+            yield
+            buffer = _local.buffer
+        finally:
+            _local.buffer = None
+        _escribir(buffer["inmediatos"])
+        if buffer["diferidos"]:
+            _escribir_despues_del_commit(buffer["diferidos"], using=using)
+
+
+class BufferedHistoricalRecords(HistoricalRecords):
+    """HistoricalRecords que respeta history_buffer() y HISTORY_DEFERRED_MODELS."""
+
+    def get_history_user(self, instance):
+        user = super().get_history_user(instance)
+        # Con autenticación por claims (apps.users.authentication.ClaimsUser) el usuario no es una instancia
+        # del modelo: alcanza con la pk para la FK del historial
+        if user is not None and not hasattr(user, "_meta"):
+            from django.contrib.auth import get_user_model
+            return get_user_model()(pk=user.pk)
+        return user
+
+    def create_historical_record(self, instance, history_type, using=None):
+        buffer = _buffer_actual()
+        diferido = _es_diferido(type(instance))
+        if buffer is None and not diferido:
+            return super().create_historical_record(instance, history_type, using=using)
+
+        using = using if self.use_base_model_db else None
+        history_instance, datos = self._construir_registro(instance, history_type, using)
+        if history_instance._history_m2m_fields:
+            # Las tablas m2m del historial necesitan el id del registro: se guarda en el momento
+            history_instance.save(using=using)
+            self.create_historical_record_m2ms(history_instance, instance)
+            post_create_historical_record.send(sender=type(history_instance), **datos)
+            return
+
+        clave = (type(history_instance), using)
+        if buffer is None:
+            _escribir_despues_del_commit({clave: [datos]}, using=using)
+        else:
+            buffer["diferidos" if diferido else "inmediatos"][clave].append(datos)
+
+    def _construir_registro(self, instance, history_type, using):
+        """Arma el registro histórico sin guardarlo (mismos campos y señales que HistoricalRecords)."""
+        history_date = getattr(instance, "_history_date", timezone.now())
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(instance, history_type, using)
+        manager = getattr(instance, self.manager_name)
+
+        attrs = {}
+        for field in self.fields_included(instance):
+            attrs[field.attname] = getattr(instance, field.attname)
+
+        relation_field = getattr(manager.model, "history_relation", None)
+        if relation_field is not None:
+            attrs["history_relation"] = instance
+
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+        pre_create_historical_record.send(
+            sender=manager.model,
+            instance=instance,
+            history_date=history_date,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            history_instance=history_instance,
+            using=using,
+        )
+        datos = {
+            "instance": instance,
+            "history_instance": history_instance,
+            "history_date": history_date,
+            "history_user": history_user,
+            "history_change_reason": history_change_reason,
+            "using": using,
+        }
+        return history_instance, datos
+
+
+# --- Retención ---
+
+MODO_TABLA = "tabla"
+MODO_JSONL = "jsonl"
+
+
+def modelos_historicos():
+    """Modelos Historical* de todos los modelos auditados."""
+    return [
+        get_history_model_for_model(model)
+        for model in apps.get_models()
+        if hasattr(model._meta, "simple_history_manager_attribute")
+    ]
+
+
+def registros_vencidos(historical_model, antes_de):
+    """
+    Registros anteriores a `antes_de`, salvo el último de cada objeto: así instance.history.first()
+    y la vista de historial del admin siguen mostrando el estado vigente.
+    """
+    object_id = historical_model.instance_type._meta.pk.attname
+    mas_nuevos = historical_model.objects.filter(
+        **{object_id: OuterRef(object_id)}, history_date__gt=OuterRef("history_date")
+    )
+    return historical_model.objects.filter(history_date__lt=antes_de).filter(Exists(mas_nuevos))
+
+
+def archivar_historial(historical_model, antes_de, modo=MODO_TABLA, lote=2000, directorio=None):
+    """
+    Mueve los registros vencidos de `historical_model` por lotes de `lote` filas: cada lote se copia
+    (a HistorialArchivado o al archivo `<directorio>/<modelo>-<fecha>.jsonl.gz`) y se borra en la misma
+    transacción, así que cortar el comando a mitad de camino no pierde registros (en modo JSONL, un corte
+    entre la escritura y el commit puede dejar el último lote repetido en el archivo).
+    Retorna la cantidad de registros archivados.
+    """
+    from apps.core.models import HistorialArchivado
+
+    label = historical_model._meta.label
+    object_id = historical_model.instance_type._meta.pk.attname
+    vencidos = registros_vencidos(historical_model, antes_de).order_by("history_id")
+
+    archivo = None
+    total = 0
+    try:
+        while True:
+            with transaction.atomic():
+                ids = list(vencidos.values_list("history_id", flat=True)[:lote])
+                if not ids:
+                    break
+                filas = list(historical_model.objects.filter(history_id__in=ids).order_by("history_id").values())
+                if modo == MODO_JSONL:
+                    if archivo is None:
+                        os.makedirs(directorio, exist_ok=True)
+                        nombre = f"{label.lower()}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+                        archivo = gzip.open(os.path.join(directorio, nombre), "at", encoding="utf-8")
+                    for fila in filas:
+                        archivo.write(json.dumps({"modelo": label, **fila}, cls=DjangoJSONEncoder) + "\n")
+                    # El lote tiene que estar en disco antes de borrarlo de la base
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                else:
+                    HistorialArchivado.objects.bulk_create([
+                        HistorialArchivado(
+                            modelo=label,
+                            history_id=fila["history_id"],
+                            object_id=str(fila[object_id]),
+                            history_date=fila["history_date"],
+                            history_type=fila["history_type"],
+                            history_user_id=fila.get("history_user_id"),
+                            datos=fila,
+                        )
+                        for fila in filas
+                    ])
+                historical_model.objects.filter(history_id__in=ids).delete()
+                total += len(ids)
+    finally:
+        if archivo is not None:
+            archivo.close()
+    return total
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.history import (
+    MODO_JSONL, MODO_TABLA, archivar_historial, modelos_historicos, registros_vencidos,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los registros de historial (tablas Historical*) más viejos que la retención configurada "
+        "(settings.HISTORY_RETENTION) a core_historial_archivado o a archivos JSONL comprimidos. "
+        "Siempre conserva el último registro de cada objeto. Ejecutar periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        retencion = settings.HISTORY_RETENTION
+        parser.add_argument(
+            "--months", type=int, default=retencion["MONTHS"],
+            help="Antigüedad mínima (en meses de 30 días) de los registros a archivar.",
+        )
+        parser.add_argument("--mode", choices=[MODO_TABLA, MODO_JSONL], default=retencion["MODE"])
+        parser.add_argument(
+            "--directory", default=retencion["DIRECTORY"], help="Directorio de los .jsonl.gz (modo jsonl)."
+        )
+        parser.add_argument("--batch-size", type=int, default=retencion["BATCH_SIZE"])
+        parser.add_argument(
+            "--model", action="append", dest="modelos",
+            help='Limitar a un modelo auditado ("app_label.Modelo"); se puede repetir.',
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Solo contar los registros a archivar.")
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months debe ser al menos 1")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser al menos 1")
+
+        historicos = modelos_historicos()
+        if options["modelos"]:
+            pedidos = set(options["modelos"])
+            historicos = [h for h in historicos if h.instance_type._meta.label in pedidos]
+            faltantes = pedidos - {h.instance_type._meta.label for h in historicos}
+            if faltantes:
+                raise CommandError(f"Modelos sin historial: {', '.join(sorted(faltantes))}")
+
+        antes_de = timezone.now() - timedelta(days=30 * options["months"])
+        self.stdout.write(f"Archivando historial anterior a {antes_de:%Y-%m-%d} (modo {options['mode']}).")
+
+        total = 0
+        for historical_model in historicos:
+            if options["dry_run"]:
+                cantidad = registros_vencidos(historical_model, antes_de).count()
+            else:
+                cantidad = archivar_historial(
+                    historical_model,
+                    antes_de,
+                    modo=options["mode"],
+                    lote=options["batch_size"],
+                    directorio=options["directory"],
+                )
+            total += cantidad
+            self.stdout.write(f"  {historical_model._meta.label}: {cantidad}")
+
+        accion = "a archivar" if options["dry_run"] else "archivados"
+        self.stdout.write(self.style.SUCCESS(f"Registros {accion}: {total}."))
@@ -0,0 +1,97 @@
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.asistencia.models import Asistencia
+from apps.voluntariado.models import Turno, InscripcionTurno, InscripcionConvocatoria
+
+
+ACTIVOS = [InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
+
+
+def consultas_criticas():
+    """
+    Consultas de los caminos más usados, con el índice parcial (is_active=True) que deberían usar
+    (None: cualquier índice sirve). Los valores de los filtros no importan: solo se mira el plan.
+    """
+    return [
+        ("inscripciones de un turno por estado",
+         InscripcionTurno.objects.filter(turno_id=1, estado__in=ACTIVOS),
+         "insc_turno_estado_act_idx"),
+        ("lista de espera de un turno",
+         InscripcionTurno.objects.filter(turno_id=1, estado=InscripcionTurno.Status.EN_ESPERA).order_by("en_espera_desde"),
+         "insc_turno_estado_act_idx"),
+        ("inscripciones de un voluntario por estado",
+         InscripcionTurno.objects.filter(voluntario_id=1, estado__in=ACTIVOS),
+         "insc_vol_estado_act_idx"),
+        ("convocatoria de un voluntariado por estado",
+         InscripcionConvocatoria.objects.filter(voluntariado_id=1, estado=InscripcionConvocatoria.Status.INSCRITO),
+         "insc_conv_vdo_estado_act_idx"),
+        ("convocatoria de un voluntario en un voluntariado",
+         InscripcionConvocatoria.objects.filter(voluntario_id=1, voluntariado_id=1),
+         "insc_conv_vol_vdo_act_idx"),
+        ("turnos de un voluntariado por fecha",
+         Turno.objects.filter(voluntariado_id=1, fecha__gte=date.today()),
+         "turno_vdo_fecha_act_idx"),
+        # El índice único del OneToOne también resuelve la búsqueda; asist_insc_presente_act_idx
+        # permite además contar presentes sin leer la tabla
+        ("presentes por inscripción",
+         Asistencia.objects.filter(inscripcion_id__in=[1, 2, 3], presente=True),
+         None),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas más usadas y falla si alguna recorre la tabla completa "
+        "(p. ej. porque se perdió un índice). Soporta PostgreSQL y SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exigir además que cada consulta use el índice esperado (no solo que no recorra la tabla).",
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Imprimir el plan completo de cada consulta.")
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ("postgresql", "sqlite"):
+            self.stdout.write(self.style.WARNING(f"Backend '{vendor}' no soportado; no se verificó nada."))
+            return
+
+        fallas = []
+        for descripcion, queryset, indice in consultas_criticas():
+            tabla = queryset.model._meta.db_table
+            plan = self._explain(queryset)
+            if options["verbose_plans"]:
+                self.stdout.write(plan)
+
+            if vendor == "postgresql":
+                recorre_tabla = re.search(rf"Seq Scan on {tabla}\b", plan)
+            else:
+                recorre_tabla = re.search(rf"\bSCAN (TABLE )?{tabla}\b(?! USING)", plan)
+
+            if recorre_tabla:
+                fallas.append(f"{descripcion}: recorre {tabla} completa (se esperaba {indice or 'un índice'})")
+            elif options["strict"] and indice and indice not in plan:
+                fallas.append(f"{descripcion}: no usa {indice}")
+            else:
+                self.stdout.write(f"OK  {descripcion}")
+
+        if fallas:
+            raise CommandError("Planes con regresiones:\n" + "\n".join(f"  - {f}" for f in fallas))
+        self.stdout.write(self.style.SUCCESS("Todas las consultas usan índices."))
+
+    def _explain(self, queryset):
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+        # Con tablas chicas el planner prefiere Seq Scan aunque exista el índice;
+        # deshabilitarlo hace que un Seq Scan signifique "no hay índice utilizable".
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
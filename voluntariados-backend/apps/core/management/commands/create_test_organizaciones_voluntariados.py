@@ -167,6 +167,9 @@ class Command(BaseCommand):
                                 # Absorb any edge-case errors (e.g., decimal/validation) so command remains useful
                                 pass
 
+                # Las inscripciones se cargan directo, sin reservar_cupo(): sincronizar contadores
+                Turno.all_objects.recalcular_inscritos()
+
                 self.stdout.write(self.style.SUCCESS('✓ Sample voluntariados and turnos created successfully'))
 
         except Exception as e:
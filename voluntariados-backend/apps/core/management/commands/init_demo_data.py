@@ -177,6 +177,9 @@ class Command(BaseCommand):
                                     defaults={"estado": InscripcionConvocatoria.Status.INSCRITO},
                                 )
 
+                # Las inscripciones se cargan directo, sin reservar_cupo(): sincronizar contadores
+                Turno.all_objects.recalcular_inscritos()
+
                 self.stdout.write(self.style.SUCCESS("✓ Demo data created successfully"))
 
         except Exception as e:
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialArchivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(help_text='Modelo histórico ("app_label.HistoricalModelo")', max_length=100)),
+                ('history_id', models.IntegerField()),
+                ('object_id', models.CharField(max_length=64)),
+                ('history_date', models.DateTimeField()),
+                ('history_type', models.CharField(max_length=1)),
+                ('history_user_id', models.IntegerField(blank=True, null=True)),
+                ('datos', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archivado_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Historial archivado',
+                'verbose_name_plural': 'Historial archivado',
+                'db_table': 'core_historial_archivado',
+                'indexes': [models.Index(fields=['modelo', 'object_id', 'history_date'], name='hist_arch_objeto_idx')],
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'history_id'), name='hist_arch_modelo_hid_uniq')],
+            },
+        ),
+    ]
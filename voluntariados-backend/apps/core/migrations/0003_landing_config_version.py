@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_historial_archivado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landingconfig',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='landingconfig',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_landingconfig_lote_baja'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historialarchivado',
+            name='history_user_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,13 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.core.validators import RegexValidator
+from django.core.serializers.json import DjangoJSONEncoder
 from apps.soft_delete.model import SoftDeleteModel
 
+# Caché de (version, updated_at) de LandingConfig; se borra al guardarla
+LANDING_CONFIG_VERSION_KEY = "core:landing_config:version"
+
 
 class LandingConfig(SoftDeleteModel):
     """
@@ -212,6 +218,11 @@ class LandingConfig(SoftDeleteModel):
         blank=True
     )
     
+    # Versión de la configuración: save() la incrementa; de ella salen el ETag de la landing
+    # pública y la clave de su payload cacheado (ver landing_config_public)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
     # Campos de auditoría heredados de SoftDeleteModel
     # created_at, updated_at, deleted_at
     
@@ -228,13 +239,35 @@ class LandingConfig(SoftDeleteModel):
         Sobrescribe el método save para asegurar que solo exista una instancia.
         Si ya existe una configuración, actualiza la existente en lugar de crear una nueva.
         """
+        reemplaza = False
         if not self.pk and LandingConfig.objects.exists():
             # Si no tenemos pk (es nuevo) pero ya existe una configuración,
             # obtenemos la existente y la actualizamos
             existing = LandingConfig.objects.first()
             self.pk = existing.pk
-        
+            reemplaza = True
+
+        # Incremento en la base (UPDATE ... version = version + 1): dos guardados concurrentes no repiten versión
+        actualiza = reemplaza or not self._state.adding
+        if actualiza:
+            self.version = models.F('version') + 1
         super().save(*args, **kwargs)
+        if actualiza:
+            self.refresh_from_db(fields=['version'])
+        transaction.on_commit(lambda: cache.delete(LANDING_CONFIG_VERSION_KEY))
+
+    @classmethod
+    def version_actual(cls):
+        """
+        (version, updated_at) de la configuración, desde el caché: las requests condicionales
+        de la landing pública se resuelven sin consultar la base.
+        """
+        actual = cache.get(LANDING_CONFIG_VERSION_KEY)
+        if actual is None:
+            config = cls.get_config()
+            actual = (config.version, config.updated_at)
+            cache.set(LANDING_CONFIG_VERSION_KEY, actual, settings.LANDING_CONFIG_MAX_AGE)
+        return actual
     
     @classmethod
     def get_config(cls):
@@ -260,4 +293,35 @@ class LandingConfig(SoftDeleteModel):
                 'milestones': [],
             }
         )
-        return config
\ No newline at end of file
+        return config
+
+
+class HistorialArchivado(models.Model):
+    """
+    Registros de historial (django-simple-history) archivados por `archivar_historial`.
+    Una sola tabla compacta para todos los modelos: las columnas de consulta habituales
+    y el resto del registro en `datos`.
+    """
+
+    modelo = models.CharField(max_length=100, help_text='Modelo histórico ("app_label.HistoricalModelo")')
+    history_id = models.IntegerField()
+    object_id = models.CharField(max_length=64)
+    history_date = models.DateTimeField()
+    history_type = models.CharField(max_length=1)
+    history_user_id = models.BigIntegerField(null=True, blank=True)
+    datos = models.JSONField(encoder=DjangoJSONEncoder)
+    archivado_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Historial archivado"
+        verbose_name_plural = "Historial archivado"
+        db_table = "core_historial_archivado"
+        constraints = [
+            models.UniqueConstraint(fields=["modelo", "history_id"], name="hist_arch_modelo_hid_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["modelo", "object_id", "history_date"], name="hist_arch_objeto_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.object_id} ({self.history_type} {self.history_date:%Y-%m-%d})"
@@ -0,0 +1,130 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _invertir(ordering):
+    return tuple(campo[1:] if campo.startswith('-') else '-' + campo for campo in ordering)
+
+
+def _despues_de(ordering, posicion):
+    """
+    Filas estrictamente posteriores a `posicion` (un valor por campo de `ordering`), como
+    comparación de tuplas: (a, b, c) > (x, y, z) <=> a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z).
+    """
+    filtro, iguales = Q(), {}
+    for campo, valor in zip(ordering, posicion):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        filtro |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+        iguales[nombre] = valor
+    return filtro
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre el orden natural de cada listado.
+
+    Es opcional para el cliente: solo se pagina si la request trae `page_size` o `cursor`,
+    de modo que los clientes que esperan la lista completa siguen funcionando.
+    `page_size` se limita a `max_page_size`.
+
+    A diferencia de CursorPagination (que posiciona el cursor por el primer campo y resuelve los
+    empates con un offset), el cursor guarda la clave completa de la última fila y la página siguiente
+    filtra por comparación de tuplas sobre todos los campos de `ordering`. Por eso `ordering` tiene que
+    terminar en `id` (clave única) y sus campos no pueden ser NULL. Una fila insertada entre dos pedidos
+    no corre ni repite las filas de la página siguiente.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.page_size_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        posicion = self.cursor.position if self.cursor is not None else None
+
+        # Un cursor "reverse" (link previous) recorre hacia atrás desde su posición
+        ordering = _invertir(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if posicion is not None:
+            try:
+                queryset = queryset.filter(_despues_de(ordering, posicion))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Una fila de más indica si hay otra página en ese sentido
+        filas = list(queryset[:self.page_size + 1])
+        self.page = filas[:self.page_size]
+        hay_mas = len(filas) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = posicion is not None, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, posicion is not None
+
+        # next sigue después de la última fila de la página, previous antes de la primera
+        if self.page:
+            self.next_position = self._posicion(self.page[-1])
+            self.previous_position = self._posicion(self.page[0])
+        else:
+            self.next_position = self.previous_position = posicion
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _posicion(self, fila):
+        campos = [campo.lstrip('-') for campo in self.ordering]
+        return [str(fila[campo] if isinstance(fila, dict) else getattr(fila, campo)) for campo in campos]
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        # La posición es la lista JSON de valores de `ordering` (ver encode_cursor)
+        try:
+            posicion = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(posicion, list) or len(posicion) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(offset=0, position=posicion)
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+
+class TurnoPagination(KeysetPagination):
+    # Coincide con Turno.Meta.ordering y el índice turno_fecha_hora_idx
+    ordering = ('-fecha', 'hora_inicio', 'id')
+
+
+class PersonaPagination(KeysetPagination):
+    # Coincide con Persona.Meta.ordering y el índice persona_apellido_nombre_idx
+    ordering = ('apellido', 'nombre', 'id')
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.asistencia.models import Asistencia
+from apps.organizacion.models import Organizacion
+from apps.persona.models import Persona, Voluntario
+from apps.voluntariado.models import Voluntariado
+from .models import LandingConfig
+from .stats import invalidar_landing_stats
+
+# Modelos que entran en las estadísticas de la landing. Persona va aparte de Voluntario porque
+# una baja hecha sobre la instancia de Persona (Persona.delete) envía la señal con sender=Persona.
+MODELOS_LANDING_STATS = (Persona, Voluntario, Organizacion, Voluntariado, Asistencia, LandingConfig)
+
+for modelo in MODELOS_LANDING_STATS:
+    for nombre, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(
+            invalidar_landing_stats, sender=modelo, dispatch_uid=f"landing_stats_{nombre}_{modelo._meta.label_lower}"
+        )
@@ -0,0 +1,111 @@
+"""
+Estadísticas públicas de la landing (landing_stats_dynamic), cacheadas.
+
+El payload completo se guarda en el caché de Django (settings.CACHES) y se invalida por señales
+al guardar/borrar voluntarios, organizaciones, voluntariados, asistencias o la LandingConfig
+(ver apps.core.signals). LANDING_STATS_MAX_AGE acota lo que puede durar un valor viejo cuando un
+cambio no pasa por save()/delete() (QuerySet.update, bajas en cascada) o con un caché por proceso.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+CACHE_KEY = "core:landing_stats"
+
+
+def _clave():
+    # voluntariados_activos depende del día: un valor de ayer nunca se sirve
+    return f"{CACHE_KEY}:{timezone.localdate().isoformat()}"
+
+
+def calcular_landing_stats():
+    """
+    Conteos en tiempo real de voluntarios, organizaciones y voluntariados, y horas trabajadas,
+    más los números base configurados en LandingConfig.
+    """
+    from apps.persona.models import Voluntario
+    from apps.organizacion.models import Organizacion
+    from apps.voluntariado.models import Voluntariado
+    from apps.asistencia.models import Asistencia
+    from .models import LandingConfig
+
+    # Get config for base numbers
+    config = LandingConfig.get_config()
+    base_voluntarios = int(config.base_voluntarios or 0)
+    base_organizaciones = int(config.base_organizaciones or 0)
+    base_proyectos = int(config.base_proyectos or 0)
+    base_horas = float(config.base_horas or 0)
+
+    # Count active records from database
+    voluntarios_db = Voluntario.objects.filter(is_active=True).count()
+    organizaciones_db = Organizacion.objects.filter(is_active=True, activo=True).count()
+
+    # Count voluntariados by status
+    today = timezone.localdate()
+
+    proyectos_db = Voluntariado.objects.filter(is_active=True).count()
+    voluntariados_activos = Voluntariado.objects.filter(
+        is_active=True,
+        fecha_inicio_cursado__isnull=False,
+        fecha_fin_cursado__isnull=False,
+        fecha_inicio_cursado__lte=today,
+        fecha_fin_cursado__gte=today
+    ).count()
+
+    # Calculate total hours from Asistencia records
+    total_horas_result = Asistencia.objects.filter(
+        is_active=True,
+        presente=True,
+        horas__isnull=False
+    ).aggregate(total_horas=Sum('horas'))
+
+    horas_db = float(total_horas_result.get('total_horas') or 0)
+
+    # Calculate totals with base numbers
+    voluntarios_total = voluntarios_db + base_voluntarios
+    organizaciones_total = organizaciones_db + base_organizaciones
+    proyectos_total = proyectos_db + base_proyectos
+    horas_total = horas_db + base_horas
+
+    return {
+        # These are the fixed metrics that will always be displayed
+        'voluntarios': voluntarios_total,
+        'organizaciones': organizaciones_total,
+        'proyectos': proyectos_total,
+        'horas': round(horas_total, 2),
+
+        # Breakdown for transparency (optional, for admin purposes)
+        'voluntarios_db': voluntarios_db,
+        'organizaciones_db': organizaciones_db,
+        'proyectos_db': proyectos_db,
+        'horas_db': round(horas_db, 2),
+        'base_voluntarios': base_voluntarios,
+        'base_organizaciones': base_organizaciones,
+        'base_proyectos': base_proyectos,
+        'base_horas': round(base_horas, 2),
+
+        # Legacy fields for backward compatibility
+        'voluntariados_total': proyectos_total,
+        'voluntariados_activos': voluntariados_activos,
+        'total_horas': round(horas_total, 2),
+    }
+
+
+def landing_stats():
+    """Payload de landing_stats_dynamic: desde el caché, o calculado y guardado."""
+    clave = _clave()
+    datos = cache.get(clave)
+    if datos is None:
+        datos = calcular_landing_stats()
+        cache.set(clave, datos, settings.LANDING_STATS_MAX_AGE)
+    return datos
+
+
+def invalidar_landing_stats(**kwargs):
+    """
+    Descarta el payload cacheado. Se borra recién al confirmar la transacción: si se borrara antes,
+    una request concurrente podría volver a cachear los datos previos al cambio.
+    """
+    transaction.on_commit(lambda: cache.delete(_clave()))
@@ -0,0 +1,274 @@
+import gzip
+import json
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core import history
+from apps.core.history import history_buffer
+from apps.core.pagination import TurnoPagination
+from apps.core.models import HistorialArchivado, LandingConfig
+from apps.persona.models import Voluntario
+from apps.voluntariado.models import Voluntariado, Turno, InscripcionTurno
+
+
+class QueryPlansTests(TestCase):
+
+    def test_consultas_criticas_usan_indices(self):
+        # Falla (CommandError) si alguna consulta recorre la tabla completa o no usa su índice
+        call_command("check_query_plans", "--strict", stdout=StringIO())
+
+
+class HistoryBufferTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy,
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.turno = Turno.objects.create(
+            voluntariado=voluntariado, fecha=hoy, hora_inicio=time(9), hora_fin=time(12), cupo=10
+        )
+        self.voluntarios = [Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test") for i in range(5)]
+
+    def test_un_insert_de_historial_por_modelo(self):
+        with history_buffer():
+            for voluntario in self.voluntarios:
+                InscripcionTurno.objects.create(turno=self.turno, voluntario=voluntario)
+            self.turno.cupo = 20
+            self.turno.save()
+            self.assertEqual(InscripcionTurno.history.count(), 0)
+
+        self.assertEqual(InscripcionTurno.history.filter(history_type="+").count(), 5)
+        self.assertEqual(Turno.history.filter(history_type="~").count(), 1)
+
+        # 5 INSERT de inscripciones + 1 INSERT de historial + SAVEPOINT / RELEASE
+        with self.assertNumQueries(8):
+            with history_buffer():
+                for voluntario in self.voluntarios:
+                    InscripcionTurno.objects.create(turno=self.turno, voluntario=voluntario)
+
+    @override_settings(HISTORY_DEFERRED_MODELS=["voluntariado.InscripcionTurno"])
+    def test_modo_diferido_escribe_despues_del_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            with history_buffer():
+                for voluntario in self.voluntarios:
+                    InscripcionTurno.objects.create(turno=self.turno, voluntario=voluntario)
+
+        self.assertEqual(InscripcionTurno.history.count(), 0)
+        self.assertEqual(len(callbacks), 1)
+
+    @override_settings(HISTORY_DEFERRED_MODELS=["voluntariado.InscripcionTurno"])
+    def test_modo_diferido_un_solo_hilo_para_todos_los_commits(self):
+        # El hilo usa su propia conexión, que no ve la transacción del test: se verifica lo que recibe
+        escritos = []
+        with mock.patch.object(history, "_escribir", side_effect=lambda p: escritos.extend(next(iter(p.values())))):
+            for voluntario in self.voluntarios:
+                with self.captureOnCommitCallbacks(execute=True):
+                    InscripcionTurno.objects.create(turno=self.turno, voluntario=voluntario)
+            history.esperar_historial_diferido()
+
+        self.assertEqual(sorted(d["instance"].voluntario_id for d in escritos), sorted(v.pk for v in self.voluntarios))
+        self.assertEqual(sum(t.name == "historial-diferido" for t in threading.enumerate()), 1)
+
+    @override_settings(HISTORY_DEFERRED_MODELS=["voluntariado.InscripcionTurno"])
+    def test_modo_diferido_reintenta_y_registra_el_error(self):
+        with mock.patch.object(history, "_escribir", side_effect=RuntimeError("sin base")) as escribir, \
+                mock.patch.object(history.time, "sleep"), \
+                self.assertLogs("apps.core.history", "ERROR") as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                InscripcionTurno.objects.create(turno=self.turno, voluntario=self.voluntarios[0])
+            history.esperar_historial_diferido()
+
+        self.assertEqual(escribir.call_count, history.REINTENTOS)
+        self.assertIn("se pierden 1 registros", logs.output[0])
+
+
+class ArchivarHistorialTests(TestCase):
+
+    def setUp(self):
+        self.turno = Turno.objects.create(fecha=date.today(), hora_inicio=time(9), hora_fin=time(12), cupo=1)
+        for cupo in (2, 3, 4):
+            self.turno.cupo = cupo
+            self.turno.save()
+        # Los 3 primeros registros quedan vencidos; el último (vigente) siempre se conserva
+        viejos = self.turno.history.order_by("history_date")[:3].values_list("history_id", flat=True)
+        self.turno.history.filter(history_id__in=list(viejos)).update(
+            history_date=timezone.now() - timedelta(days=400)
+        )
+
+    def archivar(self, *args):
+        call_command("archivar_historial", "--model", "voluntariado.Turno", "--batch-size", "2", *args,
+                     stdout=StringIO())
+
+    def test_mueve_a_tabla_de_archivo_y_conserva_el_ultimo(self):
+        self.archivar("--mode", "tabla")
+
+        self.assertEqual(list(self.turno.history.values_list("cupo", flat=True)), [4])
+        archivados = HistorialArchivado.objects.filter(modelo="voluntariado.HistoricalTurno", object_id=str(self.turno.pk))
+        self.assertEqual(sorted(a.datos["cupo"] for a in archivados), [1, 2, 3])
+
+    def test_exporta_a_jsonl_comprimido(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            self.archivar("--mode", "jsonl", "--directory", directorio)
+            archivos = list(Path(directorio).glob("*.jsonl.gz"))
+            self.assertEqual(len(archivos), 1)
+            with gzip.open(archivos[0], "rt", encoding="utf-8") as f:
+                filas = [json.loads(linea) for linea in f]
+
+        self.assertEqual([f["cupo"] for f in filas], [1, 2, 3])
+        self.assertEqual(self.turno.history.count(), 1)
+        self.assertFalse(HistorialArchivado.objects.exists())
+
+
+class LandingStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.url = "/api/core/landing-config/stats/"
+
+    def test_se_sirve_desde_el_cache(self):
+        self.assertEqual(self.client.get(self.url).data["voluntarios_db"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data["voluntarios_db"], 0)
+
+    def test_se_invalida_al_guardar_modelos_que_cuentan(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            voluntario = Voluntario.objects.create(nombre="Ana", apellido="Pérez")
+        self.assertEqual(self.client.get(self.url).data["voluntarios_db"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            voluntario.delete()
+        self.assertEqual(self.client.get(self.url).data["voluntarios_db"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            config = LandingConfig.get_config()
+            config.base_voluntarios = 100
+            config.save()
+        self.assertEqual(self.client.get(self.url).data["voluntarios"], 100)
+
+
+
+class LandingConfigPublicTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.url = "/api/core/landing-config/public/"
+
+    def test_get_condicional_sin_consultas(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(self.url).data["site_name"], respuesta.data["site_name"])
+
+    def test_guardar_incrementa_la_version(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            config = LandingConfig.get_config()
+            config.site_name = "Otro nombre"
+            config.save()
+        self.assertEqual(config.version, 2)
+
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data["site_name"], "Otro nombre")
+        self.assertNotEqual(respuesta["ETag"], etag)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba", requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy, fecha_fin_cursado=hoy + timedelta(days=30), latitud=0, longitud=0,
+        )
+        # Empates en el primer campo (fecha) y también en el segundo (hora_inicio): desempata el id
+        for dias, hora in ((1, 9), (1, 9), (1, 9), (1, 10), (2, 9), (2, 9), (3, 8)):
+            Turno.objects.create(voluntariado=voluntariado, fecha=hoy + timedelta(days=dias), hora_inicio=time(hora), hora_fin=time(12))
+        for nombre in ("Ana", "Ana", "Bruno", "Ana", "Carla"):
+            Voluntario.objects.create(nombre=nombre, apellido="Pérez")
+        User = get_user_model()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO))
+
+    def recorrer(self, url, page_size):
+        ids, siguiente = [], f"{url}?page_size={page_size}"
+        while siguiente:
+            respuesta = self.client.get(siguiente)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertLessEqual(len(respuesta.data["results"]), page_size)
+            ids += [fila["id"] for fila in respuesta.data["results"]]
+            siguiente = respuesta.data["next"]
+        return ids
+
+    def test_sin_parametros_devuelve_la_lista_completa(self):
+        respuesta = self.client.get("/api/voluntariado/turnos/")
+        self.assertIsInstance(respuesta.data, list)
+        self.assertEqual(len(respuesta.data), 7)
+
+    def test_page_size_se_limita_a_max_page_size(self):
+        with mock.patch.object(TurnoPagination, "max_page_size", 3):
+            respuesta = self.client.get("/api/voluntariado/turnos/", {"page_size": 100})
+        self.assertEqual(len(respuesta.data["results"]), 3)
+        self.assertIsNotNone(respuesta.data["next"])
+
+    def test_cursores_estables_con_valores_repetidos(self):
+        for url in ("/api/voluntariado/turnos/", "/api/persona/personas/", "/api/persona/voluntarios/"):
+            completa = [fila["id"] for fila in self.client.get(url).data]
+            for page_size in (1, 2, 3):
+                with self.subTest(url=url, page_size=page_size):
+                    self.assertEqual(self.recorrer(url, page_size), completa)
+
+        turnos = self.client.get("/api/voluntariado/turnos/").data
+        claves = [(t["fecha"], t["hora_inicio"], t["id"]) for t in turnos]
+        # Orden natural: -fecha, hora_inicio, id
+        self.assertEqual(claves, sorted(claves, key=lambda c: (-date.fromisoformat(c[0]).toordinal(), c[1], c[2])))
+
+    def test_fila_insertada_entre_paginas_no_corre_el_cursor(self):
+        # Primera página: termina a mitad de los tres turnos empatados en fecha y hora
+        primera = self.client.get("/api/voluntariado/turnos/", {"page_size": 2}).data
+        vistos = [fila["id"] for fila in primera["results"]]
+        ultimo = Turno.objects.get(pk=vistos[-1])
+        # Otro turno con la misma fecha y hora de inicio más temprana: queda antes del cursor
+        Turno.objects.create(voluntariado=ultimo.voluntariado, fecha=ultimo.fecha, hora_inicio=time(7), hora_fin=time(12))
+
+        siguiente = primera["next"]
+        while siguiente:
+            respuesta = self.client.get(siguiente).data
+            vistos += [fila["id"] for fila in respuesta["results"]]
+            siguiente = respuesta["next"]
+        self.assertEqual(vistos, [fila["id"] for fila in self.client.get("/api/voluntariado/turnos/").data if fila["hora_inicio"] != "07:00:00"])
+
+    def test_previous_vuelve_a_la_pagina_anterior(self):
+        primera = self.client.get("/api/voluntariado/turnos/", {"page_size": 3}).data
+        segunda = self.client.get(primera["next"]).data
+        anterior = self.client.get(segunda["previous"]).data
+        self.assertEqual(anterior["results"], primera["results"])
+        self.assertIsNone(anterior["previous"])
+
+    def test_cursor_invalido(self):
+        respuesta = self.client.get("/api/voluntariado/turnos/", {"cursor": "basura"})
+        self.assertEqual(respuesta.status_code, 404)
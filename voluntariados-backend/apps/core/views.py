@@ -1,3 +1,7 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -5,6 +9,7 @@ from rest_framework.permissions import AllowAny
 from apps.users.permissions import IsAdministrador
 from .models import LandingConfig
 from .serializers import LandingConfigSerializer
+from .stats import landing_stats
 
 
 class LandingConfigRetrieveView(generics.RetrieveAPIView):
@@ -41,15 +46,39 @@ class LandingConfigUpdateView(generics.UpdateAPIView):
         return self.partial_update(request, *args, **kwargs)
 
 
+def _landing_config_etag(request, *args, **kwargs):
+    return f"landing-config-{LandingConfig.version_actual()[0]}"
+
+
+def _landing_config_last_modified(request, *args, **kwargs):
+    return LandingConfig.version_actual()[1]
+
+
+@condition(etag_func=_landing_config_etag, last_modified_func=_landing_config_last_modified)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def landing_config_public(request):
     """
     Endpoint público simplificado para obtener solo los datos esenciales
     de la configuración de la landing page.
+
+    Responde 304 si el ETag / Last-Modified del cliente corresponde a la versión actual de la
+    configuración, y el payload ya armado se cachea por versión y host (las URLs de imágenes
+    son absolutas), así que las requests repetidas no consultan la base.
     """
-    config = LandingConfig.get_config()
-    
+    version = LandingConfig.version_actual()[0]
+    clave = f"core:landing_config:public:{version}:{request.build_absolute_uri('/')}"
+    public_data = cache.get(clave)
+    if public_data is None:
+        public_data = _landing_config_public_data(request, LandingConfig.get_config())
+        cache.set(clave, public_data, settings.LANDING_CONFIG_MAX_AGE)
+    response = Response(public_data)
+    # Browsers y CDNs pueden guardarla, pero revalidan siempre (y reciben 304 si no cambió)
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+
+def _landing_config_public_data(request, config):
     # Datos mínimos para la landing page pública
     public_data = {
         'page_title': config.page_title,
@@ -103,8 +132,8 @@ def landing_config_public(request):
     public_data['values'] = _normalize_images(config.values)
     public_data['stats'] = config.stats or []
     public_data['milestones'] = _normalize_images(config.milestones)
-    
-    return Response(public_data)
+
+    return public_data
 
 
 @api_view(['GET', 'PUT', 'PATCH'])
@@ -140,74 +169,9 @@ def landing_config_admin(request):
 def landing_stats_dynamic(request):
     """
     Endpoint público para obtener estadísticas dinámicas de la plataforma.
-    Retorna conteos en tiempo real de voluntarios, organizaciones y voluntariados.
+    Retorna conteos de voluntarios, organizaciones y voluntariados.
     También calcula las horas totales trabajadas sumando el base_horas configurado.
     Las etiquetas de las métricas son fijas y no se pueden cambiar, solo los números base.
+    El resultado se sirve desde el caché mientras no cambien los datos (ver apps.core.stats).
     """
-    from apps.persona.models import Voluntario
-    from apps.organizacion.models import Organizacion
-    from apps.voluntariado.models import Voluntariado
-    from apps.asistencia.models import Asistencia
-    from django.db.models import Sum
-    
-    # Get config for base numbers
-    config = LandingConfig.get_config()
-    base_voluntarios = int(config.base_voluntarios or 0)
-    base_organizaciones = int(config.base_organizaciones or 0)
-    base_proyectos = int(config.base_proyectos or 0)
-    base_horas = float(config.base_horas or 0)
-    
-    # Count active records from database
-    voluntarios_db = Voluntario.objects.filter(is_active=True).count()
-    organizaciones_db = Organizacion.objects.filter(is_active=True, activo=True).count()
-    
-    # Count voluntariados by status
-    from django.utils import timezone
-    today = timezone.now().date()
-    
-    proyectos_db = Voluntariado.objects.filter(is_active=True).count()
-    voluntariados_activos = Voluntariado.objects.filter(
-        is_active=True,
-        fecha_inicio_cursado__isnull=False,
-        fecha_fin_cursado__isnull=False,
-        fecha_inicio_cursado__lte=today,
-        fecha_fin_cursado__gte=today
-    ).count()
-    
-    # Calculate total hours from Asistencia records
-    total_horas_result = Asistencia.objects.filter(
-        is_active=True,
-        presente=True,
-        horas__isnull=False
-    ).aggregate(total_horas=Sum('horas'))
-    
-    horas_db = float(total_horas_result.get('total_horas') or 0)
-    
-    # Calculate totals with base numbers
-    voluntarios_total = voluntarios_db + base_voluntarios
-    organizaciones_total = organizaciones_db + base_organizaciones
-    proyectos_total = proyectos_db + base_proyectos
-    horas_total = horas_db + base_horas
-    
-    return Response({
-        # These are the fixed metrics that will always be displayed
-        'voluntarios': voluntarios_total,
-        'organizaciones': organizaciones_total,
-        'proyectos': proyectos_total,
-        'horas': round(horas_total, 2),
-        
-        # Breakdown for transparency (optional, for admin purposes)
-        'voluntarios_db': voluntarios_db,
-        'organizaciones_db': organizaciones_db,
-        'proyectos_db': proyectos_db,
-        'horas_db': round(horas_db, 2),
-        'base_voluntarios': base_voluntarios,
-        'base_organizaciones': base_organizaciones,
-        'base_proyectos': base_proyectos,
-        'base_horas': round(base_horas, 2),
-        
-        # Legacy fields for backward compatibility
-        'voluntariados_total': proyectos_total,
-        'voluntariados_activos': voluntariados_activos,
-        'total_horas': round(horas_total, 2),
-    })
\ No newline at end of file
+    return Response(landing_stats())
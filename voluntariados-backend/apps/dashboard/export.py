@@ -0,0 +1,241 @@
+"""
+Exportación a Power BI en streaming: voluntarios y las tablas del modelo estrella (TABLAS).
+
+Las filas salen de `.values()` con `iterator(chunk_size=...)` y se escriben a medida que se leen,
+así que la memoria no crece con la cantidad de filas. Formatos: JSON (un array), NDJSON (un objeto
+por línea) y CSV.
+"""
+import csv
+import hashlib
+import json
+from typing import Callable, NamedTuple, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
+
+from apps.asistencia.models import Asistencia
+from apps.facultad.models import Carrera
+from apps.organizacion.models import Organizacion
+from apps.persona.models import Voluntario
+from apps.voluntariado.models import InscripcionConvocatoria, InscripcionTurno, Turno, Voluntariado
+
+FORMATO_JSON = "json"
+FORMATO_NDJSON = "ndjson"
+FORMATO_CSV = "csv"
+FORMATOS = {
+    FORMATO_JSON: "application/json",
+    FORMATO_NDJSON: "application/x-ndjson",
+    FORMATO_CSV: "text/csv; charset=utf-8",
+}
+
+# Columna exportada -> lookup de .values() sobre Voluntario
+COLUMNAS_VOLUNTARIO = {
+    "id": "id",
+    "nombre": "nombre",
+    "apellido": "apellido",
+    "dni": "dni",
+    "fecha_nacimiento": "fecha_nacimiento",
+    "telefono": "telefono",
+    "email": "user__email",
+    "direccion": "direccion",
+    "localidad_nombre": "localidad__nombre",
+    "provincia_nombre": "localidad__departamento__provincia__nombre",
+    "interno": "interno",
+    "observaciones": "observaciones",
+    "condicion": "condicion",
+    "carrera_id": "carrera_id",
+    "carrera_nombre": "carrera__nombre",
+    "facultad_nombre": "carrera__facultad__nombre",
+    "is_active": "is_active",
+    "updated_at": "updated_at",
+}
+
+# Marcas (updated_at) de las tablas de las que COLUMNAS_VOLUNTARIO toma columnas
+MARCAS_RELACIONADAS_VOLUNTARIO = (
+    "user__updated_at",
+    "carrera__updated_at",
+    "carrera__facultad__updated_at",
+    "localidad__updated_at",
+    "localidad__departamento__updated_at",
+    "localidad__departamento__provincia__updated_at",
+)
+
+
+class Tabla(NamedTuple):
+    """
+    Tabla del modelo estrella de Power BI. Cada fila se arma con un único .values() (los FK se
+    resuelven con JOINs o subconsultas en la misma consulta), con `id` como clave sustituta y
+    `<dimensión>_id` en las columnas que la referencian.
+    """
+    tipo: str
+    queryset: Callable
+    columnas: dict
+    # Columna de marca de agua (updated_since / ETag); sin ella la tabla solo admite carga completa
+    marca: Optional[str] = None
+    # Marcas de las tablas relacionadas de las que salen columnas (email, nombres de carrera o
+    # localidad): un cambio en ellas también cuenta como cambio de la fila
+    marcas_relacionadas: tuple = ()
+
+    @property
+    def marcas(self):
+        return (self.marca, *self.marcas_relacionadas) if self.marca else ()
+
+
+DIMENSION = "dimension"
+HECHO = "hecho"
+
+TABLAS = {
+    "voluntarios": Tabla(
+        DIMENSION, Voluntario.objects.all, COLUMNAS_VOLUNTARIO, marca="updated_at",
+        marcas_relacionadas=MARCAS_RELACIONADAS_VOLUNTARIO,
+    ),
+    "voluntariados": Tabla(DIMENSION, Voluntariado.objects.all, {
+        "id": "id",
+        "nombre": "nombre",
+        "organizacion_id": "organizacion_id",
+        "etapa": "etapa",
+        "requiere_convocatoria": "requiere_convocatoria",
+        "fecha_inicio_convocatoria": "fecha_inicio_convocatoria",
+        "fecha_fin_convocatoria": "fecha_fin_convocatoria",
+        "fecha_inicio_cursado": "fecha_inicio_cursado",
+        "fecha_fin_cursado": "fecha_fin_cursado",
+    }),
+    "organizaciones": Tabla(DIMENSION, Organizacion.objects.all, {
+        "id": "id",
+        "nombre": "nombre",
+        "activo": "activo",
+        "localidad_nombre": "localidad__nombre",
+        "provincia_nombre": "localidad__departamento__provincia__nombre",
+    }),
+    # Facultad desnormalizada en la carrera (copo de nieve aplanado)
+    "carreras": Tabla(DIMENSION, Carrera.objects.all, {
+        "id": "id",
+        "nombre": "nombre",
+        "activo": "activo",
+        "facultad_id": "facultad_id",
+        "facultad_nombre": "facultad__nombre",
+    }),
+    # Ocupación: una fila por turno (de with_stats solo se seleccionan las anotaciones pedidas)
+    "turnos": Tabla(HECHO, lambda: Turno.objects.with_stats(), {
+        "id": "id",
+        "voluntariado_id": "voluntariado_id",
+        "fecha": "fecha",
+        "hora_inicio": "hora_inicio",
+        "hora_fin": "hora_fin",
+        "lugar": "lugar",
+        "cupo": "cupo",
+        "inscritos": "inscritos_count",
+        "en_espera": "en_espera_count",
+        "asistencias_registradas": "asistencias_registradas",
+    }),
+    # Ciclo de vida de las inscripciones (estado actual; el detalle de transiciones está en el historial)
+    "inscripciones-turno": Tabla(HECHO, InscripcionTurno.objects.all, {
+        "id": "id",
+        "turno_id": "turno_id",
+        "voluntariado_id": "turno__voluntariado_id",
+        "voluntario_id": "voluntario_id",
+        "estado": "estado",
+        "fecha_inscripcion": "fecha_inscripcion",
+        "en_espera_desde": "en_espera_desde",
+    }),
+    "inscripciones-convocatoria": Tabla(HECHO, InscripcionConvocatoria.objects.all, {
+        "id": "id",
+        "voluntariado_id": "voluntariado_id",
+        "voluntario_id": "voluntario_id",
+        "estado": "estado",
+    }),
+    # Horas: una fila por asistencia registrada
+    "asistencias": Tabla(HECHO, lambda: Asistencia.objects.filter(inscripcion__is_active=True), {
+        "id": "id",
+        "inscripcion_id": "inscripcion_id",
+        "turno_id": "inscripcion__turno_id",
+        "voluntariado_id": "inscripcion__turno__voluntariado_id",
+        "voluntario_id": "inscripcion__voluntario_id",
+        "fecha": "inscripcion__turno__fecha",
+        "presente": "presente",
+        "horas": "horas",
+    }),
+}
+
+
+def filas(queryset, columnas, chunk_size):
+    """Itera las filas como dicts planos, sin instanciar modelos."""
+    lookups = list(columnas.values())
+    for valores in queryset.order_by("id").values(*lookups).iterator(chunk_size=chunk_size):
+        yield {columna: valores[lookup] for columna, lookup in columnas.items()}
+
+
+def modificadas_desde(marcas, desde):
+    """Filtro de las filas en las que alguna de las `marcas` es posterior o igual a `desde`."""
+    filtro = Q()
+    for marca in marcas:
+        filtro |= Q(**{f"{marca}__gte": desde})
+    return filtro
+
+
+def estado(queryset, marcas):
+    """
+    (cantidad, última marca) en una consulta: alcanza para el ETag y la marca de agua.
+    La última marca es la mayor entre todas las `marcas` (la fila y sus tablas relacionadas).
+    """
+    resumen = queryset.aggregate(
+        cantidad=Count("id"),
+        **{f"ultimo_{i}": Max(marca) for i, marca in enumerate(marcas)},
+    )
+    ultimos = [resumen[f"ultimo_{i}"] for i in range(len(marcas)) if resumen[f"ultimo_{i}"] is not None]
+    return resumen["cantidad"], max(ultimos, default=None)
+
+
+def etag(*partes):
+    return '"%s"' % hashlib.sha256(":".join(str(p) for p in partes).encode()).hexdigest()[:32]
+
+
+def anidar_carrera(fila):
+    # Forma del serializador original: carrera = {"nombre", "facultad": {"nombre"}} o null
+    carrera = fila.pop("carrera_nombre")
+    facultad = fila.pop("facultad_nombre")
+    fila["carrera"] = {"nombre": carrera, "facultad": {"nombre": facultad}} if carrera is not None else None
+    return fila
+
+
+def render_json(filas_iter, columnas):
+    yield "["
+    separador = ""
+    for fila in filas_iter:
+        yield separador + json.dumps(fila, cls=DjangoJSONEncoder)
+        separador = ","
+    yield "]"
+
+
+def render_ndjson(filas_iter, columnas):
+    for fila in filas_iter:
+        yield json.dumps(fila, cls=DjangoJSONEncoder) + "\n"
+
+
+class _Eco:
+    """Buffer de una sola línea para csv.writer (el writer retorna lo que escribe)."""
+
+    def write(self, valor):
+        return valor
+
+
+def render_csv(filas_iter, columnas):
+    writer = csv.writer(_Eco())
+    yield writer.writerow(list(columnas))
+    for fila in filas_iter:
+        yield writer.writerow([_valor_csv(v) for v in fila.values()])
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
+
+
+RENDERERS = {
+    FORMATO_JSON: render_json,
+    FORMATO_NDJSON: render_ndjson,
+    FORMATO_CSV: render_csv,
+}
@@ -0,0 +1,40 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hashear_claves(apps, schema_editor):
+    """Las claves existentes siguen funcionando: se guarda su prefijo y su hash, y se descarta el texto."""
+    APIKey = apps.get_model('dashboard', 'APIKey')
+    for api_key in APIKey.objects.all():
+        api_key.prefix = api_key.key[:8]
+        api_key.key_hash = hashlib.sha256(api_key.key.encode()).hexdigest()
+        api_key.save(update_fields=['prefix', 'key_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikey',
+            name='prefix',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=8, verbose_name='Prefijo'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='apikey',
+            name='key_hash',
+            field=models.CharField(default='', editable=False, max_length=64, verbose_name='Hash de la clave'),
+            preserve_default=False,
+        ),
+        # Irreversible: el texto de las claves no se puede recuperar del hash
+        migrations.RunPython(hashear_claves),
+        migrations.RemoveField(
+            model_name='apikey',
+            name='key',
+        ),
+    ]
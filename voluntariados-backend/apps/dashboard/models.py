@@ -1,14 +1,37 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import hmac
 import secrets
+import threading
+import time
+
+# Largo del prefijo en claro que se guarda para buscar la clave (el resto solo existe como hash)
+PREFIX_LENGTH = 8
+
 
 def generate_api_key():
     """Genera una clave de API segura."""
     return secrets.token_urlsafe(32)
 
+
+def hash_api_key(key):
+    """SHA-256 de la clave: alcanza para claves aleatorias de 256 bits (no son contraseñas)."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# Caché en memoria (por proceso) de claves ya validadas: hash -> (vence_en, api_key con su usuario).
+# Regenerar una clave la quita de la caché de este proceso; en los demás vence a los API_KEY_CACHE_TTL segundos.
+_cache = {}
+_cache_lock = threading.Lock()
+
+
 class APIKey(models.Model):
     """
     Modelo para almacenar claves de API para acceso externo (ej. Power BI).
+    La clave solo se muestra al generarla: se guardan su prefijo y su hash.
     """
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -16,12 +39,16 @@ class APIKey(models.Model):
         related_name='api_key',
         verbose_name="Usuario"
     )
-    key = models.CharField(
-        max_length=64, 
-        unique=True, 
-        default=generate_api_key,
+    prefix = models.CharField(
+        max_length=PREFIX_LENGTH,
+        db_index=True,
         editable=False,
-        verbose_name="Clave de API"
+        verbose_name="Prefijo"
+    )
+    key_hash = models.CharField(
+        max_length=64,
+        editable=False,
+        verbose_name="Hash de la clave"
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -40,3 +67,59 @@ class APIKey(models.Model):
 
     def __str__(self):
         return f"Clave de API para {self.user.email}"
+
+    @classmethod
+    def generar(cls, user):
+        """
+        Crea una clave nueva para `user`, invalidando la anterior.
+        Retorna (api_key, clave): la clave en claro no se guarda, solo puede mostrarse ahora.
+        """
+        key = generate_api_key()
+        cls.objects.filter(user=user).delete()
+        cls.limpiar_cache()
+        api_key = cls.objects.create(user=user, prefix=key[:PREFIX_LENGTH], key_hash=hash_api_key(key))
+        return api_key, key
+
+    @classmethod
+    def verificar(cls, key):
+        """
+        Retorna la APIKey (con `user` cargado) correspondiente a `key`, o None.
+        Las claves válidas se guardan API_KEY_CACHE_TTL segundos en memoria: en ese lapso no se consulta la base.
+        """
+        if not key:
+            return None
+        digest = hash_api_key(key)
+        ahora = time.monotonic()
+        with _cache_lock:
+            entrada = _cache.get(digest)
+        if entrada is not None and entrada[0] > ahora:
+            api_key = entrada[1]
+        else:
+            candidatas = cls.objects.select_related('user').filter(prefix=key[:PREFIX_LENGTH], user__is_active=True)
+            api_key = next((c for c in candidatas if hmac.compare_digest(c.key_hash, digest)), None)
+            if api_key is None:
+                return None
+            with _cache_lock:
+                _cache[digest] = (ahora + settings.API_KEY_CACHE_TTL, api_key)
+        api_key.registrar_uso()
+        return api_key
+
+    def registrar_uso(self):
+        """
+        Actualiza last_used_at como mucho una vez cada API_KEY_LAST_USED_INTERVAL segundos,
+        con un único UPDATE condicional; dentro del intervalo no escribe nada.
+        """
+        ahora = timezone.now()
+        intervalo = timedelta(seconds=settings.API_KEY_LAST_USED_INTERVAL)
+        if self.last_used_at is not None and ahora - self.last_used_at < intervalo:
+            return
+        APIKey.objects.filter(pk=self.pk).filter(
+            models.Q(last_used_at__isnull=True) | models.Q(last_used_at__lt=ahora - intervalo)
+        ).update(last_used_at=ahora)
+        # Aunque otro proceso haya ganado el UPDATE, este no vuelve a intentar hasta el próximo intervalo
+        self.last_used_at = ahora
+
+    @staticmethod
+    def limpiar_cache():
+        with _cache_lock:
+            _cache.clear()
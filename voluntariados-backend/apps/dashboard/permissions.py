@@ -1,6 +1,5 @@
 from rest_framework import permissions
 from .models import APIKey
-from django.utils import timezone
 
 class HasAPIKey(permissions.BasePermission):
     """
@@ -13,17 +12,11 @@ class HasAPIKey(permissions.BasePermission):
         if request.user and request.user.is_authenticated and request.user.is_staff:
             return True
 
-        api_key_header = request.META.get('HTTP_X_API_KEY')
-        if not api_key_header:
-            return False
-
-        try:
-            api_key_obj = APIKey.objects.get(key=api_key_header)
-            # Opcional: Actualizar la fecha de último uso
-            api_key_obj.last_used_at = timezone.now()
-            api_key_obj.save()
-            # Asignar el usuario de la clave a request.user para que los logs lo registren
-            request.user = api_key_obj.user
-            return True
-        except APIKey.DoesNotExist:
+        # Validada en memoria la mayoría de las veces (ver APIKey.verificar); last_used_at se escribe
+        # como mucho una vez por intervalo
+        api_key_obj = APIKey.verificar(request.META.get('HTTP_X_API_KEY'))
+        if api_key_obj is None:
             return False
+        # Asignar el usuario de la clave a request.user para que los logs lo registren
+        request.user = api_key_obj.user
+        return True
@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.asistencia.models import Asistencia
+from apps.dashboard.models import APIKey, hash_api_key
+from apps.facultad.models import Carrera, Facultad
+from apps.persona.models import Voluntario
+from apps.voluntariado.models import Voluntariado, Turno, InscripcionTurno
+
+
+@override_settings(API_KEY_CACHE_TTL=60, API_KEY_LAST_USED_INTERVAL=300)
+class APIKeyTests(TestCase):
+
+    def setUp(self):
+        APIKey.limpiar_cache()
+        self.addCleanup(APIKey.limpiar_cache)
+        User = get_user_model()
+        self.admin = User.objects.create_user(
+            email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO, is_staff=True
+        )
+        self.api_key, self.key = APIKey.generar(self.admin)
+        self.client = APIClient()
+
+    def test_solo_se_guardan_prefijo_y_hash(self):
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.prefix, self.key[:8])
+        self.assertEqual(self.api_key.key_hash, hash_api_key(self.key))
+        self.assertNotIn(self.key, str(APIKey.objects.filter(pk=self.api_key.pk).values().first()))
+
+    def test_clave_valida_se_cachea_y_last_used_se_escribe_una_vez(self):
+        self.client.credentials(HTTP_X_API_KEY=self.key)
+        with self.assertNumQueries(3):  # validación + UPDATE de last_used_at + datos
+            self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 200)
+        with self.assertNumQueries(1):  # solo los datos
+            self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 200)
+        self.api_key.refresh_from_db()
+        self.assertIsNotNone(self.api_key.last_used_at)
+
+    def test_last_used_no_retrocede_si_otro_proceso_ya_escribio(self):
+        reciente = timezone.now() - timedelta(seconds=10)
+        APIKey.objects.filter(pk=self.api_key.pk).update(last_used_at=reciente)
+        self.api_key.last_used_at = None
+        self.api_key.registrar_uso()
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.last_used_at, reciente)
+
+    def test_clave_invalida_o_regenerada_es_rechazada(self):
+        self.client.credentials(HTTP_X_API_KEY=self.key[:8] + "x" * 35)
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 401)
+
+        self.client.credentials(HTTP_X_API_KEY=self.key)
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 200)
+        _, nueva = APIKey.generar(self.admin)
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 401)
+        self.client.credentials(HTTP_X_API_KEY=nueva)
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/").status_code, 200)
+
+    def test_la_clave_solo_se_muestra_al_generarla(self):
+        self.client.force_authenticate(self.admin)
+        respuesta = self.client.get("/api/dashboard/powerbi/key/")
+        self.assertIsNone(respuesta.data["key"])
+        self.assertEqual(respuesta.data["prefix"], self.key[:8])
+
+        respuesta = self.client.post("/api/dashboard/powerbi/key/")
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(APIKey.verificar(respuesta.data["key"]).user, self.admin)
+
+
+class PowerBIExportTests(TestCase):
+
+    def setUp(self):
+        APIKey.limpiar_cache()
+        self.addCleanup(APIKey.limpiar_cache)
+        User = get_user_model()
+        admin = User.objects.create_user(
+            email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO, is_staff=True
+        )
+        _, key = APIKey.generar(admin)
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_API_KEY=key)
+        self.voluntarios = [
+            User.objects.create_user(email=f"vol{i}@test.com", password="test", role=User.Roles.VOLUNTARIO).persona
+            for i in range(3)
+        ]
+
+    def exportar(self, **params):
+        respuesta = self.client.get("/api/dashboard/powerbi/", params)
+        contenido = b"".join(respuesta.streaming_content).decode() if respuesta.status_code == 200 else ""
+        return respuesta, contenido
+
+    def exportar_tabla(self, tabla):
+        respuesta = self.client.get(f"/api/dashboard/powerbi/tablas/{tabla}/", {"formato": "ndjson"})
+        return respuesta, b"".join(respuesta.streaming_content).decode()
+
+    def test_json_conserva_la_forma_del_endpoint(self):
+        respuesta, contenido = self.exportar()
+        filas = json.loads(contenido)
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[0]["email"], "vol0@test.com")
+        self.assertIsNone(filas[0]["carrera"])
+
+    def test_ndjson_y_csv(self):
+        _, contenido = self.exportar(formato="ndjson")
+        self.assertEqual([json.loads(l)["id"] for l in contenido.splitlines()], [v.pk for v in self.voluntarios])
+        respuesta, contenido = self.exportar(formato="csv")
+        self.assertEqual(respuesta["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(len(list(csv.reader(io.StringIO(contenido)))), 4)
+
+    def test_incremental_incluye_bajas_y_etag(self):
+        respuesta, _ = self.exportar(formato="ndjson")
+        marca = respuesta["X-Watermark"]
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/", {"formato": "ndjson"}, HTTP_IF_NONE_MATCH=respuesta["ETag"]).status_code, 304)
+
+        baja = self.voluntarios[1]
+        baja.delete()
+        respuesta, contenido = self.exportar(formato="ndjson", updated_since=marca)
+        filas = [json.loads(l) for l in contenido.splitlines()]
+        self.assertIn(baja.pk, [f["id"] for f in filas])
+        self.assertFalse(next(f for f in filas if f["id"] == baja.pk)["is_active"])
+        self.assertGreater(respuesta["X-Watermark"], marca)
+
+    def test_cambios_en_tablas_relacionadas_cuentan_como_cambio(self):
+        carrera = Carrera.objects.create(nombre="Historia", facultad=Facultad.objects.create(nombre="Filosofía"))
+        Voluntario.objects.filter(pk=self.voluntarios[0].pk).update(carrera=carrera)
+        respuesta, _ = self.exportar(formato="ndjson")
+        marca, etag = respuesta["X-Watermark"], respuesta["ETag"]
+
+        # Renombrar la carrera o cambiar el email no toca Persona.updated_at
+        carrera.nombre = "Historia del Arte"
+        carrera.save()
+        usuario = self.voluntarios[2].user
+        usuario.email = "nuevo@test.com"
+        usuario.save()
+
+        respuesta, contenido = self.exportar(formato="ndjson", updated_since=marca)
+        filas = {f["id"]: f for f in map(json.loads, contenido.splitlines())}
+        self.assertEqual(filas[self.voluntarios[0].pk]["carrera_nombre"], "Historia del Arte")
+        self.assertEqual(filas[self.voluntarios[2].pk]["email"], "nuevo@test.com")
+        self.assertNotIn(self.voluntarios[1].pk, filas)
+        self.assertGreater(respuesta["X-Watermark"], marca)
+        self.assertNotEqual(self.exportar(formato="ndjson")[0]["ETag"], etag)
+
+    def test_baja_por_queryset_actualiza_la_marca(self):
+        respuesta, _ = self.exportar(formato="ndjson")
+        Voluntario.objects.filter(pk=self.voluntarios[0].pk).delete()
+        _, contenido = self.exportar(formato="ndjson", updated_since=respuesta["X-Watermark"])
+        ids = [json.loads(l)["id"] for l in contenido.splitlines()]
+        # updated_since es inclusivo: también vuelve la fila que tenía la marca anterior
+        self.assertIn(self.voluntarios[0].pk, ids)
+        self.assertNotIn(self.voluntarios[1].pk, ids)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.exportar(formato="xml")[0].status_code, 400)
+        self.assertEqual(self.exportar(updated_since="ayer")[0].status_code, 400)
+
+    def test_modelo_estrella_una_consulta_por_tabla(self):
+        hoy = timezone.localdate()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado", requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy, fecha_fin_cursado=hoy + timedelta(days=30), latitud=0, longitud=0,
+        )
+        turno = Turno.objects.create(voluntariado=voluntariado, fecha=hoy, hora_inicio="09:00", hora_fin="12:00", cupo=5)
+        inscripcion = InscripcionTurno.objects.create(turno=turno, voluntario_id=self.voluntarios[0].pk)
+        Asistencia.objects.create(inscripcion=inscripcion, presente=True, horas=3)
+
+        indice = self.client.get("/api/dashboard/powerbi/tablas/").data
+        self.assertEqual(
+            {t["nombre"] for t in indice},
+            {"voluntarios", "voluntariados", "organizaciones", "carreras", "turnos",
+             "inscripciones-turno", "inscripciones-convocatoria", "asistencias"},
+        )
+        for tabla in indice:
+            # La clave ya está validada: una consulta por tabla (más el ETag en las incrementales)
+            with self.assertNumQueries(2 if tabla["incremental"] else 1):
+                respuesta = self.client.get(tabla["url"], {"formato": "ndjson"})
+                filas = [json.loads(l) for l in b"".join(respuesta.streaming_content).decode().splitlines()]
+            self.assertTrue(all(list(f) == tabla["columnas"] for f in filas))
+
+        _, contenido = self.exportar_tabla("asistencias")
+        fila = json.loads(contenido)
+        self.assertEqual((fila["turno_id"], fila["voluntariado_id"], fila["horas"]), (turno.pk, voluntariado.pk, "3.00"))
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/tablas/turnos/", {"updated_since": "2026-01-01"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/dashboard/powerbi/tablas/otra/").status_code, 404)
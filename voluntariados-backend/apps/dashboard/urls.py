@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import PowerBIDashboardView, APIKeyView
+from .views import PowerBIDashboardView, PowerBITablasView, PowerBITablaView, APIKeyView
 
 urlpatterns = [
     path('powerbi/', PowerBIDashboardView.as_view(), name='powerbi_dashboard'),
     path('powerbi/key/', APIKeyView.as_view(), name='powerbi_api_key'),
+    path('powerbi/tablas/', PowerBITablasView.as_view(), name='powerbi_tablas'),
+    path('powerbi/tablas/<slug:tabla>/', PowerBITablaView.as_view(), name='powerbi_tabla'),
 ]
@@ -2,27 +2,122 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 
-from apps.persona.models import Voluntario
-from .serializers import VoluntarioPowerBISerializer, APIKeySerializer
+from . import export
+from .serializers import APIKeySerializer
 from .models import APIKey
 from .permissions import HasAPIKey
 
 
+def _exportar(request, nombre, transformar_json=None):
+    """
+    Respuesta en streaming de la tabla `nombre` de export.TABLAS.
+
+    Parámetros:
+    - formato: json (por defecto, un array), ndjson o csv.
+    - updated_since: fecha/hora ISO (solo tablas con marca de agua); solo las filas modificadas
+      desde entonces (ellas o las tablas relacionadas de las que salen columnas, ver
+      Tabla.marcas_relacionadas), incluidas las bajas (is_active=false). El encabezado X-Watermark trae el
+      valor para la próxima vez, y un If-None-Match igual al ETag actual responde 304.
+    """
+    tabla = export.TABLAS[nombre]
+    formato = request.query_params.get('formato', export.FORMATO_JSON)
+    if formato not in export.FORMATOS:
+        return Response(
+            {"detail": f"formato debe ser uno de: {', '.join(export.FORMATOS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    desde = None
+    if request.query_params.get('updated_since'):
+        if tabla.marca is None:
+            return Response({"detail": "Esta tabla no admite updated_since: usar carga completa"}, status=status.HTTP_400_BAD_REQUEST)
+        desde = parse_datetime(request.query_params['updated_since'])
+        if desde is None:
+            return Response({"detail": "updated_since debe ser una fecha/hora ISO 8601"}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(desde):
+            desde = timezone.make_aware(desde)
+
+    queryset = tabla.queryset()
+    if desde is not None:
+        # Incremental: las bajas lógicas también viajan, para que Power BI las quite
+        queryset = queryset.model.all_objects.filter(export.modificadas_desde(tabla.marcas, desde))
+
+    ultimo = None
+    if tabla.marca is not None:
+        cantidad, ultimo = export.estado(queryset, tabla.marcas)
+        etag = export.etag(formato, desde and desde.isoformat(), cantidad, ultimo and ultimo.isoformat())
+        if etag in [e.strip() for e in request.headers.get('If-None-Match', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+    filas = export.filas(queryset, tabla.columnas, settings.POWERBI_EXPORT_CHUNK_SIZE)
+    if formato == export.FORMATO_JSON and transformar_json is not None:
+        filas = map(transformar_json, filas)
+    response = StreamingHttpResponse(
+        export.RENDERERS[formato](filas, tabla.columnas), content_type=export.FORMATOS[formato]
+    )
+    if formato == export.FORMATO_CSV:
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    if tabla.marca is not None:
+        response['ETag'] = etag
+        if ultimo is not None:
+            response['X-Watermark'] = ultimo.isoformat()
+            response['Last-Modified'] = http_date(ultimo.timestamp())
+    return response
+
+
 class PowerBIDashboardView(APIView):
     """
-    Endpoint que devuelve una lista detallada de todos los voluntarios para Power BI.
+    Endpoint que devuelve una lista detallada de todos los voluntarios para Power BI, en streaming
+    (ver _exportar). En JSON conserva la forma original, con la carrera anidada.
     Requiere una clave de API válida para el acceso.
     """
     permission_classes = [HasAPIKey] # Usamos el nuevo permiso de clave de API
 
     def get(self, request, format=None):
-        queryset = Voluntario.objects.select_related(
-            'carrera__facultad',
-            'localidad__departamento__provincia'
-        ).all()
-        serializer = VoluntarioPowerBISerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return _exportar(request, 'voluntarios', transformar_json=export.anidar_carrera)
+
+
+class PowerBITablasView(APIView):
+    """
+    Índice del modelo estrella: tablas de dimensión y de hechos, con su URL y sus columnas,
+    para que una actualización programada cargue todas con una consulta cada una.
+    """
+    permission_classes = [HasAPIKey]
+
+    def get(self, request, format=None):
+        tablas = [
+            {
+                "nombre": nombre,
+                "tipo": tabla.tipo,
+                "url": request.build_absolute_uri(reverse('powerbi_tabla', kwargs={'tabla': nombre})),
+                "columnas": list(tabla.columnas),
+                "incremental": tabla.marca is not None,
+            }
+            for nombre, tabla in export.TABLAS.items()
+        ]
+        return Response(tablas, status=status.HTTP_200_OK)
+
+
+class PowerBITablaView(APIView):
+    """
+    Una tabla del modelo estrella (dimensión o hechos), en streaming; ver _exportar.
+    Claves sustitutas: `id` en cada tabla y `<dimensión>_id` en las columnas que la referencian.
+    """
+    permission_classes = [HasAPIKey]
+
+    def get(self, request, tabla, format=None):
+        if tabla not in export.TABLAS:
+            return Response({"detail": f"Tabla inexistente: {tabla}"}, status=status.HTTP_404_NOT_FOUND)
+        return _exportar(request, tabla)
 
 
 class APIKeyView(APIView):
@@ -34,17 +129,20 @@ class APIKeyView(APIView):
 
     def get(self, request, format=None):
         """
-        Obtiene la clave de API existente del usuario o crea una nueva si no existe.
+        Obtiene la clave de API existente del usuario (sin la clave en claro, que no se guarda)
+        o crea una nueva si no existe.
         """
-        api_key, created = APIKey.objects.get_or_create(user=request.user)
-        serializer = self.serializer_class(api_key)
+        api_key = APIKey.objects.filter(user=request.user).first()
+        if api_key is not None:
+            return Response(self.serializer_class(api_key).data, status=status.HTTP_200_OK)
+        api_key, key = APIKey.generar(request.user)
+        serializer = self.serializer_class(api_key, context={'key': key})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, format=None):
         """
         Genera una nueva clave de API, invalidando la anterior.
         """
-        APIKey.objects.filter(user=request.user).delete()
-        new_api_key = APIKey.objects.create(user=request.user)
-        serializer = self.serializer_class(new_api_key)
+        new_api_key, key = APIKey.generar(request.user)
+        serializer = self.serializer_class(new_api_key, context={'key': key})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facultad', '0002_carrera_updated_at_facultad_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carrera',
+            name='lote_baja',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facultad',
+            name='lote_baja',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -4,6 +4,8 @@ from apps.soft_delete.model import SoftDeleteModel
 class Facultad(SoftDeleteModel):
     nombre = models.CharField(max_length=200)
     activo = models.BooleanField(default=True)
+    # Marca de cambios para la exportación incremental a Power BI (apps.dashboard.export)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.nombre
@@ -12,6 +14,7 @@ class Carrera(SoftDeleteModel):
     nombre = models.CharField(max_length=200)
     facultad = models.ForeignKey(Facultad, on_delete=models.PROTECT, related_name="carreras")
     activo = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nombre} - {self.facultad.nombre}"
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizacion',
+            name='lote_baja',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
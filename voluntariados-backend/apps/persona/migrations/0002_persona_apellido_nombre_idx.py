@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persona', '0001_initial'),
+        ('ubicacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='persona',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='persona_apellido_nombre_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persona', '0002_persona_apellido_nombre_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='persona',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
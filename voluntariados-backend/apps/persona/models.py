@@ -11,11 +11,15 @@ class Persona(SoftDeleteModel):
     localidad = models.ForeignKey(
         "ubicacion.Localidad", null=True, blank=True, on_delete=models.SET_NULL
     )
+    # Marca de agua de la exportación incremental a Power BI (incluye las bajas lógicas, que pasan por save())
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ("apellido", "nombre")
         indexes = [
             models.Index(fields=["dni"]),
+            # Orden natural + desempate por id para la paginación por cursor
+            models.Index(fields=["apellido", "nombre", "id"], name="persona_apellido_nombre_idx"),
         ]
 
     def __str__(self):
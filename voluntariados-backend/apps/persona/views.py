@@ -5,6 +5,7 @@ from rest_framework import status
 from .models import Persona, Voluntario, Administrativo, Delegado, Gestionador
 from .serializers import PersonaSerializer, VoluntarioSerializer, AdministrativoSerializer, DelegadoSerializer, GestionadorSerializer
 from apps.users.permissions import IsAdministrador, IsGestionador
+from apps.core.pagination import PersonaPagination
 from apps.voluntariado.models import InscripcionTurno, Voluntariado
 from apps.voluntariado.serializers import VoluntariadoConTurnosSerializer
 from apps.asistencia.models import Asistencia
@@ -32,11 +33,8 @@ class IsAdminOrSelfOwner(permissions.BasePermission):
             return True
 
         # Si el usuario tiene una persona asociada, verificar si es el propietario del objeto
-        if hasattr(request.user, 'persona') and request.user.persona.pk == obj.pk:
-            return True
-        
-        # Para Voluntario, Administrativo, Delegado, también verificar si la persona asociada es el propietario
-        if isinstance(obj, (Voluntario, Administrativo, Delegado)) and hasattr(request.user, 'persona') and request.user.persona.pk == obj.persona.pk:
+        # (Voluntario, Administrativo y Delegado comparten la pk de su Persona)
+        if request.user.persona_id is not None and request.user.persona_id == obj.pk:
             return True
 
         return False
@@ -45,6 +43,7 @@ class IsAdminOrSelfOwner(permissions.BasePermission):
 class PersonaViewSet(viewsets.ModelViewSet):
     queryset = Persona.objects.all()
     serializer_class = PersonaSerializer
+    pagination_class = PersonaPagination
     
     def get_permissions(self):
         if self.action in ['list', 'create']:
@@ -56,6 +55,7 @@ class PersonaViewSet(viewsets.ModelViewSet):
 class VoluntarioViewSet(viewsets.ModelViewSet):
     queryset = Voluntario.objects.all()
     serializer_class = VoluntarioSerializer
+    pagination_class = PersonaPagination
     
     def get_permissions(self):
         if self.action in ['list', 'create']:
@@ -1,9 +1,81 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+def _niveles_cascada(model, queryset):
+    """
+    Arma la lista [(modelo, queryset)] del subárbol a partir de las relaciones declaradas
+    en `soft_delete_cascade` (nombres de relaciones inversas, p. ej. "turnos").
+    Cada nivel se filtra con una subconsulta sobre el nivel padre, así que no se lee ninguna fila.
+    """
+    niveles = [(model, queryset)]
+    for nombre in getattr(model, "soft_delete_cascade", ()):
+        relacion = model._meta.get_field(nombre)
+        hijo = relacion.related_model
+        hijos = hijo.all_objects.filter(**{f"{relacion.field.name}__in": queryset.values("pk")})
+        niveles += _niveles_cascada(hijo, hijos)
+    return niveles
+
+
+def _dar_de_baja(niveles, lote):
+    """
+    Un UPDATE por nivel, de las hojas a la raíz: el filtro de cada nivel depende de sus padres,
+    que todavía no cambiaron. Las filas que se dan de baja quedan marcadas con `lote` (lote_baja),
+    para que restaurar reactive solo esas. Retorna la cantidad de filas actualizadas en el primer nivel.
+    """
+    return _actualizar(niveles, {"is_active": True}, {"is_active": False, "lote_baja": lote})
+
+
+def _reactivar(niveles, lotes):
+    """
+    Inverso de _dar_de_baja: reactiva las filas de cada nivel dadas de baja en alguno de los `lotes`
+    (valores o subconsulta de lote_baja). Las que ya estaban dadas de baja por otro motivo quedan como estaban.
+    """
+    return _actualizar(niveles, {"is_active": False, "lote_baja__in": lotes}, {"is_active": True, "lote_baja": None})
+
+
+def _actualizar(niveles, filtro, valores):
+    # Los campos auto_now (p. ej. updated_at) también se actualizan: QuerySet.update no los toca solo
+    actualizadas = 0
+    ahora = timezone.now()
+    for model, queryset in reversed(niveles):
+        marcas = {campo.name: ahora for campo in model._meta.concrete_fields if getattr(campo, "auto_now", False)}
+        actualizadas = models.QuerySet.update(queryset.filter(**filtro), **valores, **marcas)
+    return actualizadas
+
+
+def _despues_de_baja(niveles, lote):
+    for model, queryset in niveles:
+        model.al_dar_de_baja(queryset.filter(lote_baja=lote))
+
+
+def _despues_de_restaurar(niveles):
+    for model, queryset in niveles:
+        model.al_restaurar(queryset.filter(is_active=True))
+
 
 class SoftDeleteQuerySet(models.QuerySet):
     def delete(self):
-        # Borrado lógico: marcar como inactivo
-        return super().update(is_active=False)
+        # Borrado lógico en cascada (ver SoftDeleteModel.soft_delete_cascade)
+        with transaction.atomic(using=self.db):
+            lote = uuid.uuid4()
+            dadas_de_baja = _dar_de_baja(_niveles_cascada(self.model, self), lote)
+            # `self` puede filtrar por is_active (objects), que ya no incluye las filas recién dadas de baja
+            _despues_de_baja(_niveles_cascada(self.model, self.model.all_objects.filter(lote_baja=lote)), lote)
+            return dadas_de_baja
+
+    def restore(self):
+        # Reactiva las filas y la parte de su subárbol que se dio de baja junto con ellas
+        with transaction.atomic(using=self.db):
+            raices = self.filter(is_active=False)
+            niveles = _niveles_cascada(self.model, self)
+            # La raíz se actualiza última, así que la subconsulta de lotes sigue viendo las raíces dadas de baja
+            _reactivar(niveles[1:], raices.values("lote_baja"))
+            restauradas = _actualizar([(self.model, raices)], {}, {"is_active": True, "lote_baja": None})
+            _despues_de_restaurar(niveles)
+            return restauradas
 
     def hard_delete(self):
         # Borrado real
@@ -17,12 +89,15 @@ class SoftDeleteQuerySet(models.QuerySet):
 
 
 class SoftDeleteManager(models.Manager):
+    # Las subclases pueden usar SoftDeleteManager.from_queryset(<QuerySet propio>)
+    _queryset_class = SoftDeleteQuerySet
+
     def get_queryset(self):
         # Por defecto, devolver solo activos
-        return SoftDeleteQuerySet(self.model, using=self._db).filter(is_active=True)
+        return self._queryset_class(self.model, using=self._db).filter(is_active=True)
 
     def all_with_deleted(self):
-        return SoftDeleteQuerySet(self.model, using=self._db)
+        return self._queryset_class(self.model, using=self._db)
 
     def deleted_only(self):
         return self.all_with_deleted().dead()
@@ -30,17 +105,51 @@ class SoftDeleteManager(models.Manager):
 
 class SoftDeleteModel(models.Model):
     is_active = models.BooleanField(default=True)
+    # Baja que desactivó la fila (la propia o la de un padre en cascada): restaurar un padre solo
+    # reactiva los hijos de su mismo lote. Null en las filas activas y en las bajas anteriores a este campo.
+    lote_baja = models.UUIDField(null=True, blank=True, editable=False)
 
     objects = SoftDeleteManager()        # Devuelve solo activos
     all_objects = SoftDeleteQuerySet.as_manager()  # Incluye todos
 
+    # Relaciones inversas (hacia otros SoftDeleteModel) que se dan de baja / reactivan junto con la fila.
+    # Restaurar solo reactiva los hijos que se dieron de baja en la misma operación (lote_baja): los
+    # que ya estaban dados de baja antes siguen así.
+    soft_delete_cascade = ()
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def al_dar_de_baja(cls, queryset):
+        """Se llama después de una baja, con las filas de cada nivel del subárbol que se dieron de baja en ella."""
+
+    @classmethod
+    def al_restaurar(cls, queryset):
+        """Se llama después de restaurar, con las filas activas de cada nivel del subárbol (p. ej. para recalcular contadores)."""
+
+    def _niveles_hijos(self, using=None):
+        return _niveles_cascada(type(self), type(self).all_objects.using(using).filter(pk=self.pk))
+
     def delete(self, using=None, keep_parents=False):
-        # Borrado lógico
-        self.is_active = False
-        self.save()
+        # Borrado lógico; la fila se guarda con save() para que quede en el historial
+        with transaction.atomic(using=using):
+            self.lote_baja = uuid.uuid4()
+            niveles = self._niveles_hijos(using)
+            _dar_de_baja(niveles[1:], self.lote_baja)
+            self.is_active = False
+            self.save()
+            _despues_de_baja(niveles, self.lote_baja)
+
+    def restore(self, using=None):
+        with transaction.atomic(using=using):
+            niveles = self._niveles_hijos(using)
+            if self.lote_baja is not None:
+                _reactivar(niveles[1:], [self.lote_baja])
+            self.is_active = True
+            self.lote_baja = None
+            self.save()
+            _despues_de_restaurar(niveles)
 
     def hard_delete(self, using=None, keep_parents=False):
         # Borrado real
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ubicacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='departamento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='localidad',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='provincia',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -2,7 +2,8 @@ from django.db import models
 from apps.soft_delete.model import SoftDeleteModel
 
 
-# Modelos básicos de ubicación geográfica: País, Provincia, Departamento, Localidad
+# Modelos básicos de ubicación geográfica: País, Provincia, Departamento, Localidad.
+# updated_at: marca de cambios para la exportación incremental a Power BI (apps.dashboard.export)
 
 class Pais(SoftDeleteModel):
     nombre = models.CharField(max_length=100)
@@ -13,6 +14,7 @@ class Pais(SoftDeleteModel):
 class Provincia(SoftDeleteModel):
     nombre = models.CharField(max_length=100)
     pais = models.ForeignKey(Pais, on_delete=models.PROTECT, related_name="provincias")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nombre} ({self.pais.nombre})"
@@ -20,6 +22,7 @@ class Provincia(SoftDeleteModel):
 class Departamento(SoftDeleteModel):
     nombre = models.CharField(max_length=100)
     provincia = models.ForeignKey(Provincia, on_delete=models.PROTECT, related_name="departamentos")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nombre} - {self.provincia.nombre}"
@@ -28,6 +31,7 @@ class Localidad(SoftDeleteModel):
     nombre = models.CharField(max_length=150)
     departamento = models.ForeignKey(Departamento, on_delete=models.PROTECT, related_name="localidades")
     codigo_postal = models.CharField(max_length=20, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nombre} ({self.departamento.provincia.nombre})"
@@ -0,0 +1,75 @@
+"""
+Autenticación JWT con un camino sin base de datos para lecturas (ver ClaimsJWTAuthentication).
+Los claims los agrega apps.users.token_auth.agregar_claims al emitir / renovar los tokens.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.users.principal import Principal
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuario armado solo con los claims del token (ver agregar_claims), sin consultar la base.
+    Expone lo que usan los permisos y las vistas de lectura: role, Roles, persona_id, settled_up y principal.
+    """
+
+    Roles = get_user_model().Roles
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def role(self):
+        return self.token["role"]
+
+    @cached_property
+    def persona_id(self):
+        return self.token.get("persona_id")
+
+    @cached_property
+    def settled_up(self):
+        return self.token.get("settled_up", False)
+
+    @cached_property
+    def principal(self):
+        return Principal(
+            user_id=self.pk,
+            role=self.role,
+            persona_id=self.persona_id,
+            voluntario_id=self.token.get("voluntario_id"),
+            gestionador_id=self.token.get("gestionador_id"),
+            organizacion_id=self.token.get("organizacion_id"),
+        )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication con un camino sin base de datos: en requests de lectura (GET/HEAD/OPTIONS)
+    a vistas con `autenticacion_por_claims = True`, el usuario es un ClaimsUser armado con los claims
+    del token. Las escrituras, el resto de las vistas y los tokens emitidos antes de los claims
+    cargan el User completo como siempre. Solo se usa con settings.JWT_STATELESS_READS = True.
+
+    Los claims se renuevan en cada /api/token/refresh/, así que un cambio de organización o la baja
+    de un usuario se ven en las lecturas recién con el próximo access token.
+    """
+
+    def authenticate(self, request):
+        vista = (getattr(request, "parser_context", None) or {}).get("view")
+        self._por_claims = (
+            getattr(settings, "JWT_STATELESS_READS", False)
+            and request.method in permissions.SAFE_METHODS
+            and getattr(vista, "autenticacion_por_claims", False)
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self._por_claims and "role" in validated_token and api_settings.USER_ID_CLAIM in validated_token:
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
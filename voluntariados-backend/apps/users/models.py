@@ -5,11 +5,12 @@ from django.contrib.auth.models import (
     PermissionsMixin
 )
 from django.utils.translation import gettext_lazy
+from django.utils.functional import cached_property
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 import secrets
 from datetime import timedelta
-from simple_history.models import HistoricalRecords
+from apps.core.history import BufferedHistoricalRecords
 
 
 class UserManager(BaseUserManager):
@@ -64,9 +65,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     settled_up = models.BooleanField(default=False)  # True when user has completed persona setup
     signup_date = models.DateTimeField(null=True, auto_now_add=True)
     last_login = models.DateTimeField(null=True, blank=True)
+    # Marca de cambios para la exportación a Power BI; los save(update_fields=[...]) sin este campo
+    # (p. ej. last_login) no la tocan
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = UserManager()
-    history = HistoricalRecords()
+    history = BufferedHistoricalRecords()
 
     USERNAME_FIELD = "email"   
     REQUIRED_FIELDS = []       
@@ -91,6 +95,12 @@ class User(AbstractBaseUser, PermissionsMixin):
             self.persona.delete()
         super().delete(*args, **kwargs)
 
+    @cached_property
+    def principal(self):
+        """Rol, persona, voluntario y organización del usuario (ver apps.users.principal)."""
+        from apps.users.principal import resolver_principal
+        return resolver_principal(self)
+
     def __str__(self):
         return f"{self.email} ({self.get_role_display()})"
 
@@ -67,8 +67,8 @@ class CanUpdateOwnPersona(permissions.BasePermission):
             return False
         
         # Para GET, PATCH, PUT: los usuarios pueden acceder a su propia persona
-        if hasattr(request.user, 'persona') and request.user.persona:
-            return obj.id == request.user.persona.id
+        if request.user.persona_id is not None:
+            return obj.id == request.user.persona_id
         
         return False
 
@@ -0,0 +1,62 @@
+"""
+Principal de la request: rol, persona, voluntario y organización del usuario autenticado.
+
+`request.user.principal` se resuelve una sola vez por request (cached_property sobre la instancia
+de User que autenticó la request) con una única consulta, en lugar de recorrer
+persona.delegado / persona.administrativo / persona.gestionador con hasattr.
+"""
+from typing import NamedTuple, Optional
+
+
+class Principal(NamedTuple):
+    user_id: Optional[int]
+    role: str
+    persona_id: Optional[int] = None
+    voluntario_id: Optional[int] = None
+    gestionador_id: Optional[int] = None
+    organizacion_id: Optional[int] = None
+
+    @property
+    def es_admin(self):
+        return self.role == "ADMIN"
+
+    @property
+    def es_gestionador(self):
+        return self.role in ("ADMIN", "DELEG")
+
+    def puede_gestionar(self, organizacion_id):
+        """ADMIN gestiona todo; el resto, solo voluntariados de su propia organización."""
+        if self.es_admin:
+            return True
+        return organizacion_id is not None and organizacion_id == self.organizacion_id
+
+
+ANONIMO = Principal(user_id=None, role="")
+
+
+def resolver_principal(user):
+    """
+    Arma el Principal de `user` con una consulta. Sin persona, o con rol ADMIN (sus permisos no
+    dependen de la organización ni del voluntario), alcanza con los campos del propio usuario.
+    """
+    from apps.persona.models import Persona
+
+    if user is None or not user.is_authenticated:
+        return ANONIMO
+    if user.persona_id is None or user.role == "ADMIN":
+        return Principal(user_id=user.pk, role=user.role, persona_id=user.persona_id)
+
+    # Igual que los accesos user.persona / persona.voluntario: también personas dadas de baja
+    fila = (
+        Persona.all_objects.filter(pk=user.persona_id)
+        .values("voluntario__pk", "gestionador__pk", "gestionador__delegado__organizacion_id")
+        .first()
+    ) or {}
+    return Principal(
+        user_id=user.pk,
+        role=user.role,
+        persona_id=user.persona_id,
+        voluntario_id=fila.get("voluntario__pk"),
+        gestionador_id=fila.get("gestionador__pk"),
+        organizacion_id=fila.get("gestionador__delegado__organizacion_id"),
+    )
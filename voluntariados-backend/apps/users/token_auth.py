@@ -1,9 +1,31 @@
+from django.contrib.auth import get_user_model
 from django.utils import timezone
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+
+def agregar_claims(token, user):
+    """Claims propios del token: lo que necesitan los permisos para no consultar la base."""
+    principal = user.principal
+    token["email"] = user.email
+    token["role"] = user.role
+    token["is_staff"] = user.is_staff
+    token["settled_up"] = user.settled_up
+    token["persona_id"] = principal.persona_id
+    token["voluntario_id"] = principal.voluntario_id
+    token["gestionador_id"] = principal.gestionador_id
+    token["organizacion_id"] = principal.organizacion_id
+    return token
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # El refresh lleva los claims y el access los copia
+        return agregar_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
         try:
@@ -18,3 +40,18 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # El access renovado lleva claims frescos: el rol no cambia, pero la organización sí puede
+        access = AccessToken(data["access"])
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}).first()
+        if user is not None:
+            data["access"] = str(agregar_claims(access, user))
+        return data
+
+
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = MyTokenRefreshSerializer
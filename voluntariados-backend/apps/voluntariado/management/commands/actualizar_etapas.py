@@ -0,0 +1,32 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.voluntariado.models import Voluntariado
+
+
+class Command(BaseCommand):
+    help = "Recalcula la etapa persistida de los voluntariados (transiciones por fecha). Ejecutar diariamente."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=str,
+            help="Fecha ISO (YYYY-MM-DD) a usar como 'hoy'. Útil para pruebas.",
+        )
+
+    def handle(self, *args, **options):
+        today_override = options.get("date")
+        if today_override:
+            try:
+                hoy = datetime.date.fromisoformat(today_override)
+            except ValueError:
+                self.stderr.write(self.style.ERROR("--date must be in YYYY-MM-DD format"))
+                return
+        else:
+            hoy = timezone.now().date()
+
+        actualizados = Voluntariado.actualizar_etapas(today=hoy)
+        self.stdout.write(self.style.SUCCESS(
+            f"Etapas recalculadas para {hoy.isoformat()}. Voluntariados actualizados: {actualizados}."
+        ))
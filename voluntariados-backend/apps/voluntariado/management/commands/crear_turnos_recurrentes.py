@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.voluntariado.models import Turno
+from apps.voluntariado.serializers import TurnoRecurrenteSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea los turnos semanales de un voluntariado a partir de una regla de recurrencia "
+        "(días de la semana, horario, cupo y lugar) dentro de su período de cursado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("voluntariado", type=int, help="ID del voluntariado.")
+        parser.add_argument(
+            "--dias",
+            required=True,
+            help="Días de la semana separados por coma (0 = lunes ... 6 = domingo). Ej: 0,2,4",
+        )
+        parser.add_argument("--hora-inicio", required=True, help="Hora de inicio (HH:MM).")
+        parser.add_argument("--hora-fin", required=True, help="Hora de fin (HH:MM).")
+        parser.add_argument("--cupo", type=int, default=1)
+        parser.add_argument("--lugar", default=None)
+        parser.add_argument("--desde", default=None, help="Fecha ISO (YYYY-MM-DD); por defecto, inicio del cursado.")
+        parser.add_argument("--hasta", default=None, help="Fecha ISO (YYYY-MM-DD); por defecto, fin del cursado.")
+
+    def handle(self, *args, **options):
+        data = {
+            "voluntariado_id": options["voluntariado"],
+            "dias_semana": [d.strip() for d in options["dias"].split(",") if d.strip()],
+            "hora_inicio": options["hora_inicio"],
+            "hora_fin": options["hora_fin"],
+            "cupo": options["cupo"],
+            "lugar": options["lugar"],
+        }
+        if options["desde"]:
+            data["fecha_desde"] = options["desde"]
+        if options["hasta"]:
+            data["fecha_hasta"] = options["hasta"]
+
+        serializer = TurnoRecurrenteSerializer(data=data)
+        if not serializer.is_valid():
+            raise CommandError(f"Regla inválida: {serializer.errors}")
+        validated = serializer.validated_data
+
+        creados, omitidos = Turno.crear_recurrentes(
+            validated["voluntariado"],
+            validated["dias_semana"],
+            validated["hora_inicio"],
+            validated["hora_fin"],
+            cupo=validated["cupo"],
+            lugar=validated.get("lugar"),
+            fecha_desde=validated.get("fecha_desde"),
+            fecha_hasta=validated.get("fecha_hasta"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Turnos creados: {len(creados)}. Omitidos (ya existían): {omitidos}."
+        ))
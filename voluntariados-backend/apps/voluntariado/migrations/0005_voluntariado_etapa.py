@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _calcular_etapa(v, today, tiene_pendientes):
+    # Copia de Voluntariado.calcular_etapa (los modelos históricos no exponen métodos)
+    if not v.requiere_convocatoria:
+        if not v.fecha_inicio_cursado or not v.fecha_fin_cursado:
+            return None
+        if today < v.fecha_inicio_cursado:
+            return 'Proximamente'
+        if today <= v.fecha_fin_cursado:
+            return 'Activo'
+        return 'Finalizado'
+    if not v.fecha_inicio_convocatoria or not v.fecha_fin_convocatoria:
+        return None
+    if today < v.fecha_inicio_convocatoria:
+        return 'Proximamente'
+    if today <= v.fecha_fin_convocatoria:
+        return 'Convocatoria'
+    if not v.fecha_inicio_cursado or not v.fecha_fin_cursado:
+        return 'Finalizado'
+    if today > v.fecha_fin_cursado:
+        return 'Finalizado'
+    if today < v.fecha_inicio_cursado or tiene_pendientes:
+        return 'Preparación'
+    return 'Activo'
+
+
+def poblar_etapas(apps, schema_editor):
+    Voluntariado = apps.get_model('voluntariado', 'Voluntariado')
+    InscripcionConvocatoria = apps.get_model('voluntariado', 'InscripcionConvocatoria')
+    today = timezone.now().date()
+    con_pendientes = set(
+        InscripcionConvocatoria.objects.filter(estado='INS', is_active=True)
+        .values_list('voluntariado_id', flat=True)
+    )
+    cambios = {}
+    for v in Voluntariado.objects.all().iterator():
+        etapa = _calcular_etapa(v, today, v.pk in con_pendientes)
+        if etapa is not None:
+            cambios.setdefault(etapa, []).append(v.pk)
+    for etapa, ids in cambios.items():
+        Voluntariado.objects.filter(pk__in=ids).update(etapa=etapa)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voluntariado', '0004_historicalvoluntariado_add_notificacion_activo_enviada_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalvoluntariado',
+            name='etapa',
+            field=models.CharField(blank=True, choices=[('Proximamente', 'Proximamente'), ('Convocatoria', 'Convocatoria'), ('Preparación', 'Preparación'), ('Activo', 'Activo'), ('Finalizado', 'Finalizado')], db_index=True, editable=False, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='voluntariado',
+            name='etapa',
+            field=models.CharField(blank=True, choices=[('Proximamente', 'Proximamente'), ('Convocatoria', 'Convocatoria'), ('Preparación', 'Preparación'), ('Activo', 'Activo'), ('Finalizado', 'Finalizado')], db_index=True, editable=False, max_length=20, null=True),
+        ),
+        migrations.RunPython(poblar_etapas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voluntariado', '0005_voluntariado_etapa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(fields=['-fecha', 'hora_inicio', 'id'], name='turno_fecha_hora_idx'),
+        ),
+    ]
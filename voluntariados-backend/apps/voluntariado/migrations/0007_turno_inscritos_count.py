@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:12
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def poblar_inscritos(apps, schema_editor):
+    Turno = apps.get_model('voluntariado', 'Turno')
+    InscripcionTurno = apps.get_model('voluntariado', 'InscripcionTurno')
+    activas = (
+        InscripcionTurno.objects.filter(
+            turno=models.OuterRef('pk'), is_active=True, estado__in=['INS', 'ASI']
+        )
+        .order_by()
+        .values('turno')
+        .annotate(_total=models.Count('*'))
+        .values('_total')
+    )
+    Turno.objects.update(
+        inscritos_count=Coalesce(models.Subquery(activas, output_field=models.IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voluntariado', '0006_turno_fecha_hora_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalturno',
+            name='inscritos_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='inscritos_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(poblar_inscritos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persona', '0002_persona_apellido_nombre_idx'),
+        ('voluntariado', '0007_turno_inscritos_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalinscripcionturno',
+            name='en_espera_desde',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inscripcionturno',
+            name='en_espera_desde',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='historicalinscripcionturno',
+            name='estado',
+            field=models.CharField(choices=[('INS', 'Inscrito'), ('CAN', 'Cancelado'), ('ASI', 'Asistió'), ('ESP', 'En lista de espera')], default='INS', max_length=4),
+        ),
+        migrations.AlterField(
+            model_name='inscripcionturno',
+            name='estado',
+            field=models.CharField(choices=[('INS', 'Inscrito'), ('CAN', 'Cancelado'), ('ASI', 'Asistió'), ('ESP', 'En lista de espera')], default='INS', max_length=4),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionturno',
+            index=models.Index(fields=['turno', 'estado', 'en_espera_desde'], name='insc_turno_espera_idx'),
+        ),
+    ]
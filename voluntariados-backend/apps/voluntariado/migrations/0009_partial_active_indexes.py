@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persona', '0002_persona_apellido_nombre_idx'),
+        ('voluntariado', '0008_inscripcion_turno_lista_espera'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inscripcionturno',
+            name='insc_turno_espera_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionconvocatoria',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['voluntariado', 'estado'], name='insc_conv_vdo_estado_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionconvocatoria',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['voluntario', 'voluntariado'], name='insc_conv_vol_vdo_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionturno',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['turno', 'estado', 'en_espera_desde'], name='insc_turno_estado_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionturno',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['voluntario', 'estado'], name='insc_vol_estado_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['voluntariado', 'fecha'], name='turno_vdo_fecha_act_idx'),
+        ),
+    ]
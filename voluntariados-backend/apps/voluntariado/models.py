@@ -1,9 +1,13 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
-from simple_history.models import HistoricalRecords
+from simple_history.utils import bulk_create_with_history
 
+from apps.core.history import BufferedHistoricalRecords
 from apps.persona.models import Gestionador
-from apps.soft_delete.model import SoftDeleteModel
+from apps.soft_delete.model import SoftDeleteModel, SoftDeleteManager, SoftDeleteQuerySet
 
 
 class DescripcionVoluntariado(SoftDeleteModel):
@@ -11,11 +15,11 @@ class DescripcionVoluntariado(SoftDeleteModel):
     logo = models.FileField(upload_to="logos", null=True, blank=True)
     portada = models.FileField(upload_to="logos", null=True, blank=True)
     resumen = models.TextField(blank=True)
-    history = HistoricalRecords()
+    history = BufferedHistoricalRecords()
 
 
 # Custom HistoricalRecords manager to adjust db_column for the historical model
-class VoluntariadoHistoricalRecords(HistoricalRecords):
+class VoluntariadoHistoricalRecords(BufferedHistoricalRecords):
     def get_historical_model(self, model):
         historical_model = super().get_historical_model(model)
         # Find the 'gestionadores' field in the historical model and set its db_column
@@ -27,7 +31,37 @@ class VoluntariadoHistoricalRecords(HistoricalRecords):
         return historical_model
 
 
+class VoluntariadoQuerySet(SoftDeleteQuerySet):
+    def with_progreso(self, ahora=None):
+        """
+        Anota total_turnos y turnos_finalizados (turnos activos, ver Turno.filtro_finalizados)
+        como subconsultas correlacionadas, sin multiplicar filas.
+        """
+        turnos = Turno.objects.filter(voluntariado=models.OuterRef('pk'))
+        finalizados = turnos.filter(Turno.filtro_finalizados(ahora))
+        return self.annotate(
+            total_turnos=_count_subquery(turnos, 'voluntariado'),
+            turnos_finalizados=_count_subquery(finalizados, 'voluntariado'),
+        )
+
+
 class Voluntariado(SoftDeleteModel):
+    class Etapa(models.TextChoices):
+        PROXIMAMENTE = "Proximamente", "Proximamente"
+        CONVOCATORIA = "Convocatoria", "Convocatoria"
+        PREPARACION = "Preparación", "Preparación"
+        ACTIVO = "Activo", "Activo"
+        FINALIZADO = "Finalizado", "Finalizado"
+
+    # Valor del query param `status` -> etapa persistida
+    ETAPA_POR_STATUS = {
+        'upcoming': Etapa.PROXIMAMENTE,
+        'convocatoria': Etapa.CONVOCATORIA,
+        'preparacion': Etapa.PREPARACION,
+        'active': Etapa.ACTIVO,
+        'finished': Etapa.FINALIZADO,
+    }
+
     nombre = models.CharField(max_length=250)
     descripcion = models.ForeignKey(DescripcionVoluntariado, on_delete=models.SET_NULL, related_name='voluntariados',null=True)
 
@@ -51,8 +85,18 @@ class Voluntariado(SoftDeleteModel):
     # Marca cuándo se enviaron los correos de activación (para evitar envíos duplicados)
     notificacion_activo_enviada_at = models.DateTimeField(null=True, blank=True)
 
+    # Etapa actual persistida (ver calcular_etapa). Se mantiene al guardar el voluntariado,
+    # al modificar inscripciones de convocatoria y con el comando diario `actualizar_etapas`.
+    etapa = models.CharField(max_length=20, choices=Etapa.choices, null=True, blank=True, db_index=True, editable=False)
+
     history = VoluntariadoHistoricalRecords() # Use our custom manager
 
+    objects = SoftDeleteManager.from_queryset(VoluntariadoQuerySet)()
+    all_objects = VoluntariadoQuerySet.as_manager()
+
+    # Borrado lógico en cascada: turnos (-> inscripciones -> asistencias) e inscripciones de convocatoria
+    soft_delete_cascade = ("turnos", "inscripciones")
+
     # Ubicación geográfica
     latitud = models.FloatField(null=False, blank=True, verbose_name="Latitud")
     longitud = models.FloatField(null=False, blank=True, verbose_name="Longitud")
@@ -63,7 +107,13 @@ class Voluntariado(SoftDeleteModel):
         Override save to clean up turnos when cursado dates change.
         If fecha_inicio_cursado or fecha_fin_cursado are modified,
         delete all turnos that fall outside the new date range.
+        Also recalculates the persisted etapa.
         """
+        self.etapa = self.calcular_etapa()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'etapa' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['etapa']
+
         # Check if this is an update (not a new instance)
         if self.pk:
             try:
@@ -97,21 +147,6 @@ class Voluntariado(SoftDeleteModel):
         # Normal save for new instances or when dates haven't changed
         super().save(*args, **kwargs)
 
-    def delete(self, using=None, keep_parents=False):
-        """
-        Cascade soft delete to related objects:
-        - All Turnos (which will cascade to InscripcionTurno)
-        - All InscripcionConvocatoria
-        """
-        # Soft delete all related turnos (each Turno will handle its own cascades)
-        self.turnos.all().delete()
-        
-        # Soft delete all related inscripciones de convocatoria
-        self.inscripciones.all().delete()
-        
-        # Finally, soft delete the Voluntariado itself
-        super().delete(using=using, keep_parents=keep_parents)
-
     def __str__(self):
         return self.nombre
 
@@ -147,6 +182,175 @@ class Voluntariado(SoftDeleteModel):
 
         return True
 
+    def calcular_etapa(self, today=None, tiene_pendientes=None):
+        """
+        Calcula la etapa del voluntariado basándose en las fechas y requiere_convocatoria:
+
+        Para requiere_convocatoria=False:
+        - Proximamente: Antes del cursado
+        - Activo: Durante el período de cursado
+        - Finalizado: Después del período de cursado
+
+        Para requiere_convocatoria=True:
+        - Proximamente: Antes de la convocatoria
+        - Convocatoria: Durante el período de convocatoria
+        - Preparación: Entre el fin de convocatoria y el inicio de cursado
+          O si hay InscripcionConvocatoria con estado INSCRITO (pending review)
+        - Activo: Durante el período de cursado
+        - Finalizado: Después del período de cursado
+
+        `tiene_pendientes` permite pasar el resultado ya calculado (p. ej. anotado en un queryset);
+        si es None se consulta solo cuando las fechas lo hacen necesario.
+        """
+        from django.utils import timezone
+        if today is None:
+            today = timezone.now().date()
+
+        # Para voluntariados que NO requieren convocatoria
+        if not self.requiere_convocatoria:
+            if not self.fecha_inicio_cursado or not self.fecha_fin_cursado:
+                return None
+            if today < self.fecha_inicio_cursado:
+                return self.Etapa.PROXIMAMENTE
+            if today <= self.fecha_fin_cursado:
+                return self.Etapa.ACTIVO
+            return self.Etapa.FINALIZADO
+
+        # Para voluntariados que SÍ requieren convocatoria
+        if not self.fecha_inicio_convocatoria or not self.fecha_fin_convocatoria:
+            return None
+        if today < self.fecha_inicio_convocatoria:
+            return self.Etapa.PROXIMAMENTE
+        if today <= self.fecha_fin_convocatoria:
+            return self.Etapa.CONVOCATORIA
+
+        # Si no hay fechas de cursado pero ya pasó la convocatoria, considerarlo finalizado
+        if not self.fecha_inicio_cursado or not self.fecha_fin_cursado:
+            return self.Etapa.FINALIZADO
+
+        if today > self.fecha_fin_cursado:
+            return self.Etapa.FINALIZADO
+        if today < self.fecha_inicio_cursado:
+            return self.Etapa.PREPARACION
+
+        # Durante el cursado sigue en Preparación mientras haya inscripciones pendientes de revisión
+        if tiene_pendientes is None:
+            tiene_pendientes = bool(self.pk) and self.tiene_pendientes_convocatoria()
+        if tiene_pendientes:
+            return self.Etapa.PREPARACION
+        return self.Etapa.ACTIVO
+
+    def actualizar_etapa(self, today=None):
+        """
+        Recalcula la etapa y la persiste con un UPDATE directo (sin pasar por save ni history).
+        Devuelve la etapa resultante.
+        """
+        etapa = self.calcular_etapa(today=today)
+        if etapa != self.etapa:
+            Voluntariado.all_objects.filter(pk=self.pk).update(etapa=etapa)
+            self.etapa = etapa
+        return etapa
+
+    @classmethod
+    def actualizar_etapas(cls, today=None):
+        """
+        Barrido de transiciones: recalcula la etapa de todos los voluntariados activos
+        con una única consulta de lectura y un UPDATE por etapa que cambió.
+        Devuelve la cantidad de voluntariados actualizados.
+        """
+        from django.utils import timezone
+        if today is None:
+            today = timezone.now().date()
+
+        pendientes = InscripcionConvocatoria.objects.filter(
+            voluntariado=models.OuterRef('pk'),
+            estado=InscripcionConvocatoria.Status.INSCRITO,
+        )
+        qs = cls.objects.annotate(_tiene_pendientes=models.Exists(pendientes)).only(
+            'id', 'etapa', 'requiere_convocatoria',
+            'fecha_inicio_convocatoria', 'fecha_fin_convocatoria',
+            'fecha_inicio_cursado', 'fecha_fin_cursado',
+        )
+
+        cambios = {}
+        for voluntariado in qs.iterator(chunk_size=2000):
+            etapa = voluntariado.calcular_etapa(today=today, tiene_pendientes=voluntariado._tiene_pendientes)
+            if etapa != voluntariado.etapa:
+                cambios.setdefault(etapa, []).append(voluntariado.pk)
+
+        actualizados = 0
+        for etapa, ids in cambios.items():
+            actualizados += cls.all_objects.filter(pk__in=ids).update(etapa=etapa)
+        return actualizados
+
+
+def _count_subquery(queryset, outer_field):
+    """COUNT(*) correlacionado como subconsulta escalar (0 si no hay filas)."""
+    counted = (
+        queryset.order_by()
+        .values(outer_field)
+        .annotate(_total=models.Count('*'))
+        .values('_total')
+    )
+    return Coalesce(models.Subquery(counted, output_field=models.IntegerField()), 0)
+
+
+class TurnoQuerySet(SoftDeleteQuerySet):
+    def with_stats(self):
+        """
+        Anota en una única consulta los conteos que necesita TurnoSerializer
+        (las inscripciones activas ya están en la columna inscritos_count):
+        - asistencias_registradas: asistencias activas de inscripciones activas
+        - en_espera_count: inscripciones en lista de espera
+        - inscripciones_aceptadas_count / asistencias_aceptadas_count: lo mismo, restringido a
+          voluntarios con convocatoria ACEPTADA; asistencia_completa se deriva de ambos
+        Cada conteo es una subconsulta correlacionada, así que no multiplica filas ni requiere DISTINCT.
+        """
+        from apps.asistencia.models import Asistencia
+
+        estados_activos = [InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
+
+        inscripciones = InscripcionTurno.objects.filter(turno=models.OuterRef('pk'))
+        asistencias = Asistencia.objects.filter(inscripcion__turno=models.OuterRef('pk'), inscripcion__is_active=True)
+
+        # Convocatoria aceptada del voluntario para el voluntariado del turno
+        aceptada_inscripcion = InscripcionConvocatoria.objects.filter(
+            voluntario=models.OuterRef('voluntario'),
+            voluntariado=models.OuterRef('turno__voluntariado'),
+            estado=InscripcionConvocatoria.Status.ACEPTADO,
+        )
+        aceptada_asistencia = InscripcionConvocatoria.objects.filter(
+            voluntario=models.OuterRef('inscripcion__voluntario'),
+            voluntariado=models.OuterRef('inscripcion__turno__voluntariado'),
+            estado=InscripcionConvocatoria.Status.ACEPTADO,
+        )
+
+        return self.annotate(
+            asistencias_registradas=_count_subquery(asistencias, 'inscripcion__turno'),
+            en_espera_count=_count_subquery(
+                inscripciones.filter(estado=InscripcionTurno.Status.EN_ESPERA), 'turno'
+            ),
+            inscripciones_aceptadas_count=_count_subquery(
+                inscripciones.filter(estado__in=estados_activos).filter(models.Exists(aceptada_inscripcion)),
+                'turno',
+            ),
+            asistencias_aceptadas_count=_count_subquery(
+                asistencias.filter(models.Exists(aceptada_asistencia)),
+                'inscripcion__turno',
+            ),
+        )
+
+    def recalcular_inscritos(self):
+        """
+        Recalcula inscritos_count desde las inscripciones activas, en un único UPDATE.
+        Para cargas de datos que crean InscripcionTurno sin pasar por reservar_cupo().
+        """
+        activas = InscripcionTurno.objects.filter(
+            turno=models.OuterRef('pk'),
+            estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO],
+        )
+        return self.update(inscritos_count=_count_subquery(activas, 'turno'))
+
 
 class Turno(SoftDeleteModel):
     voluntariado = models.ForeignKey("Voluntariado", on_delete=models.CASCADE,null=True, related_name="turnos")
@@ -155,21 +359,137 @@ class Turno(SoftDeleteModel):
     hora_fin = models.TimeField()
     cupo = models.PositiveIntegerField(default=1)
     lugar = models.CharField(max_length=255, null=True, blank=True)
-    history = HistoricalRecords()
+    # Inscripciones activas (INSCRITO o ASISTIO); se mantiene con reservar_cupo() / liberar_cupo()
+    inscritos_count = models.PositiveIntegerField(default=0, editable=False)
+    history = BufferedHistoricalRecords()
+
+    objects = SoftDeleteManager.from_queryset(TurnoQuerySet)()
+    all_objects = TurnoQuerySet.as_manager()
+
+    soft_delete_cascade = ("inscripciones",)
 
     class Meta:
         ordering = ("-fecha", "hora_inicio")
+        indexes = [
+            # Orden natural + desempate por id para la paginación por cursor
+            models.Index(fields=["-fecha", "hora_inicio", "id"], name="turno_fecha_hora_idx"),
+            # Turnos de un voluntariado por fecha (índice parcial: solo filas activas, como SoftDeleteManager)
+            models.Index(fields=["voluntariado", "fecha"], name="turno_vdo_fecha_act_idx", condition=models.Q(is_active=True)),
+        ]
+
+    def save(self, *args, **kwargs):
+        # inscritos_count solo se escribe al crear: después lo mantienen los UPDATE de reservar_cupo() /
+        # liberar_cupo(), y guardar el valor en memoria pisaría los que ocurrieron desde que se leyó el turno
+        if not self._state.adding and not kwargs.get("force_insert") and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != "inscritos_count"
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def al_restaurar(cls, queryset):
+        # Las inscripciones reactivadas (o las que siguen dadas de baja) cambian los inscritos
+        queryset.recalcular_inscritos()
 
-    def delete(self, using=None, keep_parents=False):
+    @staticmethod
+    def filtro_finalizados(ahora=None, prefijo=""):
         """
-        Cascade soft delete to related InscripcionTurno
-        (which will cascade to Asistencias)
+        Q de turnos finalizados: fecha < hoy o (fecha == hoy y hora_fin <= ahora), en hora local.
+        `prefijo` permite aplicarlo desde otro modelo (p. ej. "turno__").
         """
-        # Soft delete all related inscripciones (each will handle its own cascades)
-        self.inscripciones.all().delete()
-        
-        # Finally, soft delete the Turno itself
-        super().delete(using=using, keep_parents=keep_parents)
+        from django.utils import timezone
+
+        ahora = timezone.localtime(ahora)
+        return models.Q(**{f"{prefijo}fecha__lt": ahora.date()}) | models.Q(
+            **{f"{prefijo}fecha": ahora.date(), f"{prefijo}hora_fin__lte": ahora.time()}
+        )
+
+    @property
+    def is_full(self):
+        return self.inscritos_count >= self.cupo
+
+    @classmethod
+    def reservar_cupo(cls, turno_id):
+        """
+        Ocupa un lugar del turno con un UPDATE condicional (inscritos_count < cupo).
+        No hace falta bloquear el turno durante la inscripción: si dos pedidos compiten
+        por el último lugar, solo uno actualiza la fila. Retorna True si obtuvo el lugar.
+        """
+        return cls.objects.filter(pk=turno_id, inscritos_count__lt=models.F('cupo')).update(
+            inscritos_count=models.F('inscritos_count') + 1
+        ) == 1
+
+    @classmethod
+    def liberar_cupo(cls, turno_id):
+        """Devuelve un lugar al turno (al cancelar una inscripción activa)."""
+        return cls.all_objects.filter(pk=turno_id, inscritos_count__gt=0).update(
+            inscritos_count=models.F('inscritos_count') - 1
+        ) == 1
+
+    @classmethod
+    def crear_recurrentes(cls, voluntariado, dias_semana, hora_inicio, hora_fin, cupo=1, lugar=None,
+                          fecha_desde=None, fecha_hasta=None, usuario=None):
+        """
+        Crea un turno por cada fecha del cursado del voluntariado cuyo día de la semana
+        (0 = lunes ... 6 = domingo) esté en dias_semana, acotado opcionalmente a fecha_desde..fecha_hasta.
+        Las fechas que ya tienen un turno del voluntariado con la misma hora de inicio se omiten.
+        Los turnos y sus registros de historial se insertan con un bulk_create cada uno.
+        Retorna (turnos creados, cantidad omitida).
+        """
+        desde = max(fecha_desde or voluntariado.fecha_inicio_cursado, voluntariado.fecha_inicio_cursado)
+        hasta = min(fecha_hasta or voluntariado.fecha_fin_cursado, voluntariado.fecha_fin_cursado)
+        dias = set(dias_semana)
+
+        existentes = set(
+            cls.objects.filter(
+                voluntariado=voluntariado, fecha__range=(desde, hasta), hora_inicio=hora_inicio
+            ).values_list('fecha', flat=True)
+        )
+
+        nuevos = []
+        omitidos = 0
+        fecha = desde
+        while fecha <= hasta:
+            if fecha.weekday() in dias:
+                if fecha in existentes:
+                    omitidos += 1
+                else:
+                    nuevos.append(cls(
+                        voluntariado=voluntariado, fecha=fecha, hora_inicio=hora_inicio,
+                        hora_fin=hora_fin, cupo=cupo, lugar=lugar,
+                    ))
+            fecha += timedelta(days=1)
+
+        if not nuevos:
+            return [], omitidos
+        return bulk_create_with_history(nuevos, cls, default_user=usuario), omitidos
+
+    def promover_lista_espera(self):
+        """
+        Pasa a INSCRITO a los primeros de la lista de espera (FIFO) mientras haya lugar.
+        Debe llamarse dentro de la misma transacción que liberó el lugar (o amplió el cupo).
+        Retorna las inscripciones promovidas, para notificarlas.
+        """
+        # Bloquea el turno: las promociones de un mismo turno van de a una y cada una ve la lista de espera
+        # ya actualizada. Sin esto, un FOR UPDATE ... LIMIT 1 concurrente espera a la cabeza de la lista,
+        # no encuentra filas cuando esta deja de estar EN_ESPERA y corta con lugares libres.
+        Turno.all_objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True).first()
+        promovidas = []
+        while True:
+            siguiente = (
+                InscripcionTurno.objects.select_for_update()
+                .filter(turno=self, estado=InscripcionTurno.Status.EN_ESPERA)
+                .order_by('en_espera_desde', 'id')
+                .first()
+            )
+            if siguiente is None or not Turno.reservar_cupo(self.pk):
+                break
+            siguiente.estado = InscripcionTurno.Status.INSCRITO
+            siguiente.en_espera_desde = None
+            siguiente.save()
+            promovidas.append(siguiente)
+        return promovidas
 
     def __str__(self):
         return f"{self.fecha}: {self.hora_inicio.strftime('%H:%M')} - {self.hora_fin.strftime('%H:%M')}"
@@ -180,23 +500,72 @@ class InscripcionTurno(SoftDeleteModel):
         INSCRITO = "INS", "Inscrito"
         CANCELADO = "CAN", "Cancelado"
         ASISTIO = "ASI", "Asistió"
+        EN_ESPERA = "ESP", "En lista de espera" # Turno completo; se promueve al liberarse un lugar
 
     turno = models.ForeignKey(Turno, on_delete=models.CASCADE, related_name="inscripciones")
     voluntario = models.ForeignKey("persona.Voluntario", on_delete=models.CASCADE, related_name="inscripciones")
     estado = models.CharField(max_length=4, choices=Status.choices, default=Status.INSCRITO)
     fecha_inscripcion = models.DateTimeField(auto_now_add=True)
-    history = HistoricalRecords()
+    # Orden FIFO de la lista de espera (solo en estado EN_ESPERA)
+    en_espera_desde = models.DateTimeField(null=True, blank=True)
+    history = BufferedHistoricalRecords()
+
+    soft_delete_cascade = ("asistencia",)
+
+    @classmethod
+    def al_dar_de_baja(cls, queryset):
+        # Una inscripción dada de baja ya no ocupa lugar, sea cual sea el camino (propia o en cascada)
+        Turno.all_objects.filter(pk__in=queryset.values("turno_id")).recalcular_inscritos()
+
+    @classmethod
+    def al_restaurar(cls, queryset):
+        # Restaurar solo la inscripción (sin su turno) también vuelve a ocupar el lugar
+        Turno.all_objects.filter(pk__in=queryset.values("turno_id")).recalcular_inscritos()
 
-    def delete(self, using=None, keep_parents=False):
+    class Meta:
+        # Índices parciales (is_active=True): las consultas pasan por SoftDeleteManager
+        indexes = [
+            # Inscripciones de un turno por estado; en_espera_desde ordena la lista de espera
+            models.Index(
+                fields=["turno", "estado", "en_espera_desde"], name="insc_turno_estado_act_idx",
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(fields=["voluntario", "estado"], name="insc_vol_estado_act_idx", condition=models.Q(is_active=True)),
+        ]
+
+    @classmethod
+    def completitud_asistencia(cls, voluntariados, ahora=None):
         """
-        Cascade soft delete to related Asistencia (if exists)
+        Completitud de la carga de asistencia por voluntariado, en una sola consulta agrupada:
+        sobre las inscripciones activas de turnos finalizados de `voluntariados` (queryset de Voluntariado),
+        total_inscripciones (INSCRITO / ASISTIO) y asistencias_registradas (asistencias activas).
+        Los voluntariados sin inscripciones en turnos finalizados no aparecen.
         """
-        # Soft delete the asistencia if it exists (OneToOne relation)
-        if hasattr(self, 'asistencia'):
-            self.asistencia.delete()
-        
-        # Finally, soft delete the InscripcionTurno itself
-        super().delete(using=using, keep_parents=keep_parents)
+        return (
+            cls.objects.filter(
+                Turno.filtro_finalizados(ahora, prefijo="turno__"),
+                turno__is_active=True,
+                turno__voluntariado__in=voluntariados,
+            )
+            .values('turno__voluntariado_id', 'turno__voluntariado__nombre')
+            .annotate(
+                total_inscripciones=models.Count(
+                    'pk', filter=models.Q(estado__in=[cls.Status.INSCRITO, cls.Status.ASISTIO])
+                ),
+                asistencias_registradas=models.Count('asistencia', filter=models.Q(asistencia__is_active=True)),
+            )
+            .order_by('turno__voluntariado_id')
+        )
+
+    def posicion_espera(self):
+        """Posición (1-based) en la lista de espera del turno, o None si no está esperando."""
+        if self.estado != self.Status.EN_ESPERA or self.en_espera_desde is None:
+            return None
+        antes = InscripcionTurno.objects.filter(turno_id=self.turno_id, estado=self.Status.EN_ESPERA).filter(
+            models.Q(en_espera_desde__lt=self.en_espera_desde)
+            | models.Q(en_espera_desde=self.en_espera_desde, id__lt=self.id)
+        ).count()
+        return antes + 1
 
 
 class InscripcionConvocatoria(SoftDeleteModel):
@@ -208,4 +577,42 @@ class InscripcionConvocatoria(SoftDeleteModel):
 
     voluntariado = models.ForeignKey(Voluntariado, on_delete=models.CASCADE, related_name="inscripciones")
     voluntario = models.ForeignKey("persona.Voluntario", on_delete=models.CASCADE, related_name="inscripciones_convocatorias")
-    estado = models.CharField(max_length=4, choices=Status.choices, default=Status.INSCRITO)
\ No newline at end of file
+    estado = models.CharField(max_length=4, choices=Status.choices, default=Status.INSCRITO)
+
+    class Meta:
+        # Índices parciales (is_active=True): las consultas pasan por SoftDeleteManager
+        indexes = [
+            models.Index(fields=["voluntariado", "estado"], name="insc_conv_vdo_estado_act_idx", condition=models.Q(is_active=True)),
+            models.Index(fields=["voluntario", "voluntariado"], name="insc_conv_vol_vdo_act_idx", condition=models.Q(is_active=True)),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Las inscripciones pendientes (INSCRITO) mantienen al voluntariado en Preparación,
+        así que cada cambio se refleja en la etapa persistida del voluntariado.
+        """
+        super().save(*args, **kwargs)
+        if self.voluntariado_id:
+            self.voluntariado.actualizar_etapa()
+
+    @classmethod
+    def resolver_pendientes(cls, queryset, estado):
+        """
+        Pasa a `estado` (ACEPTADO / RECHAZADO) las inscripciones INSCRITO del queryset con un único UPDATE.
+        Como update() no pasa por save(), la etapa se recalcula aquí una vez por voluntariado afectado.
+        Debe llamarse dentro de una transacción (las filas se bloquean hasta el UPDATE).
+        Retorna (ids actualizados, voluntariados afectados).
+        """
+        pares = list(
+            queryset.filter(estado=cls.Status.INSCRITO).select_for_update().order_by()
+            .values_list('pk', 'voluntariado_id')
+        )
+        ids = [pk for pk, _ in pares]
+        if not ids:
+            return [], []
+        cls.objects.filter(pk__in=ids).update(estado=estado)
+
+        voluntariados = list(Voluntariado.objects.filter(pk__in={vid for _, vid in pares}))
+        for voluntariado in voluntariados:
+            voluntariado.actualizar_etapa()
+        return ids, voluntariados
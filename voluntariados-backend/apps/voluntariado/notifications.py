@@ -5,7 +5,7 @@ from django.utils import timezone
 import threading
 from typing import Iterable
 
-from .models import Voluntariado, InscripcionConvocatoria
+from .models import Voluntariado, InscripcionConvocatoria, InscripcionTurno
 
 
 def _build_activation_email(voluntariado: Voluntariado, turnos_link: str | None):
@@ -221,3 +221,56 @@ def check_and_notify_activation(voluntariado: Voluntariado) -> int:
     if voluntariado.notificacion_activo_enviada_at:
         return 0
     return notify_voluntariado_activated(voluntariado)
+
+
+def notify_turno_promovido(inscripciones: Iterable[InscripcionTurno]) -> int:
+    """
+    Avisa por correo a los voluntarios que pasaron de la lista de espera a INSCRITO.
+    Se envía luego del commit, en otro hilo. Devuelve la cantidad de correos encolados.
+    """
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None) or None
+    frontend_url = getattr(settings, 'FRONTEND_URL', None)
+
+    mensajes: list[tuple[str, str, str]] = []
+    for inscripcion in inscripciones:
+        user = getattr(inscripcion.voluntario, 'user', None)
+        email = getattr(user, 'email', None) if user else None
+        if not email:
+            continue
+        turno = inscripcion.turno
+        nombre = getattr(turno.voluntariado, 'nombre', 'un voluntariado')
+        subject = f"✅ Lugar confirmado - {nombre}"
+        lines = [
+            "Hola,",
+            "",
+            f'Se liberó un lugar en el turno del {turno.fecha.strftime("%d/%m/%Y")} '
+            f'({turno.hora_inicio.strftime("%H:%M")} - {turno.hora_fin.strftime("%H:%M")}) '
+            f'del voluntariado "{nombre}".',
+            "Estabas en la lista de espera y tu inscripción quedó confirmada.",
+            "",
+        ]
+        if frontend_url and turno.voluntariado_id:
+            lines += [f"{frontend_url}/voluntariados/{turno.voluntariado_id}#turnos-section", ""]
+        lines += ["Sistema de Voluntariado", "Universidad Nacional de Cuyo"]
+        mensajes.append((subject, "\n".join(lines), email))
+
+    if not mensajes:
+        return 0
+
+    def _send_all():
+        for subject, body, to in mensajes:
+            try:
+                send_mail(
+                    subject=subject,
+                    message=body,
+                    from_email=from_email,
+                    recipient_list=[to],
+                    fail_silently=True,
+                )
+            except Exception:
+                # no interrumpe los demás
+                pass
+
+    # Ejecutar luego de commit, en otro hilo
+    transaction.on_commit(lambda: threading.Thread(target=_send_all, daemon=True).start())
+    return len(mensajes)
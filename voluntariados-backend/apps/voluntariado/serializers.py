@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.db import transaction
 from django.utils import timezone
 from .models import Voluntariado, Turno, InscripcionTurno, DescripcionVoluntariado, InscripcionConvocatoria
+from .notifications import notify_turno_promovido
 from apps.persona.models import Voluntario, Gestionador
 
 from ..persona.serializers import GestionadorSerializer, VoluntarioSerializer
@@ -32,6 +33,8 @@ class TurnoSerializer(serializers.ModelSerializer):
     duracion_horas = serializers.SerializerMethodField()
     # Campo de solo lectura para indicar si el turno está completo
     is_full = serializers.SerializerMethodField()
+    # Cantidad de voluntarios en lista de espera
+    en_espera_count = serializers.SerializerMethodField()
     # Indica si todas las asistencias correspondientes a las inscripciones activas han sido registradas
     asistencia_completa = serializers.SerializerMethodField()
     # Indica si el turno ya pasó (fecha anterior a hoy o finalizó hoy según hora_fin)
@@ -39,21 +42,24 @@ class TurnoSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Turno
-        fields = ("id", "fecha", "hora_inicio", "hora_fin", "cupo", "lugar","voluntariado","voluntariado_id", "inscripciones_count", "asistencias_registradas", "asistencia_completa", "is_full", "duracion_horas", "es_pasado")
+        fields = ("id", "fecha", "hora_inicio", "hora_fin", "cupo", "lugar","voluntariado","voluntariado_id", "inscripciones_count", "asistencias_registradas", "asistencia_completa", "is_full", "en_espera_count", "duracion_horas", "es_pasado")
         read_only_fields = ("id",)
     
+    # Los campos de estadísticas leen las anotaciones de Turno.objects.with_stats();
+    # la consulta por fila queda solo como respaldo para querysets sin anotar.
+
     def get_inscripciones_count(self, obj):
         """
         Retorna la cantidad de inscripciones activas (INSCRITO o ASISTIO) para este turno.
         """
-        return obj.inscripciones.filter(
-            estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
-        ).count()
+        return obj.inscritos_count
 
     def get_asistencias_registradas(self, obj):
         """
         Cuenta la cantidad de registros de Asistencia asociados a inscripciones de este turno.
         """
+        if hasattr(obj, 'asistencias_registradas'):
+            return obj.asistencias_registradas
         # Import here to avoid circular imports at module load
         from apps.asistencia.models import Asistencia
         return Asistencia.objects.filter(inscripcion__turno=obj, inscripcion__is_active=True, is_active=True).count()
@@ -110,10 +116,15 @@ class TurnoSerializer(serializers.ModelSerializer):
         """
         Retorna True si el turno está completo (inscripciones activas >= cupo).
         """
-        inscripciones_activas = obj.inscripciones.filter(
-            estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
-        ).count()
-        return inscripciones_activas >= obj.cupo
+        return obj.is_full
+
+    def get_en_espera_count(self, obj):
+        """
+        Cantidad de inscripciones en lista de espera para este turno.
+        """
+        if hasattr(obj, 'en_espera_count'):
+            return obj.en_espera_count
+        return obj.inscripciones.filter(estado=InscripcionTurno.Status.EN_ESPERA).count()
 
     def get_asistencia_completa(self, obj):
         """
@@ -121,6 +132,10 @@ class TurnoSerializer(serializers.ModelSerializer):
         Devuelve True si hay al menos una inscripcion activa y el numero de asistencias registradas
         es mayor o igual al de inscripciones activas.
         """
+        if hasattr(obj, 'inscripciones_aceptadas_count'):
+            activos = obj.inscripciones_aceptadas_count
+            return activos == 0 or obj.asistencias_aceptadas_count >= activos
+
         from apps.asistencia.models import Asistencia
         # Count only inscripciones for this turno whose voluntario has an accepted
         # InscripcionConvocatoria for the corresponding voluntariado.
@@ -196,6 +211,35 @@ class TurnoSerializer(serializers.ModelSerializer):
         except Exception:
             return False
 
+
+class TurnoRecurrenteSerializer(serializers.Serializer):
+    """
+    Regla de recurrencia para generar los turnos de un voluntariado (ver Turno.crear_recurrentes).
+    Por defecto cubre todo el cursado; fecha_desde / fecha_hasta permiten acotarlo.
+    """
+    voluntariado_id = serializers.PrimaryKeyRelatedField(queryset=Voluntariado.objects.all(), source='voluntariado')
+    # 0 = lunes ... 6 = domingo
+    dias_semana = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), allow_empty=False
+    )
+    hora_inicio = serializers.TimeField()
+    hora_fin = serializers.TimeField()
+    cupo = serializers.IntegerField(min_value=1, default=1)
+    lugar = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    fecha_desde = serializers.DateField(required=False)
+    fecha_hasta = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data['hora_fin'] <= data['hora_inicio']:
+            raise serializers.ValidationError("La hora de fin debe ser posterior a la hora de inicio.")
+        voluntariado = data['voluntariado']
+        desde = max(data.get('fecha_desde') or voluntariado.fecha_inicio_cursado, voluntariado.fecha_inicio_cursado)
+        hasta = min(data.get('fecha_hasta') or voluntariado.fecha_fin_cursado, voluntariado.fecha_fin_cursado)
+        if desde > hasta:
+            raise serializers.ValidationError("El rango de fechas no se superpone con el cursado del voluntariado.")
+        return data
+
+
 class VoluntariadoSerializer(serializers.ModelSerializer):
     # --- Campos para Lectura ---
 
@@ -203,7 +247,7 @@ class VoluntariadoSerializer(serializers.ModelSerializer):
     voluntarios_count = serializers.IntegerField(read_only=True, required=False)
     turnos_count = serializers.IntegerField(read_only=True, required=False)
     organizacion = OrganizacionSerializer(read_only=True)
-    etapa = serializers.SerializerMethodField()
+    etapa = serializers.CharField(read_only=True)  # Etapa persistida (ver Voluntariado.calcular_etapa)
     inscriptos_count = serializers.SerializerMethodField()
     
     descripcion_id = serializers.PrimaryKeyRelatedField(
@@ -225,7 +269,7 @@ class VoluntariadoSerializer(serializers.ModelSerializer):
             'id', 'nombre', 'organizacion',
             'fecha_inicio_convocatoria', 'fecha_fin_convocatoria',
             'fecha_inicio_cursado', 'fecha_fin_cursado',
-            'etapa',  # Campo calculado
+            'etapa',  # Campo persistido, mantenido por el modelo
             'inscriptos_count',  # Cantidad de inscriptos a la convocatoria
             'descripcion',    # Campo de lectura (objeto anidado)
             'voluntarios_count',  # Campo de lectura (anotación)
@@ -243,95 +287,6 @@ class VoluntariadoSerializer(serializers.ModelSerializer):
             'requiere_convocatoria': {'required': False, 'default': True},
         }
 
-    def get_etapa(self, obj):
-        """
-        Calcula la etapa actual del voluntariado basándose en las fechas y requiere_convocatoria:
-        
-        Para requiere_convocatoria=False:
-        - Proximamente: Antes del cursado
-        - Activo: Durante el período de cursado
-        - Finalizado: Después del período de cursado
-        
-        Para requiere_convocatoria=True:
-        - Proximamente: Antes de la convocatoria
-        - Convocatoria: Durante el período de convocatoria
-        - Preparación: Entre el fin de convocatoria y el inicio de cursado
-          O si hay InscripcionConvocatoria con estado INSCRITO (pending review)
-        - Activo: Durante el período de cursado
-        - Finalizado: Después del período de cursado
-        """
-        today = timezone.now().date()
-        
-        # Para voluntariados que NO requieren convocatoria
-        if not obj.requiere_convocatoria:
-            # Solo necesitamos fechas de cursado
-            if not obj.fecha_inicio_cursado or not obj.fecha_fin_cursado:
-                return None
-            
-            # Proximamente: Antes del cursado
-            if today < obj.fecha_inicio_cursado:
-                return "Proximamente"
-            
-            # Activo: Durante el período de cursado
-            if obj.fecha_inicio_cursado <= today <= obj.fecha_fin_cursado:
-                return "Activo"
-            
-            # Finalizado: Después del período de cursado
-            if today > obj.fecha_fin_cursado:
-                return "Finalizado"
-            
-            return None
-        
-        # Para voluntariados que SÍ requieren convocatoria
-        # Si no hay fechas de convocatoria, no se puede determinar la etapa
-        if not obj.fecha_inicio_convocatoria or not obj.fecha_fin_convocatoria:
-            return None
-        
-        # Proximamente: Antes de la convocatoria
-        if today < obj.fecha_inicio_convocatoria:
-            return "Proximamente"
-        
-        # Convocatoria: Durante el período de convocatoria
-        if obj.fecha_inicio_convocatoria <= today <= obj.fecha_fin_convocatoria:
-            return "Convocatoria"
-        
-        # Si no hay fechas de cursado pero ya pasó la convocatoria
-        if not obj.fecha_inicio_cursado or not obj.fecha_fin_cursado:
-            # Si ya pasó la convocatoria, considerarlo finalizado
-            if today > obj.fecha_fin_convocatoria:
-                return "Finalizado"
-            return None
-        
-        # Check if there are pending inscriptions (INSCRITO status) that need review
-        has_pending_inscriptions = InscripcionConvocatoria.objects.filter(
-            voluntariado=obj,
-            estado=InscripcionConvocatoria.Status.INSCRITO,
-            is_active=True
-        ).exists()
-        
-        # Preparación: Entre convocatoria y cursado
-        # OR if there are pending inscriptions waiting for admin approval
-        if obj.fecha_fin_convocatoria < today < obj.fecha_inicio_cursado:
-            return "Preparación"
-        
-        # If we're past convocatoria but before cursado starts, and there are pending inscriptions
-        # Keep it in Preparación even if we're at or past cursado start date
-        if has_pending_inscriptions and today >= obj.fecha_fin_convocatoria:
-            # Only if we haven't passed the cursado end date yet
-            if today <= obj.fecha_fin_cursado:
-                return "Preparación"
-        
-        # Activo: Durante el período de cursado (and no pending inscriptions)
-        if obj.fecha_inicio_cursado <= today <= obj.fecha_fin_cursado:
-            return "Activo"
-        
-        # Finalizado: Después del período de cursado
-        if today > obj.fecha_fin_cursado:
-            return "Finalizado"
-        
-        # No debería llegar aquí con validaciones correctas
-        return None
-
     def validate_nombre(self, value):
         if not value or not value.strip():
             raise serializers.ValidationError("El nombre no puede estar vacío.")
@@ -431,7 +386,7 @@ class VoluntariadoConTurnosSerializer(VoluntariadoSerializer):
             turnos = [inscripcion.turno for inscripcion in inscripciones]
             return TurnoParaVoluntarioSerializer(turnos, many=True).data
         # Fallback if no voluntario_id is provided (e.g. for general admin views)
-        return TurnoSerializer(obj.turnos.all(), many=True).data
+        return TurnoSerializer(obj.turnos.with_stats(), many=True).data
 
 
 class InscripcionTurnoSerializer(serializers.ModelSerializer):
@@ -444,12 +399,17 @@ class InscripcionTurnoSerializer(serializers.ModelSerializer):
     turno_id = serializers.PrimaryKeyRelatedField(
         queryset=Turno.objects.all(), source='turno', write_only=True, required=False
     )
+    # Posición en la lista de espera (solo para inscripciones EN_ESPERA)
+    posicion_espera = serializers.SerializerMethodField()
 
     class Meta:
         model = InscripcionTurno
-        fields = ("id", "turno", "turno_id", "voluntario", "voluntario_id", "estado", "fecha_inscripcion")
+        fields = ("id", "turno", "turno_id", "voluntario", "voluntario_id", "estado", "fecha_inscripcion", "posicion_espera")
         read_only_fields = ("id", "fecha_inscripcion",)
 
+    def get_posicion_espera(self, obj):
+        return obj.posicion_espera()
+
     def validate(self, data):
         turno = data.get("turno")
         voluntario = data.get("voluntario")
@@ -468,9 +428,8 @@ class InscripcionTurnoSerializer(serializers.ModelSerializer):
         if not has_convocatoria_inscription:
             raise serializers.ValidationError("Debes estar inscripto en el voluntariado antes de inscribirte a un turno.")
 
-        # cupo actual (contar inscripciones activas)
-        activos = turno.inscripciones.filter(estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]).count()
-        if activos >= turno.cupo:
+        # cupo actual (el lugar se reserva de forma atómica en create)
+        if turno.is_full:
             raise serializers.ValidationError("El turno ya está completo.")
         # unique_together ya evita duplicados en DB, pero chequeamos para dar mensaje claro
         if InscripcionTurno.objects.filter(turno=turno, voluntario=voluntario, estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]).exists():
@@ -479,10 +438,25 @@ class InscripcionTurnoSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
+        if validated_data.get("estado", InscripcionTurno.Status.INSCRITO) in (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO):
+            if not Turno.reservar_cupo(validated_data["turno"].pk):
+                raise serializers.ValidationError("El turno ya está completo.")
         return super().create(validated_data)
     @transaction.atomic
     def update(self, instance, validated_data):
-        return super().update(instance, validated_data)
+        activos = (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO)
+        era_activa = instance.estado in activos
+        sera_activa = validated_data.get("estado", instance.estado) in activos
+        if sera_activa and not era_activa:
+            if not Turno.reservar_cupo(instance.turno_id):
+                raise serializers.ValidationError("El turno ya está completo.")
+        elif era_activa and not sera_activa:
+            Turno.liberar_cupo(instance.turno_id)
+        instance = super().update(instance, validated_data)
+        if era_activa and not sera_activa:
+            # el lugar pasa al primero de la lista de espera dentro de la misma transacción
+            notify_turno_promovido(instance.turno.promover_lista_espera())
+        return instance
 
 
 class InscripcionConvocatoriaSerializer(serializers.ModelSerializer):
@@ -548,3 +522,18 @@ class InscripcionConvocatoriaSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         return super().update(instance, validated_data)
 
+
+class ResolucionLoteSerializer(serializers.Serializer):
+    """
+    Selección de inscripciones de convocatoria a aceptar / rechazar en lote:
+    una lista de ids, o todas las pendientes de un voluntariado.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    voluntariado_id = serializers.PrimaryKeyRelatedField(
+        queryset=Voluntariado.objects.all(), source='voluntariado', required=False
+    )
+
+    def validate(self, data):
+        if ('ids' in data) == ('voluntariado' in data):
+            raise serializers.ValidationError("Debe indicar 'ids' o 'voluntariado_id' (solo uno de los dos).")
+        return data
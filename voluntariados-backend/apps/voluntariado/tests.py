@@ -0,0 +1,541 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from datetime import date, time, timedelta
+from apps.asistencia.models import Asistencia
+from apps.persona.models import Voluntario
+from apps.voluntariado.models import Voluntariado, Turno, InscripcionTurno, InscripcionConvocatoria
+from apps.voluntariado.serializers import InscripcionTurnoSerializer, TurnoSerializer
+
+
+class VoluntariadoEtapaTests(TestCase):
+
+    def setUp(self):
+        self.hoy = date.today()
+
+    def crear_voluntariado(self, **overrides):
+        """Crea un voluntariado en Convocatoria, con cursado a continuación."""
+        data = {
+            "nombre": "Voluntariado de prueba",
+            "requiere_convocatoria": True,
+            "fecha_inicio_convocatoria": self.hoy - timedelta(days=5),
+            "fecha_fin_convocatoria": self.hoy + timedelta(days=5),
+            "fecha_inicio_cursado": self.hoy + timedelta(days=10),
+            "fecha_fin_cursado": self.hoy + timedelta(days=40),
+            "latitud": 0,
+            "longitud": 0,
+        }
+        data.update(overrides)
+        return Voluntariado.objects.create(**data)
+
+    def test_etapa_se_persiste_al_crear(self):
+        voluntariado = self.crear_voluntariado()
+        voluntariado.refresh_from_db()
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.CONVOCATORIA)
+
+    def test_sin_convocatoria_usa_fechas_de_cursado(self):
+        voluntariado = self.crear_voluntariado(
+            requiere_convocatoria=False,
+            fecha_inicio_convocatoria=None,
+            fecha_fin_convocatoria=None,
+            fecha_inicio_cursado=self.hoy - timedelta(days=1),
+        )
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.ACTIVO)
+
+    def test_inscripcion_pendiente_mantiene_preparacion(self):
+        voluntariado = self.crear_voluntariado(
+            fecha_inicio_convocatoria=self.hoy - timedelta(days=20),
+            fecha_fin_convocatoria=self.hoy - timedelta(days=10),
+            fecha_inicio_cursado=self.hoy - timedelta(days=1),
+        )
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.ACTIVO)
+
+        voluntario = Voluntario.objects.create(nombre="Ana", apellido="Gómez")
+        inscripcion = InscripcionConvocatoria.objects.create(voluntariado=voluntariado, voluntario=voluntario)
+        voluntariado.refresh_from_db()
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.PREPARACION)
+
+        inscripcion.estado = InscripcionConvocatoria.Status.ACEPTADO
+        inscripcion.save()
+        voluntariado.refresh_from_db()
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.ACTIVO)
+
+    def test_barrido_aplica_transiciones_por_fecha(self):
+        voluntariado = self.crear_voluntariado()
+        actualizados = Voluntariado.actualizar_etapas(today=self.hoy + timedelta(days=60))
+        voluntariado.refresh_from_db()
+        self.assertEqual(actualizados, 1)
+        self.assertEqual(voluntariado.etapa, Voluntariado.Etapa.FINALIZADO)
+
+
+class TurnoStatsTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        self.voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy - timedelta(days=1),
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.turno = Turno.objects.create(
+            voluntariado=self.voluntariado, fecha=hoy, hora_inicio=time(9), hora_fin=time(12), cupo=2
+        )
+        self.voluntarios = [
+            Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test") for i in range(2)
+        ]
+        for voluntario in self.voluntarios:
+            InscripcionConvocatoria.objects.create(
+                voluntariado=self.voluntariado, voluntario=voluntario, estado=InscripcionConvocatoria.Status.ACEPTADO
+            )
+            InscripcionTurno.objects.create(turno=self.turno, voluntario=voluntario)
+        Turno.objects.filter(pk=self.turno.pk).recalcular_inscritos()
+
+    def test_with_stats_coincide_con_calculo_por_fila(self):
+        Asistencia.objects.create(inscripcion=self.turno.inscripciones.first(), presente=True, horas=3)
+
+        anotado = Turno.objects.with_stats().get(pk=self.turno.pk)
+        self.assertEqual(anotado.inscritos_count, 2)
+        self.assertTrue(anotado.is_full)
+        self.assertEqual(anotado.asistencias_registradas, 1)
+        self.assertEqual(anotado.inscripciones_aceptadas_count, 2)
+        self.assertEqual(anotado.asistencias_aceptadas_count, 1)
+
+        data_anotada = TurnoSerializer(anotado).data
+        data_por_fila = TurnoSerializer(Turno.objects.get(pk=self.turno.pk)).data
+        self.assertEqual(data_anotada, data_por_fila)
+
+    def test_editar_turno_no_pisa_reservas_concurrentes(self):
+        editado = Turno.objects.get(pk=self.turno.pk)
+        # Entre que se lee el turno y se guarda, se cancela una inscripción
+        Turno.liberar_cupo(self.turno.pk)
+        editado.cupo = 5
+        editado.save()
+
+        self.turno.refresh_from_db()
+        self.assertEqual((self.turno.cupo, self.turno.inscritos_count), (5, 1))
+        self.assertTrue(Turno.reservar_cupo(self.turno.pk))
+
+    def test_baja_de_inscripcion_libera_el_lugar(self):
+        primera, segunda = self.turno.inscripciones.order_by("pk")
+        primera.delete()
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 1)
+
+        InscripcionTurno.objects.filter(pk=segunda.pk).delete()
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 0)
+
+        primera.restore()
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 1)
+
+    def test_with_stats_no_consulta_por_fila(self):
+        with self.assertNumQueries(1):
+            TurnoSerializer(Turno.objects.select_related("voluntariado").with_stats(), many=True).data
+
+
+class TurnoCupoTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy,
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.turno = Turno.objects.create(
+            voluntariado=voluntariado, fecha=hoy, hora_inicio=time(9), hora_fin=time(12), cupo=1
+        )
+
+    def test_reserva_respeta_el_cupo(self):
+        self.assertTrue(Turno.reservar_cupo(self.turno.pk))
+        self.assertFalse(Turno.reservar_cupo(self.turno.pk))
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 1)
+        self.assertTrue(self.turno.is_full)
+
+    def test_liberar_devuelve_el_lugar(self):
+        Turno.reservar_cupo(self.turno.pk)
+        self.assertTrue(Turno.liberar_cupo(self.turno.pk))
+        self.assertFalse(Turno.liberar_cupo(self.turno.pk))
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 0)
+
+
+class ListaEsperaTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy,
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.turno = Turno.objects.create(
+            voluntariado=voluntariado, fecha=hoy, hora_inicio=time(9), hora_fin=time(12), cupo=1
+        )
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(email=f"vol{i}@test.com", password="test", role=User.Roles.VOLUNTARIO)
+            for i in range(3)
+        ]
+        self.client = APIClient()
+
+    def inscribirse(self, user, **data):
+        self.client.force_authenticate(user)
+        return self.client.post(f"/api/voluntariado/turnos/{self.turno.pk}/inscribirse/", data, format="json")
+
+    def test_turno_completo_sin_lista_espera(self):
+        self.assertEqual(self.inscribirse(self.users[0]).status_code, 201)
+        self.assertEqual(self.inscribirse(self.users[1]).status_code, 400)
+
+    def test_cancelacion_promueve_en_orden(self):
+        self.inscribirse(self.users[0])
+        primero = self.inscribirse(self.users[1], lista_espera=True)
+        segundo = self.inscribirse(self.users[2], lista_espera=True)
+        self.assertEqual(primero.status_code, 202)
+        self.assertEqual((primero.data["posicion_espera"], segundo.data["posicion_espera"]), (1, 2))
+
+        self.client.force_authenticate(self.users[0])
+        response = self.client.post(f"/api/voluntariado/turnos/{self.turno.pk}/cancelar-inscripcion/")
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(InscripcionTurno.objects.get(pk=primero.data["id"]).estado, InscripcionTurno.Status.INSCRITO)
+        en_espera = InscripcionTurno.objects.get(pk=segundo.data["id"])
+        self.assertEqual(en_espera.posicion_espera(), 1)
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 1)
+
+    def test_cambio_de_estado_por_serializer_promueve(self):
+        activa = self.inscribirse(self.users[0])
+        en_espera = self.inscribirse(self.users[1], lista_espera=True)
+
+        serializer = InscripcionTurnoSerializer(
+            InscripcionTurno.objects.get(pk=activa.data["id"]),
+            data={"estado": InscripcionTurno.Status.CANCELADO},
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(InscripcionTurno.objects.get(pk=en_espera.data["id"]).estado, InscripcionTurno.Status.INSCRITO)
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.inscritos_count, 1)
+
+
+class TurnosRecurrentesTests(TestCase):
+
+    def setUp(self):
+        # 2026-03-02 es lunes; 30 semanas de cursado
+        self.voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=date(2026, 3, 2),
+            fecha_fin_cursado=date(2026, 3, 2) + timedelta(weeks=30) - timedelta(days=1),
+            latitud=0,
+            longitud=0,
+        )
+
+    def test_crea_un_turno_por_dia_en_una_insercion(self):
+        with self.assertNumQueries(3):
+            creados, omitidos = Turno.crear_recurrentes(
+                self.voluntariado, [0, 3], time(9), time(12), cupo=5, lugar="Aula 1"
+            )
+        self.assertEqual((len(creados), omitidos), (60, 0))
+        self.assertTrue(all(t.fecha.weekday() in (0, 3) for t in creados))
+        self.assertEqual(Turno.history.filter(voluntariado_id=self.voluntariado.pk).count(), 60)
+
+    def test_omite_turnos_existentes(self):
+        Turno.crear_recurrentes(self.voluntariado, [0], time(9), time(12))
+        creados, omitidos = Turno.crear_recurrentes(self.voluntariado, [0, 3], time(9), time(12))
+        self.assertEqual((len(creados), omitidos), (30, 30))
+
+
+class ResolucionLoteTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        # Convocatoria cerrada y cursado en curso: con pendientes queda en Preparación
+        self.voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=True,
+            fecha_inicio_convocatoria=hoy - timedelta(days=20),
+            fecha_fin_convocatoria=hoy - timedelta(days=10),
+            fecha_inicio_cursado=hoy - timedelta(days=1),
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        self.inscripciones = [
+            InscripcionConvocatoria.objects.create(
+                voluntariado=self.voluntariado,
+                voluntario=Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test"),
+            )
+            for i in range(3)
+        ]
+        User = get_user_model()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+        )
+
+    def test_aceptar_todas_las_pendientes_del_voluntariado(self):
+        self.voluntariado.refresh_from_db()
+        self.assertEqual(self.voluntariado.etapa, Voluntariado.Etapa.PREPARACION)
+
+        response = self.client.post(
+            "/api/voluntariado/inscripciones-convocatoria/aceptar-lote/",
+            {"voluntariado_id": self.voluntariado.pk},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["actualizadas"], 3)
+        self.assertEqual(response.data["voluntariados"], [self.voluntariado.pk])
+        self.voluntariado.refresh_from_db()
+        self.assertEqual(self.voluntariado.etapa, Voluntariado.Etapa.ACTIVO)
+
+    def test_rechazar_por_ids_informa_omitidas(self):
+        aceptada = self.inscripciones[0]
+        aceptada.estado = InscripcionConvocatoria.Status.ACEPTADO
+        aceptada.save()
+
+        response = self.client.post(
+            "/api/voluntariado/inscripciones-convocatoria/rechazar-lote/",
+            {"ids": [i.pk for i in self.inscripciones]},
+            format="json",
+        )
+
+        self.assertEqual(response.data["actualizadas"], 2)
+        self.assertEqual(response.data["omitidas"], [aceptada.pk])
+        self.assertEqual(
+            InscripcionConvocatoria.objects.filter(estado=InscripcionConvocatoria.Status.RECHAZADO).count(), 2
+        )
+
+
+class SoftDeleteCascadaTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        self.voluntariado = Voluntariado.objects.create(
+            nombre="Voluntariado de prueba",
+            requiere_convocatoria=False,
+            fecha_inicio_cursado=hoy,
+            fecha_fin_cursado=hoy + timedelta(days=30),
+            latitud=0,
+            longitud=0,
+        )
+        turnos, _ = Turno.crear_recurrentes(self.voluntariado, range(7), time(9), time(12), cupo=5)
+        for turno in turnos[:3]:
+            for i in range(2):
+                voluntario = Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test")
+                inscripcion = InscripcionTurno.objects.create(turno=turno, voluntario=voluntario)
+                Asistencia.objects.create(inscripcion=inscripcion, presente=True)
+        InscripcionConvocatoria.objects.create(voluntariado=self.voluntariado, voluntario=voluntario)
+
+    def test_borrado_y_restauracion_del_subarbol(self):
+        # savepoint + 4 UPDATE (convocatorias, asistencias, inscripciones, turnos) + save del voluntariado (3)
+        # + recálculo de inscritos_count de los turnos
+        with self.assertNumQueries(10):
+            self.voluntariado.delete()
+
+        self.assertFalse(Turno.objects.filter(voluntariado=self.voluntariado).exists())
+        self.assertFalse(InscripcionTurno.objects.filter(turno__voluntariado=self.voluntariado).exists())
+        self.assertFalse(Asistencia.objects.filter(inscripcion__turno__voluntariado=self.voluntariado).exists())
+        self.assertFalse(InscripcionConvocatoria.objects.filter(voluntariado=self.voluntariado).exists())
+
+        Voluntariado.all_objects.filter(pk=self.voluntariado.pk).restore()
+        self.assertEqual(Turno.objects.filter(voluntariado=self.voluntariado).count(), 31)
+        self.assertEqual(Asistencia.objects.filter(inscripcion__turno__voluntariado=self.voluntariado).count(), 6)
+        self.assertTrue(Voluntariado.objects.filter(pk=self.voluntariado.pk).exists())
+
+    def test_restaurar_no_reactiva_lo_que_ya_estaba_dado_de_baja(self):
+        turnos = list(Turno.objects.filter(voluntariado=self.voluntariado, inscripciones__isnull=False).distinct())
+        borrado_antes = turnos[0]
+        borrado_antes.delete()
+        inscripcion_borrada = InscripcionTurno.objects.filter(turno=turnos[1]).first()
+        inscripcion_borrada.delete()
+        Turno.all_objects.filter(voluntariado=self.voluntariado).recalcular_inscritos()
+
+        self.voluntariado.delete()
+        self.voluntariado.restore()
+
+        self.assertEqual(Turno.objects.filter(voluntariado=self.voluntariado).count(), 30)
+        self.assertFalse(Turno.objects.filter(pk=borrado_antes.pk).exists())
+        self.assertFalse(InscripcionTurno.objects.filter(turno=borrado_antes).exists())
+        self.assertFalse(InscripcionTurno.objects.filter(pk=inscripcion_borrada.pk).exists())
+        self.assertEqual(InscripcionTurno.objects.filter(turno__voluntariado=self.voluntariado).count(), 3)
+        # inscritos_count se recalcula con lo que quedó activo
+        self.assertEqual(
+            sorted(Turno.objects.filter(pk__in=[t.pk for t in turnos]).values_list("inscritos_count", flat=True)), [1, 2]
+        )
+
+        # Restaurar el turno por su cuenta sí trae sus inscripciones
+        Turno.all_objects.get(pk=borrado_antes.pk).restore()
+        self.assertEqual(Turno.objects.get(pk=borrado_antes.pk).inscritos_count, 2)
+
+
+class ProgresoTests(TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        self.voluntariados = []
+        for pasados, futuros in ((3, 1), (0, 2)):
+            voluntariado = Voluntariado.objects.create(
+                nombre="Voluntariado de prueba",
+                requiere_convocatoria=False,
+                fecha_inicio_cursado=hoy - timedelta(days=10),
+                fecha_fin_cursado=hoy + timedelta(days=10),
+                latitud=0,
+                longitud=0,
+            )
+            for i in range(pasados):
+                Turno.objects.create(voluntariado=voluntariado, fecha=hoy - timedelta(days=i + 1), hora_inicio=time(9), hora_fin=time(12))
+            for i in range(futuros):
+                Turno.objects.create(voluntariado=voluntariado, fecha=hoy + timedelta(days=i + 1), hora_inicio=time(9), hora_fin=time(12))
+            self.voluntariados.append(voluntariado)
+        User = get_user_model()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+        )
+
+    def test_progreso_sin_debug_por_defecto(self):
+        url = f"/api/voluntariado/voluntariados/{self.voluntariados[0].pk}/progreso/"
+        response = self.client.get(url)
+        self.assertEqual(
+            (response.data["total_turnos"], response.data["turnos_finalizados"], response.data["progreso"]), (4, 3, 75)
+        )
+        self.assertNotIn("turnos_debug", response.data)
+        self.assertEqual(len(self.client.get(url, {"debug": "true"}).data["turnos_debug"]), 4)
+
+    def test_progreso_en_lote_en_una_consulta(self):
+        ids = ",".join(str(v.pk) for v in self.voluntariados)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/voluntariado/voluntariados/progreso/", {"ids": ids})
+        self.assertEqual(
+            [(r["voluntariado"], r["progreso"]) for r in response.data],
+            [(self.voluntariados[0].pk, 75), (self.voluntariados[1].pk, 0)],
+        )
+
+
+class AsistenciaCompletaTests(TestCase):
+
+    def setUp(self):
+        ayer = date.today() - timedelta(days=1)
+        self.voluntariados = []
+        for presentes in (2, 1):
+            voluntariado = Voluntariado.objects.create(
+                nombre=f"Voluntariado {presentes}",
+                requiere_convocatoria=False,
+                fecha_inicio_cursado=ayer - timedelta(days=10),
+                fecha_fin_cursado=ayer + timedelta(days=10),
+                latitud=0,
+                longitud=0,
+            )
+            turno = Turno.objects.create(voluntariado=voluntariado, fecha=ayer, hora_inicio=time(9), hora_fin=time(12), cupo=5)
+            for i in range(2):
+                inscripcion = InscripcionTurno.objects.create(
+                    turno=turno, voluntario=Voluntario.objects.create(nombre=f"Vol {i}", apellido="Test")
+                )
+                if i < presentes:
+                    Asistencia.objects.create(inscripcion=inscripcion, presente=True)
+            self.voluntariados.append(voluntariado)
+        User = get_user_model()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@test.com", password="test", role=User.Roles.ADMINISTRATIVO)
+        )
+
+    def test_completitud_de_todos_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/voluntariado/voluntariados/asistencia-completa/")
+        self.assertEqual(
+            [(r["voluntariado"], r["completa"], r["porcentaje_completitud"]) for r in response.data],
+            [(self.voluntariados[0].pk, True, 100), (self.voluntariados[1].pk, False, 50)],
+        )
+
+        pendientes = self.client.get("/api/voluntariado/voluntariados/asistencia-completa/", {"pendientes": "true"})
+        self.assertEqual([r["voluntariado"] for r in pendientes.data], [self.voluntariados[1].pk])
+
+    def test_detalle_usa_el_mismo_calculo(self):
+        response = self.client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[1].pk}/asistencia-completa/")
+        self.assertEqual((response.data["total_inscripciones"], response.data["asistencias_registradas"]), (2, 1))
+
+
+class PrincipalTests(TestCase):
+
+    def setUp(self):
+        from apps.organizacion.models import Organizacion
+        from apps.persona.models import Delegado
+
+        hoy = date.today()
+        self.organizaciones = [Organizacion.objects.create(nombre=f"Org {i}") for i in range(2)]
+        self.voluntariados = [
+            Voluntariado.objects.create(
+                nombre="Voluntariado de prueba",
+                requiere_convocatoria=False,
+                organizacion=organizacion,
+                fecha_inicio_cursado=hoy,
+                fecha_fin_cursado=hoy + timedelta(days=30),
+                latitud=0,
+                longitud=0,
+            )
+            for organizacion in self.organizaciones
+        ]
+        delegado = Delegado.objects.create(nombre="Dele", apellido="Gado", organizacion=self.organizaciones[0])
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="deleg@test.com", password="test", role=User.Roles.DELEGADO, persona=delegado
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_principal_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            principal = self.user.principal
+            self.assertEqual(self.user.principal.organizacion_id, self.organizaciones[0].pk)
+        self.assertIsNone(principal.voluntario_id)
+        self.assertTrue(principal.puede_gestionar(self.organizaciones[0].pk))
+        self.assertFalse(principal.puede_gestionar(self.organizaciones[1].pk))
+
+    def test_progreso_limitado_a_la_organizacion(self):
+        # principal + voluntariado con sus conteos
+        with self.assertNumQueries(2):
+            propio = self.client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[0].pk}/progreso/")
+        self.assertEqual(propio.status_code, 200)
+        ajeno = self.client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[1].pk}/progreso/")
+        self.assertEqual(ajeno.status_code, 403)
+
+    def cliente_con_token(self):
+        client = APIClient()
+        token = client.post("/api/token/", {"email": "deleg@test.com", "password": "test"}, format="json").data["access"]
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    @override_settings(JWT_STATELESS_READS=True)
+    def test_lecturas_con_claims_del_token_no_consultan_el_usuario(self):
+        client = self.cliente_con_token()
+
+        # solo el voluntariado con sus conteos: ni User ni Persona
+        with self.assertNumQueries(1):
+            propio = client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[0].pk}/progreso/")
+        self.assertEqual(propio.status_code, 200)
+        self.assertEqual(client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[1].pk}/progreso/").status_code, 403)
+
+    def test_usuario_dado_de_baja_no_lee_con_su_token(self):
+        client = self.cliente_con_token()
+        self.user.is_active = False
+        self.user.save()
+
+        response = client.get(f"/api/voluntariado/voluntariados/{self.voluntariados[0].pk}/progreso/")
+        self.assertEqual(response.status_code, 401)
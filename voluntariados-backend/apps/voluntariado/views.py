@@ -3,9 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Count, Q, Min, Max, Exists, OuterRef
+from django.db.models import Count, F, Q, Min, Max, Exists, OuterRef
 from .models import Voluntariado, Turno, InscripcionTurno, DescripcionVoluntariado, InscripcionConvocatoria
-from .serializers import VoluntariadoSerializer, TurnoSerializer, InscripcionTurnoSerializer, DescripcionVoluntariadoSerializer, InscripcionConvocatoriaSerializer
+from .serializers import VoluntariadoSerializer, TurnoSerializer, InscripcionTurnoSerializer, DescripcionVoluntariadoSerializer, InscripcionConvocatoriaSerializer, TurnoRecurrenteSerializer, ResolucionLoteSerializer
 from apps.users.permissions import IsAdministrador, IsGestionador
 from apps.persona.models import Voluntario
 from rest_framework import serializers
@@ -13,13 +13,19 @@ from django.db import transaction
 from django.core.mail import send_mail
 from django.conf import settings
 import threading
-from .notifications import check_and_notify_activation
+from .notifications import check_and_notify_activation, notify_turno_promovido
+from apps.core.pagination import TurnoPagination
+from apps.core.history import history_buffer
 
 class VoluntariadoViewSet(viewsets.ModelViewSet):
+    # Lecturas autenticadas con los claims del JWT, sin cargar el User (ver apps.users.authentication)
+    autenticacion_por_claims = True
     # No prefetch del reverse relation 'turno_set' (puede no existir según related_name).
     # Si se necesita prefetch de turnos, usar el endpoint `turnos` que consulta Turno directamente.
     queryset = Voluntariado.objects.select_related("descripcion").all()
     serializer_class = VoluntariadoSerializer
+    # Los listados de voluntariados usan órdenes propios (ver mis_voluntariados / by_organization)
+    pagination_class = None
 
     def get_permissions(self):
         if self.action in ("retrieve", "list", "turnos"):
@@ -27,7 +33,7 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         elif self.action in ["mis_voluntariados"]:
             return [permissions.IsAuthenticated()]
         
-        elif self.action in ["progreso", "asistencia_completa"]:
+        elif self.action in ["progreso", "progreso_lote", "asistencia_completa", "asistencia_completa_lote"]:
             return [permissions.IsAuthenticated(), IsGestionador()]
 
         elif self.action in ["turnos", "get_all_valid", "by_organization"]:
@@ -37,21 +43,9 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Filtra voluntariados por etapa basado en las fechas de convocatoria y cursado.
-        
-        Para voluntariados con requiere_convocatoria=False:
-        - No tienen fechas de convocatoria
-        - Antes del cursado: 'upcoming' (Proximamente)
-        - Durante el cursado: 'active' (Activo)
-        - Después del cursado: 'finished' (Finalizado)
-        
-        Para voluntariados con requiere_convocatoria=True:
-        - 'upcoming' (Proximamente): Antes de la convocatoria
-        - 'convocatoria' (Convocatoria): Durante el período de convocatoria
-        - 'preparacion' (Preparación): Entre convocatoria y cursado
-        - 'active' (Activo): Durante el cursado
-        - 'finished' (Finalizado): Después del cursado
-        
+        Filtra voluntariados por etapa usando el campo persistido `etapa`
+        (ver Voluntariado.calcular_etapa para las reglas de cada etapa).
+
         Query params:
         - status: 'upcoming', 'convocatoria', 'preparacion', 'active', 'finished'
         """
@@ -63,76 +57,16 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
             fecha_inicio=Min('turnos__fecha', filter=Q(turnos__is_active=True)),
             fecha_fin=Max('turnos__fecha', filter=Q(turnos__is_active=True)),
         )
-        status_filter = self.request.query_params.get('status', None)
-        
-        if status_filter:
-            today = timezone.now().date()
-            
-            if status_filter == 'upcoming':
-                # Proximamente: Antes de que comience el voluntariado
-                # Para requiere_convocatoria=True: antes de la convocatoria
-                # Para requiere_convocatoria=False: antes del cursado
-                queryset = queryset.filter(
-                    Q(
-                        # Con convocatoria: antes de la convocatoria
-                        requiere_convocatoria=True,
-                        fecha_inicio_convocatoria__isnull=False,
-                        fecha_inicio_convocatoria__gt=today
-                    ) | Q(
-                        # Sin convocatoria: antes del cursado
-                        requiere_convocatoria=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_inicio_cursado__gt=today
-                    )
-                )
-            elif status_filter == 'convocatoria':
-                # Convocatoria: Solo para voluntariados que requieren convocatoria
-                # Durante el período de convocatoria
-                queryset = queryset.filter(
-                    requiere_convocatoria=True,
-                    fecha_inicio_convocatoria__isnull=False,
-                    fecha_fin_convocatoria__isnull=False,
-                    fecha_inicio_convocatoria__lte=today,
-                    fecha_fin_convocatoria__gte=today
-                )
-            elif status_filter == 'preparacion':
-                # Preparación: Solo para voluntariados que requieren convocatoria
-                # Entre convocatoria y cursado, o con inscripciones pendientes
-                queryset = queryset.filter(
-                    requiere_convocatoria=True
-                ).filter(
-                    Q(
-                        # Traditional preparacion: between convocatoria and cursado dates
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_inicio_cursado__gt=today
-                    ) | Q(
-                        # OR has pending inscriptions waiting for review
-                        inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                        inscripciones__is_active=True,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__gte=today
-                    )
-                ).distinct()
-            elif status_filter == 'active':
-                # Activo: Durante el período de cursado (para ambos tipos)
-                queryset = queryset.filter(
-                    fecha_inicio_cursado__isnull=False,
-                    fecha_fin_cursado__isnull=False,
-                    fecha_inicio_cursado__lte=today,
-                    fecha_fin_cursado__gte=today
-                )
-            elif status_filter == 'finished':
-                # Finalizado: Después del período de cursado (para ambos tipos)
-                queryset = queryset.filter(
-                    fecha_fin_cursado__isnull=False,
-                    fecha_fin_cursado__lt=today
-                )
-        
-        return queryset
+        return self._filtrar_por_etapa(queryset, self.request.query_params.get('status', None))
+
+    def _filtrar_por_etapa(self, queryset, status_filter):
+        """Aplica el query param `status` como búsqueda indexada sobre `etapa`."""
+        if not status_filter:
+            return queryset
+        etapa = Voluntariado.ETAPA_POR_STATUS.get(status_filter)
+        if etapa is None:
+            return queryset
+        return queryset.filter(etapa=etapa)
     
     @action(detail=False, methods=["get"], url_path='all-valid', permission_classes=[permissions.IsAuthenticated])
     def get_all_valid(self, request):
@@ -178,314 +112,44 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         user = request.user
         role = getattr(user, 'role', '')
         status_filter = request.query_params.get('status', None)
-        today = timezone.now().date()
         
         # Si es ADMIN, retornar todos los voluntariados sin filtrar por organización
         if role == 'ADMIN':
+            # El filtro de status ya lo aplica get_queryset sobre `etapa`
             queryset = self.get_queryset()
-            
-            # Aplicar filtro de status para admin
-            if status_filter:
-                if status_filter == 'upcoming':
-                    # Proximamente: antes de comenzar
-                    # Con convocatoria: antes de la convocatoria
-                    # Sin convocatoria: antes del cursado
-                    queryset = queryset.filter(
-                        Q(
-                            requiere_convocatoria=True,
-                            fecha_inicio_convocatoria__isnull=False,
-                            fecha_inicio_convocatoria__gt=today
-                        ) | Q(
-                            requiere_convocatoria=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_inicio_cursado__gt=today
-                        )
-                    )
-                elif status_filter == 'convocatoria':
-                    # Solo voluntariados que requieren convocatoria
-                    queryset = queryset.filter(
-                        requiere_convocatoria=True,
-                        fecha_inicio_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_convocatoria__lte=today,
-                        fecha_fin_convocatoria__gte=today
-                    )
-                elif status_filter == 'preparacion':
-                    # Solo voluntariados que requieren convocatoria
-                    queryset = queryset.filter(
-                        requiere_convocatoria=True
-                    ).filter(
-                        Q(
-                            # Traditional preparacion: between convocatoria and cursado dates
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_inicio_cursado__gt=today
-                        ) | Q(
-                            # OR has pending inscriptions waiting for review
-                            inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                            inscripciones__is_active=True,
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_fin_cursado__isnull=False,
-                            fecha_fin_cursado__gte=today
-                        )
-                    ).distinct()
-                elif status_filter == 'active':
-                    # Activo: Durante el período de cursado (ambos tipos)
-                    queryset = queryset.filter(
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_inicio_cursado__lte=today,
-                        fecha_fin_cursado__gte=today
-                    )
-                    # Exclude preparacion-stage items (only for requiere_convocatoria=True)
-                    preparacion_q = Q(
-                        requiere_convocatoria=True
-                    ) & (
-                        Q(
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_inicio_cursado__gt=today
-                        ) | Q(
-                            inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                            inscripciones__is_active=True,
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_fin_cursado__isnull=False,
-                            fecha_fin_cursado__gte=today
-                        )
-                    )
-                    queryset = queryset.exclude(preparacion_q).distinct()
-                elif status_filter == 'finished':
-                    queryset = queryset.filter(
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__lt=today
-                    )
         
         elif role in ['DELEG', 'ADMIN_DELEG']:
             # Para Delegados, filtrar por organización
-            persona = getattr(user, "persona", None)
-            if not persona:
+            principal = user.principal
+            if principal.persona_id is None:
                 return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Obtener la instancia de gestionador (Delegado/Administrativo)
-            gestionador_obj = None
-            gestionador_obj = persona.gestionador.delegado
-
-            if gestionador_obj is None:
+            if principal.gestionador_id is None:
                 return Response({"detail": "La persona no es un gestionador válido."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Get the gestionador's organization
-            gestionador_org = getattr(gestionador_obj, 'organizacion', None) if hasattr(gestionador_obj, 'organizacion') else None
-            
-            if gestionador_org is None:
+            if principal.organizacion_id is None:
                 return Response({"detail": "El gestionador no tiene una organización asignada."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Filter voluntariados where organization matches gestionador's organization
-            queryset = self.get_queryset().filter(organizacion=gestionador_org)
-            
-            # Aplicar filtro de status para delegados
-            if status_filter:
-                if status_filter == 'upcoming':
-                    # Proximamente: antes de comenzar
-                    queryset = queryset.filter(
-                        Q(
-                            requiere_convocatoria=True,
-                            fecha_inicio_convocatoria__isnull=False,
-                            fecha_inicio_convocatoria__gt=today
-                        ) | Q(
-                            requiere_convocatoria=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_inicio_cursado__gt=today
-                        )
-                    )
-                elif status_filter == 'convocatoria':
-                    # Solo voluntariados que requieren convocatoria
-                    queryset = queryset.filter(
-                        requiere_convocatoria=True,
-                        fecha_inicio_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_convocatoria__lte=today,
-                        fecha_fin_convocatoria__gte=today
-                    )
-                elif status_filter == 'preparacion':
-                    # Solo voluntariados que requieren convocatoria
-                    queryset = queryset.filter(
-                        requiere_convocatoria=True
-                    ).filter(
-                        Q(
-                            # Traditional preparacion: between convocatoria and cursado dates
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_inicio_cursado__gt=today
-                        ) | Q(
-                            # OR has pending inscriptions waiting for review
-                            inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                            inscripciones__is_active=True,
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_fin_cursado__isnull=False,
-                            fecha_fin_cursado__gte=today
-                        )
-                    ).distinct()
-                elif status_filter == 'active':
-                    # Activo: Durante el período de cursado
-                    queryset = queryset.filter(
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_inicio_cursado__lte=today,
-                        fecha_fin_cursado__gte=today
-                    )
-                    # Exclude preparacion-stage items (only for requiere_convocatoria=True)
-                    preparacion_q = Q(
-                        requiere_convocatoria=True
-                    ) & (
-                        Q(
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_inicio_cursado__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_inicio_cursado__gt=today
-                        ) | Q(
-                            inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                            inscripciones__is_active=True,
-                            fecha_fin_convocatoria__isnull=False,
-                            fecha_fin_convocatoria__lt=today,
-                            fecha_fin_cursado__isnull=False,
-                            fecha_fin_cursado__gte=today
-                        )
-                    )
-                    queryset = queryset.exclude(preparacion_q).distinct()
-                elif status_filter == 'finished':
-                    queryset = queryset.filter(
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__lt=today
-                    )
+            # El filtro de status ya lo aplica get_queryset sobre `etapa`
+            queryset = self.get_queryset().filter(organizacion_id=principal.organizacion_id)
         
         elif role == 'VOL':
             # Para Voluntarios, filtrar por InscripcionConvocatoria
-            persona = getattr(user, "persona", None)
-            if not persona:
+            principal = user.principal
+            if principal.persona_id is None:
                 return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
             
-            try:
-                voluntario = persona.voluntario
-            except Voluntario.DoesNotExist:
+            if principal.voluntario_id is None:
                 return Response({"detail": "La persona no está registrada como voluntario."}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Base queryset: voluntariados donde el voluntario tiene InscripcionConvocatoria
-            # Inicializamos `queryset` aquí para evitar referencias antes de la asignación
-            # (por ejemplo en el branch 'active' que aplicaba filters sobre `queryset`).
-            queryset = self.get_queryset().filter(
-                inscripciones__voluntario=voluntario,
-                inscripciones__is_active=True
-            ).distinct()
-            
-            # NOTE: algunos branches sobrescriben `queryset` con filtros más específicos abajo.
-            
-            # Ahora aplicaremos filtros por status según corresponda
-            if status_filter == 'convocatoria':
-                # Convocatoria: Solo para voluntariados que requieren convocatoria
-                # tiene inscripción (cualquier estado) y está en período de convocatoria
-                queryset = self.get_queryset().filter(
-                    inscripciones__voluntario=voluntario,
-                    inscripciones__is_active=True,
-                    requiere_convocatoria=True,
-                    fecha_inicio_convocatoria__isnull=False,
-                    fecha_fin_convocatoria__isnull=False,
-                    fecha_inicio_convocatoria__lte=today,
-                    fecha_fin_convocatoria__gte=today
-                ).distinct()
-            
-            elif status_filter == 'preparacion':
-                # Preparación: Solo para voluntariados que requieren convocatoria
-                # tiene inscripción y está en período de preparación
-                queryset = self.get_queryset().filter(
-                    inscripciones__voluntario=voluntario,
-                    inscripciones__is_active=True,
-                    requiere_convocatoria=True
-                ).filter(
-                    Q(
-                        # Traditional preparacion: between convocatoria and cursado dates
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_inicio_cursado__gt=today
-                    ) | Q(
-                        # OR has pending inscriptions waiting for review
-                        inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__gte=today
-                    )
-                ).distinct()
-            
-            elif status_filter == 'active':
-                # Activo: Durante el período de cursado
-                queryset = queryset.filter(
-                    fecha_inicio_cursado__isnull=False,
-                    fecha_fin_cursado__isnull=False,
-                    fecha_inicio_cursado__lte=today,
-                    fecha_fin_cursado__gte=today
-                )
-                # Exclude preparacion-stage items (only for requiere_convocatoria=True)
-                preparacion_q = Q(
-                    requiere_convocatoria=True
-                ) & (
-                    Q(
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_inicio_cursado__gt=today
-                    ) | Q(
-                        inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                        inscripciones__is_active=True,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__gte=today
-                    )
-                )
-                queryset = queryset.exclude(preparacion_q).distinct()
-            
-            elif status_filter == 'finished':
-                # Finished: tiene inscripción ACEPTADO y está finalizado
-                queryset = self.get_queryset().filter(
-                    inscripciones__voluntario=voluntario,
-                    inscripciones__estado=InscripcionConvocatoria.Status.ACEPTADO,
-                    inscripciones__is_active=True,
-                    fecha_fin_cursado__isnull=False,
-                    fecha_fin_cursado__lt=today
-                ).distinct()
-            
-            elif status_filter == 'upcoming':
-                # Upcoming: tiene inscripción y está antes de comenzar
-                # Con convocatoria: antes de la convocatoria
-                # Sin convocatoria: antes del cursado
-                queryset = self.get_queryset().filter(
-                    inscripciones__voluntario=voluntario,
-                    inscripciones__is_active=True
-                ).filter(
-                    Q(
-                        requiere_convocatoria=True,
-                        fecha_inicio_convocatoria__isnull=False,
-                        fecha_inicio_convocatoria__gt=today
-                    ) | Q(
-                        requiere_convocatoria=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_inicio_cursado__gt=today
-                    )
-                ).distinct()
-            
-            else:
-                # Sin filtro: todos los voluntariados donde tiene InscripcionConvocatoria
-                queryset = self.get_queryset().filter(
-                    inscripciones__voluntario=voluntario,
-                    inscripciones__is_active=True
-                ).distinct()
+            # Voluntariados donde el voluntario tiene InscripcionConvocatoria;
+            # el filtro de status ya lo aplica get_queryset sobre `etapa`
+            inscripcion_q = Q(inscripciones__voluntario_id=principal.voluntario_id, inscripciones__is_active=True)
+            if status_filter == 'finished':
+                # Finished: solo voluntariados donde fue ACEPTADO
+                inscripcion_q &= Q(inscripciones__estado=InscripcionConvocatoria.Status.ACEPTADO)
+            queryset = self.get_queryset().filter(inscripcion_q).distinct()
         
         else:
             # Rol no reconocido
@@ -533,38 +197,13 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         if not voluntario:
             return Response({"detail": "No se encontró un voluntario con ese DNI."}, status=status.HTTP_404_NOT_FOUND)
 
-        today = timezone.now().date()
-        status_filter = request.query_params.get('status', None)
-
         # Base queryset: voluntariados con inscripción activa del voluntario buscado
+        # (el filtro de status ya lo aplica get_queryset sobre `etapa`)
         queryset = self.get_queryset().filter(
             inscripciones__voluntario=voluntario,
             inscripciones__is_active=True
         ).distinct()
 
-        # 📆 Reusar parte de tu lógica de filtrado de status
-        if status_filter == 'convocatoria':
-            queryset = queryset.filter(
-                fecha_inicio_convocatoria__lte=today,
-                fecha_fin_convocatoria__gte=today
-            )
-        elif status_filter == 'preparacion':
-            queryset = queryset.filter(
-                Q(
-                    fecha_fin_convocatoria__lt=today,
-                    fecha_inicio_cursado__gt=today
-                )
-            )
-        elif status_filter == 'active':
-            queryset = queryset.filter(
-                fecha_inicio_cursado__lte=today,
-                fecha_fin_cursado__gte=today
-            )
-        elif status_filter == 'finished':
-            queryset = queryset.filter(
-                fecha_fin_cursado__lt=today
-            )
-
         queryset = queryset.annotate(
             voluntarios_count=Count(
                 'inscripciones',
@@ -589,22 +228,23 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         Endpoint: GET /voluntariados/{pk}/turnos/
         """
         voluntariado = get_object_or_404(Voluntariado, pk=pk)
-        # Filtrar turnos por voluntariado; no usar select_related('voluntariado') ya que puede no existir esa relación por nombre
-        turnos_qs = Turno.objects.filter(voluntariado_id=voluntariado.id).annotate(
-            inscripciones_count=Count(
-                'inscripciones',
-                filter=Q(
-                    inscripciones__estado__in=[
-                        InscripcionTurno.Status.INSCRITO,
-                        InscripcionTurno.Status.ASISTIO
-                    ]
-                ),
-                distinct=True
-            )
-        )
+        # Filtrar turnos por voluntariado, con las estadísticas del serializer anotadas en la misma consulta
+        turnos_qs = Turno.objects.filter(voluntariado_id=voluntariado.id).select_related("voluntariado").with_stats()
         ser = TurnoSerializer(turnos_qs, many=True, context={"request": request})
         return Response(ser.data, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def _datos_progreso(voluntariado):
+        """Respuesta de progreso a partir de un voluntariado anotado con with_progreso()."""
+        total = voluntariado.total_turnos
+        finalizados = voluntariado.turnos_finalizados
+        return {
+            'voluntariado': voluntariado.id,
+            'total_turnos': total,
+            'turnos_finalizados': finalizados,
+            'progreso': int((finalizados / total) * 100) if total else 0,
+        }
+
     @action(detail=True, methods=["get"], url_path='progreso', permission_classes=[permissions.IsAuthenticated, IsGestionador])
     def progreso(self, request, pk=None):
         """
@@ -613,84 +253,72 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         Definición de progreso: porcentaje de turnos finalizados respecto del total de turnos programados.
         - Un turno se considera finalizado si fecha < hoy o (fecha == hoy y hora_fin <= ahora).
 
-        Endpoint: GET /voluntariados/{pk}/progreso/
+        Endpoint: GET /voluntariados/{pk}/progreso/[?debug=true]
         Respuesta: {
           voluntariado: <id>,
           total_turnos: <int>,
           turnos_finalizados: <int>,
           progreso: <int 0-100>
         }
+        Con ?debug=true agrega today, time_now y turnos_debug (detalle por turno).
         """
-        voluntariado = get_object_or_404(Voluntariado, pk=pk)
+        now_local = timezone.localtime()
+        # Voluntariado y conteos en una sola consulta
+        voluntariado = get_object_or_404(Voluntariado.objects.with_progreso(now_local), pk=pk)
 
         # Autorización adicional: si no es ADMIN, debe pertenecer a la misma organización del voluntariado
-        user = request.user
-        role = getattr(user, 'role', '')
-        if role not in ['ADMIN']:
-            persona = getattr(user, 'persona', None)
-            gestionador_obj = None
-            if persona is not None:
-                if hasattr(persona, 'delegado') and persona.delegado is not None:
-                    gestionador_obj = persona.delegado
-                elif hasattr(persona, 'administrativo') and persona.administrativo is not None:
-                    gestionador_obj = persona.administrativo
-                elif hasattr(persona, 'gestionador') and persona.gestionador is not None:
-                    gestionador_obj = persona.gestionador
-            
-            # Check if gestionador's organization matches voluntariado's organization
-            if gestionador_obj is None:
-                return Response({"detail": "No tiene permisos para ver el progreso de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
-            
-            gestionador_org = getattr(gestionador_obj, 'organizacion', None) if hasattr(gestionador_obj, 'organizacion') else None
-            voluntariado_org = voluntariado.organizacion
-            
-            # If voluntariado has no organization, deny access to non-admin gestionadores
-            # If gestionador has no organization, deny access
-            # Otherwise, check if organizations match
-            if voluntariado_org is None or gestionador_org is None or gestionador_org.id != voluntariado_org.id:
-                return Response({"detail": "No tiene permisos para ver el progreso de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Get current datetime and convert to local timezone
-        now = timezone.now()
-        now_local = timezone.localtime(now)
-        today = now_local.date()
-        time_now = now_local.time()
-
-        # Only count active (non-deleted) turnos
-        total_turnos = Turno.objects.filter(voluntariado_id=voluntariado.id, is_active=True).count()
-        turnos_finalizados = Turno.objects.filter(
-            voluntariado_id=voluntariado.id, 
-            is_active=True
-        ).filter(
-            Q(fecha__lt=today) | (Q(fecha=today) & Q(hora_fin__lte=time_now))
-        ).count()
-
-        progreso = 0
-        if total_turnos > 0:
-            progreso = int((turnos_finalizados / total_turnos) * 100)
-
-        # Get turnos info for debugging
-        turnos_info = []
-        for turno in Turno.objects.filter(voluntariado_id=voluntariado.id, is_active=True):
-            is_finished = turno.fecha < today or (turno.fecha == today and turno.hora_fin <= time_now)
-            turnos_info.append({
-                'id': turno.id,
-                'fecha': str(turno.fecha),
-                'hora_fin': str(turno.hora_fin),
-                'is_finished': is_finished
-            })
-
-        data = {
-            'voluntariado': voluntariado.id,
-            'total_turnos': total_turnos,
-            'turnos_finalizados': turnos_finalizados,
-            'progreso': progreso,
-            'today': str(today),
-            'time_now': str(time_now),
-            'turnos_debug': turnos_info
-        }
+        # (sin organización, de cualquiera de los dos lados, o de otra organización: sin acceso)
+        if not request.user.principal.puede_gestionar(voluntariado.organizacion_id):
+            return Response({"detail": "No tiene permisos para ver el progreso de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
+
+        data = self._datos_progreso(voluntariado)
+
+        if request.query_params.get('debug') in ('1', 'true'):
+            today = now_local.date()
+            time_now = now_local.time()
+            data['today'] = str(today)
+            data['time_now'] = str(time_now)
+            data['turnos_debug'] = [
+                {
+                    'id': turno_id,
+                    'fecha': str(fecha),
+                    'hora_fin': str(hora_fin),
+                    'is_finished': fecha < today or (fecha == today and hora_fin <= time_now),
+                }
+                for turno_id, fecha, hora_fin in Turno.objects.filter(voluntariado_id=voluntariado.id)
+                .order_by('fecha', 'hora_fin')
+                .values_list('id', 'fecha', 'hora_fin')
+            ]
         return Response(data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path='progreso', permission_classes=[permissions.IsAuthenticated, IsGestionador])
+    def progreso_lote(self, request):
+        """
+        Progreso de varios voluntariados en una sola consulta (tarjetas del panel del gestionador).
+
+        Endpoint: GET /voluntariados/progreso/?ids=1,2,3   (hasta 200 ids)
+        Respuesta: lista con el mismo formato que /voluntariados/{pk}/progreso/ (sin debug).
+        Los voluntariados inexistentes o de otra organización se omiten.
+        """
+        try:
+            ids = {int(i) for i in request.query_params.get('ids', '').split(',') if i.strip()}
+        except ValueError:
+            return Response({"detail": "ids debe ser una lista de enteros separados por coma."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"detail": "Indique los voluntariados en el parámetro ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > 200:
+            return Response({"detail": "Se admiten hasta 200 voluntariados por consulta."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Voluntariado.objects.filter(pk__in=ids)
+        principal = request.user.principal
+        if not principal.es_admin:
+            if principal.organizacion_id is None:
+                return Response({"detail": "No tiene permisos para ver el progreso de estos voluntariados."}, status=status.HTTP_403_FORBIDDEN)
+            queryset = queryset.filter(organizacion_id=principal.organizacion_id)
+
+        voluntariados = queryset.with_progreso().only('id').order_by('id')
+        return Response([self._datos_progreso(v) for v in voluntariados], status=status.HTTP_200_OK)
+
     @action(detail=False, methods=["get"], url_path=r'by-organization/(?P<org_id>[^/.]+)', permission_classes=[permissions.IsAuthenticatedOrReadOnly])
     def by_organization(self, request, org_id=None):
         """
@@ -699,66 +327,9 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         URL: /voluntariados/by-organization/{org_id}/?status=upcoming
         Soporta el mismo query param `status` que get_queryset para filtrar por etapa.
         """
+        # El filtro de status ya lo aplica get_queryset sobre `etapa`
         queryset = self.get_queryset().filter(organizacion_id=org_id)
-
-        # Reuse status filtering from get_queryset by reading query param
         status_filter = request.query_params.get('status', None)
-        if status_filter:
-            # replicate the same filtering logic used in get_queryset
-            today = timezone.now().date()
-            if status_filter == 'upcoming':
-                # Proximamente: antes de comenzar
-                queryset = queryset.filter(
-                    Q(
-                        requiere_convocatoria=True,
-                        fecha_inicio_convocatoria__isnull=False,
-                        fecha_inicio_convocatoria__gt=today
-                    ) | Q(
-                        requiere_convocatoria=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_inicio_cursado__gt=today
-                    )
-                )
-            elif status_filter == 'convocatoria':
-                # Solo voluntariados que requieren convocatoria
-                queryset = queryset.filter(
-                    requiere_convocatoria=True,
-                    fecha_inicio_convocatoria__isnull=False,
-                    fecha_fin_convocatoria__isnull=False,
-                    fecha_inicio_convocatoria__lte=today,
-                    fecha_fin_convocatoria__gte=today
-                )
-            elif status_filter == 'preparacion':
-                # Solo voluntariados que requieren convocatoria
-                queryset = queryset.filter(
-                    requiere_convocatoria=True
-                ).filter(
-                    Q(
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_inicio_cursado__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_inicio_cursado__gt=today
-                    ) | Q(
-                        inscripciones__estado=InscripcionConvocatoria.Status.INSCRITO,
-                        inscripciones__is_active=True,
-                        fecha_fin_convocatoria__isnull=False,
-                        fecha_fin_convocatoria__lt=today,
-                        fecha_fin_cursado__isnull=False,
-                        fecha_fin_cursado__gte=today
-                    )
-                ).distinct()
-            elif status_filter == 'active':
-                queryset = queryset.filter(
-                    fecha_inicio_cursado__isnull=False,
-                    fecha_fin_cursado__isnull=False,
-                    fecha_inicio_cursado__lte=today,
-                    fecha_fin_cursado__gte=today
-                )
-            elif status_filter == 'finished':
-                queryset = queryset.filter(
-                    fecha_fin_cursado__isnull=False,
-                    fecha_fin_cursado__lt=today
-                )
 
         # Annotate and order similarly to mis_voluntariados
         queryset = queryset.annotate(
@@ -790,6 +361,16 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def _datos_completitud(voluntariado_id, total_inscripciones, asistencias_registradas):
+        return {
+            'voluntariado': voluntariado_id,
+            'total_inscripciones': total_inscripciones,
+            'asistencias_registradas': asistencias_registradas,
+            'completa': total_inscripciones > 0 and asistencias_registradas >= total_inscripciones,
+            'porcentaje_completitud': int((asistencias_registradas / total_inscripciones) * 100) if total_inscripciones else 0,
+        }
+
     @action(detail=True, methods=["get"], url_path='asistencia-completa', permission_classes=[permissions.IsAuthenticated, IsGestionador])
     def asistencia_completa(self, request, pk=None):
         """
@@ -804,77 +385,53 @@ class VoluntariadoViewSet(viewsets.ModelViewSet):
           porcentaje_completitud: <int 0-100>
         }
         """
-        from apps.asistencia.models import Asistencia
-        
         voluntariado = get_object_or_404(Voluntariado, pk=pk)
 
         # Autorización adicional: si no es ADMIN, debe pertenecer a la misma organización del voluntariado
-        user = request.user
-        role = getattr(user, 'role', '')
-        if role not in ['ADMIN']:
-            persona = getattr(user, 'persona', None)
-            gestionador_obj = None
-            if persona is not None:
-                if hasattr(persona, 'delegado') and persona.delegado is not None:
-                    gestionador_obj = persona.delegado
-                elif hasattr(persona, 'administrativo') and persona.administrativo is not None:
-                    gestionador_obj = persona.administrativo
-                elif hasattr(persona, 'gestionador') and persona.gestionador is not None:
-                    gestionador_obj = persona.gestionador
-            
-            # Check if gestionador's organization matches voluntariado's organization
-            if gestionador_obj is None:
-                return Response({"detail": "No tiene permisos para ver la información de asistencia de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
-            
-            gestionador_org = getattr(gestionador_obj, 'organizacion', None) if hasattr(gestionador_obj, 'organizacion') else None
-            voluntariado_org = voluntariado.organizacion
-            
-            # If voluntariado has no organization, deny access to non-admin gestionadores
-            # If gestionador has no organization, deny access
-            # Otherwise, check if organizations match
-            if voluntariado_org is None or gestionador_org is None or gestionador_org.id != voluntariado_org.id:
-                return Response({"detail": "No tiene permisos para ver la información de asistencia de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Contar todas las inscripciones activas (INSCRITO y ASISTIO) en turnos finalizados
-        now = timezone.now()
-        now_local = timezone.localtime(now)
-        today = now_local.date()
-        time_now = now_local.time()
-
-        # Obtener turnos finalizados
-        turnos_finalizados = Turno.objects.filter(
-            voluntariado_id=voluntariado.id,
-            is_active=True
-        ).filter(
-            Q(fecha__lt=today) | (Q(fecha=today) & Q(hora_fin__lte=time_now))
+        # (sin organización, de cualquiera de los dos lados, o de otra organización: sin acceso)
+        if not request.user.principal.puede_gestionar(voluntariado.organizacion_id):
+            return Response({"detail": "No tiene permisos para ver la información de asistencia de este voluntariado."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Inscripciones activas (INSCRITO y ASISTIO) en turnos finalizados y sus asistencias, en una consulta
+        fila = InscripcionTurno.completitud_asistencia(Voluntariado.objects.filter(pk=voluntariado.id)).first()
+        data = self._datos_completitud(
+            voluntariado.id,
+            fila['total_inscripciones'] if fila else 0,
+            fila['asistencias_registradas'] if fila else 0,
         )
+        return Response(data, status=status.HTTP_200_OK)
 
-        # Contar inscripciones en esos turnos
-        total_inscripciones = InscripcionTurno.objects.filter(
-            turno__in=turnos_finalizados,
-            is_active=True,
-            estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
-        ).count()
-
-        # Contar cuántas tienen asistencia registrada
-        asistencias_registradas = Asistencia.objects.filter(
-            inscripcion__turno__in=turnos_finalizados,
-            inscripcion__is_active=True,
-            is_active=True
-        ).count()
-
-        completa = total_inscripciones > 0 and asistencias_registradas >= total_inscripciones
-        porcentaje_completitud = 0
-        if total_inscripciones > 0:
-            porcentaje_completitud = int((asistencias_registradas / total_inscripciones) * 100)
+    @action(detail=False, methods=["get"], url_path='asistencia-completa', permission_classes=[permissions.IsAuthenticated, IsGestionador])
+    def asistencia_completa_lote(self, request):
+        """
+        Completitud de asistencia de todos los voluntariados visibles para el gestionador
+        (ADMIN: todos; resto: los de su organización), en una sola consulta agrupada.
 
-        data = {
-            'voluntariado': voluntariado.id,
-            'total_inscripciones': total_inscripciones,
-            'asistencias_registradas': asistencias_registradas,
-            'completa': completa,
-            'porcentaje_completitud': porcentaje_completitud
-        }
+        Endpoint: GET /voluntariados/asistencia-completa/[?pendientes=true]
+        Respuesta: lista con el formato de /voluntariados/{pk}/asistencia-completa/ más `nombre`,
+        solo para voluntariados con inscripciones en turnos finalizados.
+        Con ?pendientes=true se omiten los que ya tienen la asistencia completa.
+        """
+        voluntariados = Voluntariado.objects.all()
+        principal = request.user.principal
+        if not principal.es_admin:
+            if principal.organizacion_id is None:
+                return Response({"detail": "No tiene permisos para ver la información de asistencia."}, status=status.HTTP_403_FORBIDDEN)
+            voluntariados = voluntariados.filter(organizacion_id=principal.organizacion_id)
+
+        filas = InscripcionTurno.completitud_asistencia(voluntariados)
+        if request.query_params.get('pendientes') in ('1', 'true'):
+            filas = filas.filter(total_inscripciones__gt=F('asistencias_registradas'))
+
+        data = [
+            {
+                **self._datos_completitud(
+                    fila['turno__voluntariado_id'], fila['total_inscripciones'], fila['asistencias_registradas']
+                ),
+                'nombre': fila['turno__voluntariado__nombre'],
+            }
+            for fila in filas
+        ]
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -885,44 +442,99 @@ class DescripcionVoluntariadoViewSet(viewsets.ModelViewSet):
 
 
 class TurnoViewSet(viewsets.ModelViewSet):
+    autenticacion_por_claims = True
     # Usar queryset simple; evitar select_related('voluntariado') si el campo FK tiene otro nombre
     queryset = Turno.objects.select_related("voluntariado").all()
     serializer_class = TurnoSerializer
+    pagination_class = TurnoPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            # Estadísticas en la misma consulta; en escrituras el serializer calcula valores frescos
+            queryset = queryset.with_stats()
         voluntariado_id = self.request.query_params.get("voluntariado")
         if voluntariado_id:
             queryset = queryset.filter(voluntariado_id=voluntariado_id)
         return queryset
 
+    def perform_update(self, serializer):
+        # Si se amplió el cupo, los lugares nuevos se asignan a la lista de espera
+        # (el historial del turno y de las promociones se inserta en lote al final)
+        with history_buffer():
+            turno = serializer.save()
+            notify_turno_promovido(turno.promover_lista_espera())
+
+    @action(detail=False, methods=["post"], url_path='recurrentes', permission_classes=[IsGestionador])
+    def recurrentes(self, request):
+        """
+        Endpoint: POST /voluntariado/turnos/recurrentes/
+        Genera los turnos semanales de un voluntariado a partir de una regla
+        (dias_semana, hora_inicio, hora_fin, cupo, lugar) en una sola inserción masiva.
+        """
+        serializer = TurnoRecurrenteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        creados, omitidos = Turno.crear_recurrentes(
+            data["voluntariado"],
+            data["dias_semana"],
+            data["hora_inicio"],
+            data["hora_fin"],
+            cupo=data["cupo"],
+            lugar=data.get("lugar"),
+            fecha_desde=data.get("fecha_desde"),
+            fecha_hasta=data.get("fecha_hasta"),
+            usuario=request.user,
+        )
+        turnos = Turno.objects.filter(pk__in=[t.pk for t in creados]).select_related("voluntariado").with_stats()
+        return Response(
+            {
+                "creados": len(creados),
+                "omitidos": omitidos,
+                "turnos": TurnoSerializer(turnos, many=True, context={"request": request}).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=True, methods=["post"], url_path='cancelar-inscripcion', permission_classes=[permissions.IsAuthenticated])
+    @history_buffer()
     def cancelar_inscripcion(self, request, pk=None):
         turno = get_object_or_404(Turno, pk=pk)
-        persona = getattr(request.user, "persona", None)
-        if not persona:
+        principal = request.user.principal
+        if principal.persona_id is None:
             return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            voluntario = persona.voluntario
-        except Voluntario.DoesNotExist:
+        if principal.voluntario_id is None:
             return Response({"detail": "La persona no está registrada como voluntario."}, status=status.HTTP_400_BAD_REQUEST)
+        voluntario_id = principal.voluntario_id
+
+        with transaction.atomic():
+            try:
+                # se bloquea solo la inscripción, para no liberar dos veces el mismo lugar
+                inscripcion = InscripcionTurno.objects.select_for_update().get(turno=turno, voluntario_id=voluntario_id, is_active=True)
+            except InscripcionTurno.DoesNotExist:
+                return Response({"detail": "No se encontró una inscripción activa para este turno y usuario."}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            inscripcion = InscripcionTurno.objects.get(turno=turno, voluntario=voluntario, is_active=True)
-            
             # Soft delete related Asistencia if it exists
             if hasattr(inscripcion, 'asistencia'):
                 inscripcion.asistencia.delete()
-            
+
+            liberaba_lugar = inscripcion.estado in (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO)
+            if liberaba_lugar:
+                Turno.liberar_cupo(turno.pk)
             inscripcion.estado = InscripcionTurno.Status.CANCELADO
-            inscripcion.save()  
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except InscripcionTurno.DoesNotExist:
-            return Response({"detail": "No se encontró una inscripción activa para este turno y usuario."}, status=status.HTTP_404_NOT_FOUND)
+            inscripcion.en_espera_desde = None
+            inscripcion.save()
+
+            if liberaba_lugar:
+                # el lugar pasa al primero de la lista de espera dentro de la misma transacción
+                notify_turno_promovido(turno.promover_lista_espera())
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    @history_buffer()
     def inscribirse(self, request, pk=None):
         # Check if user has VOL role - only volunteers can enroll in turnos
         user_role = getattr(request.user, 'role', '')
@@ -933,86 +545,102 @@ class TurnoViewSet(viewsets.ModelViewSet):
             )
         
         # obtener voluntario del usuario
-        persona = getattr(request.user, "persona", None)
-        if not persona:
+        principal = request.user.principal
+        if principal.persona_id is None:
             return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            voluntario = persona.voluntario
-        except Voluntario.DoesNotExist:
+        if principal.voluntario_id is None:
             return Response({"detail": "La persona no está registrada como voluntario."}, status=status.HTTP_400_BAD_REQUEST)
+        voluntario_id = principal.voluntario_id
 
-        with transaction.atomic():
-            # bloquear el turno para evitar race conditions en cupo
-            try:
-                turno = Turno.objects.select_for_update().get(pk=pk)
-            except Turno.DoesNotExist:
-                return Response({"detail": "Turno no encontrado."}, status=status.HTTP_404_NOT_FOUND)
-
-            # Check if voluntario has an active inscription to the voluntariado
-            voluntariado = turno.voluntariado
+        try:
+            turno = Turno.objects.select_related("voluntariado").get(pk=pk)
+        except Turno.DoesNotExist:
+            return Response({"detail": "Turno no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Check if voluntario has an active inscription to the voluntariado
+        voluntariado = turno.voluntariado
+        
+        # If voluntariado doesn't require convocatoria, auto-create InscripcionConvocatoria if needed
+        if not voluntariado.requiere_convocatoria:
+            # Check if user already has a convocatoria inscription
+            convocatoria_inscription = InscripcionConvocatoria.objects.filter(
+                voluntariado=voluntariado,
+                voluntario_id=voluntario_id,
+                is_active=True
+            ).first()
             
-            # If voluntariado doesn't require convocatoria, auto-create InscripcionConvocatoria if needed
-            if not voluntariado.requiere_convocatoria:
-                # Check if user already has a convocatoria inscription
-                convocatoria_inscription = InscripcionConvocatoria.objects.filter(
+            # If no inscription exists, create one with ACEPTADO status automatically
+            if not convocatoria_inscription:
+                InscripcionConvocatoria.objects.create(
                     voluntariado=voluntariado,
-                    voluntario=voluntario,
-                    is_active=True
-                ).first()
-                
-                # If no inscription exists, create one with ACEPTADO status automatically
-                if not convocatoria_inscription:
-                    InscripcionConvocatoria.objects.create(
-                        voluntariado=voluntariado,
-                        voluntario=voluntario,
-                        estado=InscripcionConvocatoria.Status.ACEPTADO
+                    voluntario_id=voluntario_id,
+                    estado=InscripcionConvocatoria.Status.ACEPTADO
+                )
+        else:
+            # For voluntariados that require convocatoria, check if user has valid inscription
+            has_convocatoria_inscription = InscripcionConvocatoria.objects.filter(
+                voluntariado=voluntariado,
+                voluntario_id=voluntario_id,
+                estado__in=[InscripcionConvocatoria.Status.INSCRITO, InscripcionConvocatoria.Status.ACEPTADO],
+                is_active=True
+            ).exists()
+            
+            if not has_convocatoria_inscription:
+                return Response({"detail": "Debes estar inscripto en el voluntariado antes de inscribirte a un turno."}, status=status.HTTP_400_BAD_REQUEST)
+
+        estados_activos = (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO)
+        inscripcion = InscripcionTurno.objects.filter(turno=turno, voluntario_id=voluntario_id).first()
+        if inscripcion and inscripcion.estado in estados_activos:
+            return Response({"detail": "Ya estás inscripto en este turno."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Con lista_espera=true, si el turno está completo el voluntario queda en la lista de espera
+        # y se lo promueve (y notifica) cuando se libera un lugar, en vez de reintentar.
+        lista_espera = str(request.data.get("lista_espera", "")).lower() in ("1", "true")
+
+        with transaction.atomic():
+            # Ocupar el lugar con un UPDATE condicional; el turno no queda bloqueado durante las lecturas de arriba
+            if not Turno.reservar_cupo(turno.pk):
+                if not lista_espera:
+                    return Response({"detail": "El turno ya está completo."}, status=status.HTTP_400_BAD_REQUEST)
+
+                inscripcion = InscripcionTurno.objects.select_for_update().filter(turno=turno, voluntario_id=voluntario_id).first()
+                if inscripcion and inscripcion.estado in estados_activos:
+                    return Response({"detail": "Ya estás inscripto en este turno."}, status=status.HTTP_400_BAD_REQUEST)
+                if inscripcion and inscripcion.estado == InscripcionTurno.Status.EN_ESPERA:
+                    return Response(
+                        {"detail": "Ya estás en la lista de espera de este turno.", "posicion_espera": inscripcion.posicion_espera()},
+                        status=status.HTTP_400_BAD_REQUEST,
                     )
-            else:
-                # For voluntariados that require convocatoria, check if user has valid inscription
-                has_convocatoria_inscription = InscripcionConvocatoria.objects.filter(
-                    voluntariado=voluntariado,
-                    voluntario=voluntario,
-                    estado__in=[InscripcionConvocatoria.Status.INSCRITO, InscripcionConvocatoria.Status.ACEPTADO],
-                    is_active=True
-                ).exists()
-                
-                if not has_convocatoria_inscription:
-                    return Response({"detail": "Debes estar inscripto en el voluntariado antes de inscribirte a un turno."}, status=status.HTTP_400_BAD_REQUEST)
-
-            # contar inscripciones activas (INSCRITO / ASISTIO)
-            activos = turno.inscripciones.filter(
-                estado__in=[InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO]
-            ).count()
-
-            # intentar obtener una inscripción preexistente (bloqueada)
-            try:
-                inscripcion = InscripcionTurno.objects.select_for_update().get(turno=turno, voluntario=voluntario)
-            except InscripcionTurno.DoesNotExist:
-                inscripcion = None
 
-            # Si ya existe y está activa -> error
-            if inscripcion and inscripcion.estado in (InscripcionTurno.Status.INSCRITO, InscripcionTurno.Status.ASISTIO):
+                if inscripcion is None:
+                    inscripcion = InscripcionTurno(turno=turno, voluntario_id=voluntario_id)
+                inscripcion.estado = InscripcionTurno.Status.EN_ESPERA
+                inscripcion.en_espera_desde = timezone.now()
+                inscripcion.save()
+                ser = InscripcionTurnoSerializer(inscripcion, context={"request": request})
+                return Response(ser.data, status=status.HTTP_202_ACCEPTED)
+
+            # Releer la inscripción ya con el lugar tomado: un pedido duplicado del mismo voluntario
+            # espera al UPDATE anterior y acá ve la inscripción ya confirmada
+            inscripcion = InscripcionTurno.objects.select_for_update().filter(turno=turno, voluntario_id=voluntario_id).first()
+            if inscripcion and inscripcion.estado in estados_activos:
+                transaction.set_rollback(True)
                 return Response({"detail": "Ya estás inscripto en este turno."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Si existe pero estaba cancelada -> reactivar si hay cupo
-            if inscripcion and inscripcion.estado == InscripcionTurno.Status.CANCELADO:
-                if activos >= turno.cupo:
-                    return Response({"detail": "El turno ya está completo."}, status=status.HTTP_400_BAD_REQUEST)
+            # Si existe pero estaba cancelada (o en espera) -> reactivar
+            if inscripcion:
                 inscripcion.estado = InscripcionTurno.Status.INSCRITO
-                # si tenés campos como 'canceled_at' o similar, resetealos aquí
+                inscripcion.en_espera_desde = None
                 inscripcion.save()
                 ser = InscripcionTurnoSerializer(inscripcion, context={"request": request})
                 return Response(ser.data, status=status.HTTP_200_OK)
 
-            # No había inscripción previa: crear nueva si hay cupo
-            if activos >= turno.cupo:
-                return Response({"detail": "El turno ya está completo."}, status=status.HTTP_400_BAD_REQUEST)
-
-            nueva = InscripcionTurno.objects.create(turno=turno, voluntario=voluntario)
+            nueva = InscripcionTurno.objects.create(turno=turno, voluntario_id=voluntario_id)
             ser = InscripcionTurnoSerializer(nueva, context={"request": request})
             return Response(ser.data, status=status.HTTP_201_CREATED)
 
 class InscripcionTurnoViewSet(viewsets.ReadOnlyModelViewSet):
+    autenticacion_por_claims = True
     queryset = InscripcionTurno.objects.select_related("turno", "voluntario__persona_ptr").all()
     serializer_class = InscripcionTurnoSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -1026,8 +654,8 @@ class InscripcionTurnoViewSet(viewsets.ReadOnlyModelViewSet):
 
         # Volunteers can only see their own inscriptions
         if user.is_authenticated and not (is_admin_or_staff or is_gestionador):
-            if hasattr(user, 'persona') and hasattr(user.persona, 'voluntario'):
-                queryset = queryset.filter(voluntario=user.persona.voluntario)
+            if user.principal.voluntario_id is not None:
+                queryset = queryset.filter(voluntario_id=user.principal.voluntario_id)
             else:
                 return queryset.none()
         
@@ -1066,18 +694,18 @@ class InscripcionTurnoViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def perform_create(self, serializer):
-        persona = getattr(self.request.user, "persona", None)
-        if not persona:
+        principal = self.request.user.principal
+        if principal.persona_id is None:
             raise serializers.ValidationError("Usuario sin persona asociada.")
-        try:
-            voluntario = persona.voluntario
-        except Voluntario.DoesNotExist:
+        if principal.voluntario_id is None:
             raise serializers.ValidationError("El usuario no es un voluntario registrado.")
         
-        serializer.save(voluntario=voluntario)
+        # La respuesta anida al voluntario: se carga la instancia
+        serializer.save(voluntario=Voluntario.objects.get(pk=principal.voluntario_id))
 
 
 class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
+    autenticacion_por_claims = True
     queryset = InscripcionConvocatoria.objects.select_related("voluntariado", "voluntario__persona_ptr").all()
     serializer_class = InscripcionConvocatoriaSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -1091,8 +719,8 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
 
         # Volunteers can only see their own inscriptions
         if user.is_authenticated and not (is_admin_or_staff or is_gestionador):
-            if hasattr(user, 'persona') and hasattr(user.persona, 'voluntario'):
-                queryset = queryset.filter(voluntario=user.persona.voluntario)
+            if user.principal.voluntario_id is not None:
+                queryset = queryset.filter(voluntario_id=user.principal.voluntario_id)
             else:
                 return queryset.none()
         
@@ -1114,15 +742,14 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        persona = getattr(self.request.user, "persona", None)
-        if not persona:
+        principal = self.request.user.principal
+        if principal.persona_id is None:
             raise serializers.ValidationError("Usuario sin persona asociada.")
-        try:
-            voluntario = persona.voluntario
-        except Voluntario.DoesNotExist:
+        if principal.voluntario_id is None:
             raise serializers.ValidationError("El usuario no es un voluntario registrado.")
         
-        serializer.save(voluntario=voluntario)
+        # La respuesta anida al voluntario: se carga la instancia
+        serializer.save(voluntario=Voluntario.objects.get(pk=principal.voluntario_id))
     
     @action(detail=False, methods=["post"], url_path='inscribirse')
     def inscribirse(self, request):
@@ -1131,14 +758,12 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
         Endpoint: POST /voluntariado/inscripciones-convocatoria/inscribirse/
         Body: { "voluntariado_id": <int> }
         """
-        persona = getattr(request.user, "persona", None)
-        if not persona:
+        principal = request.user.principal
+        if principal.persona_id is None:
             return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            voluntario = persona.voluntario
-        except Voluntario.DoesNotExist:
+        if principal.voluntario_id is None:
             return Response({"detail": "La persona no está registrada como voluntario."}, status=status.HTTP_400_BAD_REQUEST)
+        voluntario_id = principal.voluntario_id
 
         voluntariado_id = request.data.get('voluntariado_id')
         if not voluntariado_id:
@@ -1173,7 +798,7 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
         # Check if already inscribed with active status (not canceled)
         existing = InscripcionConvocatoria.objects.filter(
             voluntariado=voluntariado,
-            voluntario=voluntario,
+            voluntario_id=voluntario_id,
             is_active=True
         ).first()
         
@@ -1192,7 +817,7 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
         # Create new inscription if none exists
         inscripcion = InscripcionConvocatoria.objects.create(
             voluntariado=voluntariado,
-            voluntario=voluntario,
+            voluntario_id=voluntario_id,
             estado=InscripcionConvocatoria.Status.INSCRITO
         )
         
@@ -1221,15 +846,12 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
                 return Response({"detail": "No se puede cancelar la inscripción porque el voluntariado ya finalizó."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check permissions
-        persona = getattr(request.user, "persona", None)
-        if not persona or not hasattr(persona, 'voluntario'):
+        principal = request.user.principal
+        if principal.voluntario_id is None:
             return Response({"detail": "Usuario sin persona asociada."}, status=status.HTTP_400_BAD_REQUEST)
         
-        voluntario = persona.voluntario
-        
         # Only the owner or admin can cancel
-        role = getattr(request.user, 'role', '')
-        if inscripcion.voluntario.id != voluntario.id and role not in ['ADMIN', 'DELEG']:
+        if inscripcion.voluntario_id != principal.voluntario_id and not principal.es_gestionador:
             return Response({"detail": "No tienes permisos para cancelar esta inscripción."}, status=status.HTTP_403_FORBIDDEN)
         
         inscripcion.estado = InscripcionConvocatoria.Status.CANCELADO
@@ -1281,3 +903,48 @@ class InscripcionConvocatoriaViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(inscripcion)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def _resolver_en_lote(self, request, estado):
+        serializer = ResolucionLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = InscripcionConvocatoria.objects.all()
+        if "ids" in data:
+            queryset = queryset.filter(pk__in=data["ids"])
+        else:
+            queryset = queryset.filter(voluntariado=data["voluntariado"])
+
+        with transaction.atomic():
+            ids, voluntariados = InscripcionConvocatoria.resolver_pendientes(queryset, estado)
+            # Chequeo de activación (y notificación) una vez por voluntariado, no por inscripción
+            notificaciones = sum(check_and_notify_activation(voluntariado) for voluntariado in voluntariados)
+
+        respuesta = {
+            "actualizadas": len(ids),
+            "ids": ids,
+            "voluntariados": [voluntariado.id for voluntariado in voluntariados],
+            "notificaciones": notificaciones,
+        }
+        if "ids" in data:
+            # ids inexistentes o que no estaban en estado INSCRITO
+            respuesta["omitidas"] = sorted(set(data["ids"]) - set(ids))
+        return Response(respuesta, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path='aceptar-lote', permission_classes=[permissions.IsAuthenticated, IsGestionador])
+    def aceptar_lote(self, request):
+        """
+        Acepta en lote inscripciones en estado INSCRITO.
+        Endpoint: POST /voluntariado/inscripciones-convocatoria/aceptar-lote/
+        Body: { "ids": [<int>, ...] } o { "voluntariado_id": <int> } (todas las pendientes)
+        """
+        return self._resolver_en_lote(request, InscripcionConvocatoria.Status.ACEPTADO)
+
+    @action(detail=False, methods=["post"], url_path='rechazar-lote', permission_classes=[permissions.IsAuthenticated, IsGestionador])
+    def rechazar_lote(self, request):
+        """
+        Rechaza en lote inscripciones en estado INSCRITO.
+        Endpoint: POST /voluntariado/inscripciones-convocatoria/rechazar-lote/
+        Body: { "ids": [<int>, ...] } o { "voluntariado_id": <int> } (todas las pendientes)
+        """
+        return self._resolver_en_lote(request, InscripcionConvocatoria.Status.RECHAZADO)
@@ -40,19 +40,23 @@ INSTALLED_APPS = [
     'apps.ubicacion',
     'apps.certificado',    
     'apps.facultad',        
-    'apps.core',
+    'apps.core.apps.CoreConfig',
     'apps.dashboard',
     'apps.soft_delete',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication con lecturas sin base de datos para las vistas que lo habilitan (ver apps.users.authentication)
+        'apps.users.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Used for browsable API
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         # 'rest_framework.permissions.IsAuthenticated',
     ],
+    # Paginación por cursor, opcional: el cliente la activa con ?page_size=<n> (máx. 200) o ?cursor=
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 
@@ -63,6 +67,10 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Lecturas autenticadas solo con los claims del token (rol, persona, organización), sin cargar el User.
+# Opcional: una baja o un cambio de rol / organización no llega a esas lecturas hasta el próximo access token
+JWT_STATELESS_READS = bool(int(os.environ.get('JWT_STATELESS_READS', 0)))
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -141,4 +149,51 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+# Historial (django-simple-history, ver apps/core/history.py): modelos ("app_label.Modelo")
+# cuyo historial se escribe después del commit, en otro hilo. Ej: ["voluntariado.InscripcionTurno"]
+HISTORY_DEFERRED_MODELS = [
+    m.strip() for m in os.environ.get('HISTORY_DEFERRED_MODELS', '').split(',') if m.strip()
+]
+
+# Retención del historial (comando archivar_historial): los registros más viejos que MONTHS meses
+# se mueven a core_historial_archivado ("tabla") o a archivos .jsonl.gz en DIRECTORY ("jsonl").
+HISTORY_RETENTION = {
+    'MONTHS': int(os.environ.get('HISTORY_RETENTION_MONTHS', '12')),
+    'MODE': os.environ.get('HISTORY_RETENTION_MODE', 'tabla'),
+    'DIRECTORY': os.environ.get('HISTORY_ARCHIVE_DIR') or str(BASE_DIR / 'history_archive'),
+    'BATCH_SIZE': int(os.environ.get('HISTORY_RETENTION_BATCH_SIZE', '2000')),
+}
+
+# Claves de API (Power BI, ver apps.dashboard.models.APIKey): segundos que una clave validada queda en
+# la caché del proceso y frecuencia máxima de escritura de last_used_at
+API_KEY_CACHE_TTL = int(os.environ.get('API_KEY_CACHE_TTL', 60))
+API_KEY_LAST_USED_INTERVAL = int(os.environ.get('API_KEY_LAST_USED_INTERVAL', 300))
+
+# Exportación a Power BI (apps.dashboard.export): filas leídas de la base por tanda
+POWERBI_EXPORT_CHUNK_SIZE = int(os.environ.get('POWERBI_EXPORT_CHUNK_SIZE', 2000))
+
+# Caché de Django: locmem (por proceso) por defecto. Con varios workers, CACHE_BACKEND=
+# django.core.cache.backends.filebased.FileBasedCache y CACHE_LOCATION=<directorio> lo comparte
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Estadísticas de la landing (apps.core.stats): vida máxima del valor cacheado, en segundos
+LANDING_STATS_MAX_AGE = int(os.environ.get('LANDING_STATS_MAX_AGE', 300))
+
+# Landing pública (landing_config_public): vida máxima de la versión y del payload cacheados, en segundos
+LANDING_CONFIG_MAX_AGE = int(os.environ.get('LANDING_CONFIG_MAX_AGE', 300))
+
+# Certificados ya generados (apps.certificado.cache_pdf); fuera de MEDIA_ROOT porque incluyen datos personales
+CERTIFICADOS_CACHE_DIR = os.environ.get('CERTIFICADOS_CACHE_DIR') or str(BASE_DIR / 'certificados_cache')
+# Procesos que dibujan certificados en la generación en lote (1: en el mismo proceso)
+CERTIFICADOS_WORKERS = int(os.environ.get('CERTIFICADOS_WORKERS', 2))
+# Variante de la plantilla que se incrusta en los certificados (apps.certificado.plantilla): resolución y calidad JPEG
+CERTIFICADOS_PLANTILLA_DPI = int(os.environ.get('CERTIFICADOS_PLANTILLA_DPI', 150))
+CERTIFICADOS_PLANTILLA_CALIDAD = int(os.environ.get('CERTIFICADOS_PLANTILLA_CALIDAD', 85))
+# Dirección que se imprime junto al código de verificación (vacía: solo el código)
+CERTIFICADOS_VERIFICACION_URL = os.environ.get('CERTIFICADOS_VERIFICACION_URL', '')
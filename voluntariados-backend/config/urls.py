@@ -5,10 +5,7 @@ from rest_framework import routers
 from apps.users.views import UserViewSet
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import (
-    TokenRefreshView,
-)
-from apps.users.token_auth import MyTokenObtainPairView
+from apps.users.token_auth import MyTokenObtainPairView, MyTokenRefreshView
 
 router = routers.DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -16,7 +13,7 @@ router.register(r'users', UserViewSet, basename='user')
 urlpatterns = [
     # JWT Authentication endpoints
     path("api/token/", MyTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/refresh/", MyTokenRefreshView.as_view(), name="token_refresh"),
     
     path("api-auth/", include("rest_framework.urls")),  # login/logout web
     path('admin/', admin.site.urls),
@@ -509,6 +509,12 @@ export const certificadoAPI = {
   generarDesdeAdmin: (payload: { dni: string; voluntariado_id: number }) =>
     apiClient.post('/certificado/generar-desde-admin/', payload, {
       responseType: 'blob'  // PDF
+    }),
+
+  // Certificados de todos los voluntarios con horas de un voluntariado (ZIP)
+  generarLote: (voluntariadoId: number) =>
+    apiClient.get(`/certificado/generacion/lote/${voluntariadoId}/`, {
+      responseType: 'blob'  // ZIP
     })
 
   ,